@@ -0,0 +1,173 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from fastapi import Request, Response, status
+
+from config import settings
+
+
+class LRUCache:
+    """
+    Cache em memória (por processo) com limite de itens e expiração opcional.
+
+    Quando cheio, descarta o item usado há mais tempo. Com `ttl` (em segundos),
+    itens mais antigos que isso são tratados como ausentes, o que limita por
+    quanto tempo um worker pode servir um dado desatualizado por outro worker.
+
+    Como no `Snapshot`, `version` muda a cada `pop`/`clear`: quem monta um valor
+    depois de um `await` lê a versão antes e a passa para `set`, que descarta o
+    valor se houve invalidação no meio (ele pode ter sido lido antes do commit).
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.version = 0
+        self._itens: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, chave: Hashable, default: Any = None) -> Any:
+        item = self._itens.get(chave)
+        if item is None or (self.ttl is not None and time.monotonic() - item[0] > self.ttl):
+            if item is not None:
+                del self._itens[chave]
+            self.misses += 1
+            return default
+
+        self._itens.move_to_end(chave)
+        self.hits += 1
+        return item[1]
+
+    def set(self, chave: Hashable, valor: Any, version: Optional[int] = None):
+        if version is not None and version != self.version:
+            return
+        self._itens[chave] = (time.monotonic(), valor)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self.maxsize:
+            self._itens.popitem(last=False)
+
+    def pop(self, chave: Hashable):
+        self.version += 1
+        self._itens.pop(chave, None)
+
+    def clear(self):
+        self.version += 1
+        self._itens.clear()
+
+    def __len__(self) -> int:
+        return len(self._itens)
+
+    def stats(self) -> dict:
+        return {
+            "itens": len(self._itens),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class Snapshot:
+    """
+    Resposta pré-serializada de uma listagem que muda raramente, com ETag forte.
+
+    O corpo é reconstruído na primeira leitura após `invalidate()` (chamado pelo
+    handler que altera os dados, depois do commit) ou após `ttl` segundos; o TTL
+    limita por quanto tempo outros workers servem a versão anterior. O ETag é o
+    hash do conteúdo, então é o mesmo em todos os workers.
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.version = 0
+        self.corpo: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self._criado_em = 0.0
+        self._lock = asyncio.Lock()
+
+    def _valido(self) -> bool:
+        return self.corpo is not None and (
+            self.ttl is None or time.monotonic() - self._criado_em <= self.ttl
+        )
+
+    async def get(self, construir: Callable[[], Awaitable[bytes]]) -> tuple[bytes, str]:
+        if self._valido():
+            return self.corpo, self.etag
+
+        async with self._lock:
+            if self._valido():
+                return self.corpo, self.etag
+
+            versao = self.version
+            corpo = await construir()
+            etag = f'"{hashlib.sha256(corpo).hexdigest()[:32]}"'
+            # Só guarda se ninguém invalidou o snapshot durante a construção
+            if versao == self.version:
+                self.corpo, self.etag, self._criado_em = corpo, etag, time.monotonic()
+            return corpo, etag
+
+    def invalidate(self):
+        self.version += 1
+        self.corpo = None
+        self.etag = None
+
+
+def etag_response(request: Request, corpo: bytes, etag: str) -> Response:
+    """
+    Responde com o JSON `corpo` e o ETag, ou com 304 Not Modified se o
+    navegador já tiver essa versão (cabeçalho If-None-Match).
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etags = {valor.strip().removeprefix("W/") for valor in if_none_match.split(",")}
+        if etag in etags or "*" in etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=corpo, media_type="application/json", headers=headers)
+
+
+# Respostas JSON já serializadas das páginas de detalhe (/projetos/exibir e
+# /postagens/exibir), chaveadas pelo id. O detalhe de um projeto inclui suas
+# publicações e o de uma publicação inclui o projeto, então as rotas de escrita
+# invalidam os dois lados (depois do commit); o TTL limita a defasagem entre workers.
+projeto_detalhes = LRUCache(
+    maxsize=settings.cache.DETALHE_CACHE_SIZE,
+    ttl=settings.cache.DETALHE_CACHE_TTL,
+)
+publicacao_detalhes = LRUCache(
+    maxsize=settings.cache.DETALHE_CACHE_SIZE,
+    ttl=settings.cache.DETALHE_CACHE_TTL,
+)
+
+
+def json_response(corpo: bytes) -> Response:
+    return Response(content=corpo, media_type="application/json")
+
+
+def invalidate_projeto(projeto_id: int):
+    """Remove o detalhe do projeto e os das publicações (que exibem o projeto)."""
+    projeto_detalhes.pop(projeto_id)
+    publicacao_detalhes.clear()
+
+
+def invalidate_publicacao(publicacao_id: int, *projeto_ids: int):
+    """Remove o detalhe da publicação e os dos projetos que a listam."""
+    publicacao_detalhes.pop(publicacao_id)
+    for projeto_id in projeto_ids:
+        projeto_detalhes.pop(projeto_id)
+
+
+def invalidate_detalhes():
+    """Esvazia os caches de detalhe (ex.: dados de um professor mudaram)."""
+    projeto_detalhes.clear()
+    publicacao_detalhes.clear()
+
+
+def cache_stats() -> dict:
+    return {
+        "projeto_detalhes": projeto_detalhes.stats(),
+        "publicacao_detalhes": publicacao_detalhes.stats(),
+    }
@@ -0,0 +1,39 @@
+"""
+Estratégias de carregamento dos relacionamentos das respostas montadas pelo ORM.
+
+Os relacionamentos usados como resumo (ex.: as publicações de um projeto, que em
+`ProjetoResponse` são só id e título) carregam apenas as colunas do schema
+correspondente (`load_only`). Em especial, `Publicacao.conteudo` (LONGTEXT) é
+adiado por padrão e só vem do banco com `undefer`, como em `PUBLICACAO_RESPOSTA`;
+acessá-lo sem isso levanta um erro em vez de fazer uma consulta escondida.
+"""
+from sqlalchemy.orm import selectinload, undefer
+
+from models.db import Curso, Departamento, Professor, Projeto, ProjetoProfessor, Publicacao
+
+# ---- ProjetoResponse ----
+
+# CursoResponse > DepartamentoResponse > CampusResponse (colunas pequenas: carregados inteiros)
+CURSO = selectinload(Projeto.curso).selectinload(Curso.departamento).selectinload(Departamento.campus)
+# ProfessorSimplificado (sem senha, cpf e imagens)
+PROFESSORES = (
+    selectinload(Projeto.link_professores)
+    .selectinload(ProjetoProfessor.professor)
+    .load_only(Professor.id, Professor.nome, Professor.email)
+)
+# PublicacaoSimplificado
+PUBLICACOES = selectinload(Projeto.publicacoes).load_only(Publicacao.id, Publicacao.titulo)
+
+PROJETO_RESPOSTA = (CURSO, PROFESSORES, PUBLICACOES)
+
+# ---- PublicacaoResponse ----
+
+# ProfessorResponse
+AUTOR = selectinload(Publicacao.professor).load_only(
+    Professor.id, Professor.nome, Professor.email,
+    Professor.path_imagem, Professor.path_imagem_thumb, Professor.path_imagem_medio,
+)
+# ProjetoSimplesResponse (sem a descrição)
+PROJETO = selectinload(Publicacao.projeto).load_only(Projeto.id, Projeto.titulo)
+
+PUBLICACAO_RESPOSTA = (undefer(Publicacao.conteudo), AUTOR, PROJETO)
@@ -1,22 +1,54 @@
 # app/dependencies.py (ou onde preferir colocar suas dependências)
 
 from typing import AsyncGenerator, Union
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exc, select
+from sqlalchemy.orm import make_transient_to_detached
 
 from . import security, schemas
+from .cache import LRUCache
 from config import settings
+from models import replicas
 from models.db import Professor, Administrador, LocalAsyncSession # Importe seus modelos e a sessão
 
 # Esta instância aponta para a sua rota de login.
 # O FastAPI a usará para saber de onde o token vem, especialmente na documentação interativa.
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-SECRET_KEY = settings.JWT.SECRET_KEY
-ALGORITHM = settings.JWT.ALGORITHM
+# Cache dos usuários autenticados, chaveado por (role, uid).
+# Guarda apenas os valores das colunas (inclusive token_version, mas não o hash
+# da senha, que fica sem carregar no objeto montado): com ele a
+# verificação do token não faz nenhum SELECT, e get_current_active_user monta
+# um objeto novo anexado à sessão a cada requisição. Deve ser invalidado
+# (invalidate_principal) sempre que os dados de um usuário mudarem; o TTL limita
+# a defasagem entre workers (inclusive para a revogação de tokens).
+_principal_cache = LRUCache(
+    maxsize=settings.security.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.security.PRINCIPAL_CACHE_TTL,
+)
+
+_MODELOS_POR_ROLE = {"administrador": Administrador, "professor": Professor}
+
+def invalidate_principal(role: str, uid: int):
+    """Remove o usuário do cache de autenticação (chamar após alterá-lo)."""
+    _principal_cache.pop((role, uid))
+
+async def _colunas_do_usuario(session: AsyncSession, role: str, uid: int) -> dict | None:
+    colunas = _principal_cache.get((role, uid))
+    if colunas is None:
+        tabela = _MODELOS_POR_ROLE[role].__table__
+        query = select(*(c for c in tabela.c if c.key != "senha")).where(tabela.c.id == uid)
+        result = await session.execute(query)
+        row = result.mappings().one_or_none()
+        if row is None:
+            return None
+        colunas = dict(row)
+        _principal_cache.set((role, uid), colunas)
+    return colunas
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     async with LocalAsyncSession() as session:
@@ -28,74 +60,87 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+async def get_db_session_leitura(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Sessão somente leitura para as rotas públicas de consulta: usa uma réplica de
+    leitura (`database.REPLICAS`), se houver uma disponível. Requisições
+    autenticadas ficam no primário, para verem as próprias alterações.
+    """
+    session = await replicas.abrir_sessao_leitura(primario="authorization" in request.headers)
+    async with session:
+        try:
+            yield session
+        except exc.DBAPIError as e:
+            replica = session.info.get("replica")
+            if replica is not None:
+                replicas.registrar_falha(replica, e)
+            raise
             
-async def get_current_active_user(
-    token: str = Depends(oauth2_scheme), 
+async def get_token_claims(
+    token: str = Depends(oauth2_scheme),
     session: AsyncSession = Depends(get_db_session)
-) -> Union[Professor, Administrador]:
+) -> schemas.TokenClaims:
     """
-    Decodifica o token JWT para obter o usuário atual e o retorna.
-    Levanta uma exceção HTTPException 401 se o token for inválido ou o usuário não for encontrado.
+    Valida o token JWT e retorna suas claims (uid, role e versão do token).
+    Verificações de autorização que só precisam do id e do papel do usuário
+    devem usar esta dependência, que não carrega o usuário.
+    Levanta uma exceção HTTPException 401 se o token for inválido ou tiver sido revogado.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Não foi possível validar as credenciais",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
+
     try:
-        # Decodifica o token usando nossa chave secreta e algoritmo
-        payload = jwt.decode(
-            token, SECRET_KEY, algorithms=[ALGORITHM]
-        )
-        # O payload que criamos foi: {"sub": user.email, "role": role}
-        # Mas o `jwt.decode` transforma em um dict.
-        # Nosso "subject" era um dict, então precisamos acessá-lo.
-        token_data_str = payload.get("sub")
-        # Pequeno ajuste para garantir que o sub seja um dicionário
-        # Em alguns casos, ele pode ser interpretado como string '{\'sub\': \'email\', ...}'
-        import ast
-        token_data = ast.literal_eval(token_data_str)
-
-        email: str = token_data.get("sub")
-        role: str = token_data.get("role")
-        
-        if email is None or role is None:
-            raise credentials_exception
-            
-    except (JWTError, SyntaxError):
+        claims = schemas.TokenClaims.model_validate(security.decode_access_token(token))
+    except (JWTError, ValidationError):
         raise credentials_exception
 
-    # Busca o usuário no banco de dados com base no papel (role)
-    user = None
-    if role == "administrador":
-        query = select(Administrador).where(Administrador.email == email)
-        result = await session.execute(query)
-        user = result.scalar_one_or_none()
-    elif role == "professor":
-        query = select(Professor).where(Professor.email == email)
-        result = await session.execute(query)
-        user = result.scalar_one_or_none()
-    
-    if user is None:
+    # A versão do token vem do cache na maioria das requisições (sem ida ao banco)
+    colunas = await _colunas_do_usuario(session, claims.role, claims.uid)
+    if colunas is None or colunas["token_version"] != claims.tv:
         raise credentials_exception
-    
+
+    return claims
+
+async def get_current_active_user(
+    claims: schemas.TokenClaims = Depends(get_token_claims),
+    session: AsyncSession = Depends(get_db_session)
+) -> Union[Professor, Administrador]:
+    """
+    Retorna o usuário autenticado, anexado à sessão da requisição.
+    Levanta uma exceção HTTPException 401 se o token for inválido ou o usuário não for encontrado.
+    """
+    colunas = await _colunas_do_usuario(session, claims.role, claims.uid)
+    if colunas is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Não foi possível validar as credenciais",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    user = _MODELOS_POR_ROLE[claims.role](**colunas)
+    make_transient_to_detached(user)
+    session.add(user)
+
     # Aqui você poderia adicionar uma verificação se o usuário está ativo, se tivesse esse campo
     # if not user.is_active:
     #     raise HTTPException(status_code=400, detail="Usuário inativo")
         
     return user
 
-async def get_current_admin_user(
-    current_user: Union[Professor, Administrador] = Depends(get_current_active_user)
-) -> Administrador:
+async def get_current_admin_claims(
+    claims: schemas.TokenClaims = Depends(get_token_claims)
+) -> schemas.TokenClaims:
     """
-    Verifica se o usuário autenticado é um Administrador.
+    Verifica, apenas pelas claims do token, se o usuário autenticado é um Administrador.
     Levanta uma exceção 403 Forbidden se não for.
     """
-    if not isinstance(current_user, Administrador):
+    if not claims.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Acesso negado. Apenas administradores podem realizar esta ação."
         )
-    return current_user
+    return claims
@@ -1,18 +1,208 @@
+import asyncio
+import logging
+import smtplib
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Optional
+
 from pydantic import EmailStr
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models.db import EmailOutbox, LocalAsyncSession
+
+# As rotas não enviam e-mails: gravam uma linha em `email_outbox` na mesma transação
+# dos dados e retornam. O worker abaixo (iniciado com a aplicação) entrega os pendentes
+# em lotes, reaproveitando uma conexão SMTP por lote, e reagenda as falhas com backoff
+# exponencial. Sem `email.SMTP_HOST` configurado, os e-mails são apenas impressos.
+SMTP_HOST = settings.email.get("SMTP_HOST")
+SMTP_PORT = settings.email.SMTP_PORT
+SMTP_USER = settings.email.get("SMTP_USER")
+SMTP_PASSWORD = settings.email.get("SMTP_PASSWORD")
+SMTP_STARTTLS = settings.email.SMTP_STARTTLS
+SMTP_TIMEOUT = settings.email.SMTP_TIMEOUT
+REMETENTE = settings.email.REMETENTE
+BATCH_SIZE = settings.email.BATCH_SIZE
+INTERVALO = settings.email.INTERVALO
+MAX_TENTATIVAS = settings.email.MAX_TENTATIVAS
+BACKOFF_BASE = settings.email.BACKOFF_BASE
+BACKOFF_MAX = settings.email.BACKOFF_MAX
+
+# Tempo pelo qual um lote fica reservado ao worker que o pegou
+RESERVA = timedelta(seconds=SMTP_TIMEOUT * BATCH_SIZE)
+
+logger = logging.getLogger("api.email_service")
+
+_acordar: Optional[asyncio.Event] = None
+_worker: Optional[asyncio.Task] = None
+_encerrando = False
+
+
+def _email_acesso(email_destinatario: str, senha: str) -> dict:
+    corpo = "\n".join([
+        "Olá!",
+        "Sua conta foi criada com sucesso. Use as seguintes credenciais para acessar a plataforma:",
+        f"  Login: {email_destinatario}",
+        f"  Senha: {senha}",
+        "É recomendado que você altere sua senha no primeiro acesso.",
+    ])
+    return {
+        "destinatario": email_destinatario,
+        "assunto": "Sua conta na plataforma 'Extensão UNEB em Foco' foi criada!",
+        "corpo": corpo,
+    }
+
+
+def enfileirar_email_acesso(session: AsyncSession, email_destinatario: EmailStr, senha: str):
+    """
+    Coloca na fila o e-mail com os dados de acesso do professor.
+    A linha é gravada no commit da sessão; chame `notificar()` depois dele.
+    """
+    session.add(EmailOutbox(**_email_acesso(email_destinatario, senha)))
+
+
+async def enfileirar_emails_acesso(session: AsyncSession, credenciais: list[tuple[str, str]]):
+    """Versão em lote de `enfileirar_email_acesso` (um INSERT de várias linhas) para (email, senha)."""
+    if credenciais:
+        await session.execute(insert(EmailOutbox), [
+            _email_acesso(email, senha) for email, senha in credenciais
+        ])
+
+
+def notificar():
+    """Acorda o worker para entregar na hora os e-mails recém-enfileirados."""
+    if _acordar is not None:
+        _acordar.set()
+
+
+def _backoff(tentativas: int) -> timedelta:
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (tentativas - 1), BACKOFF_MAX))
+
+
+def _enviar_lote(mensagens: list[tuple[int, str, str, str]]) -> dict[int, str]:
+    """
+    Envia (id, destinatário, assunto, corpo) usando uma única conexão SMTP.
+    Roda numa thread. Retorna o erro de cada mensagem que não foi enviada.
+    """
+    if not SMTP_HOST:
+        # Sem servidor SMTP configurado (desenvolvimento): o e-mail só vai para o log
+        for _, destinatario, assunto, corpo in mensagens:
+            logger.info("Simulação de envio de e-mail para %s (%s):\n%s", destinatario, assunto, corpo)
+        return {}
+
+    erros = {}
+    try:
+        with smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT) as smtp:
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if SMTP_USER:
+                smtp.login(SMTP_USER, SMTP_PASSWORD)
+            for i, (id_, destinatario, assunto, corpo) in enumerate(mensagens):
+                mensagem = EmailMessage()
+                mensagem["From"] = REMETENTE
+                mensagem["To"] = destinatario
+                mensagem["Subject"] = assunto
+                mensagem.set_content(corpo)
+                try:
+                    smtp.send_message(mensagem)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPDataError, smtplib.SMTPSenderRefused) as e:
+                    erros[id_] = str(e)  # Recusa desta mensagem: segue com as demais
+                except (smtplib.SMTPException, OSError) as e:
+                    # Conexão perdida: esta e as restantes ficam para a próxima tentativa
+                    for pendente in mensagens[i:]:
+                        erros[pendente[0]] = str(e)
+                    break
+    except (smtplib.SMTPException, OSError) as e:
+        for id_, *_ in mensagens:
+            erros.setdefault(id_, str(e) or type(e).__name__)
+    return erros
+
+
+async def entregar_lote() -> int:
+    """Entrega até BATCH_SIZE e-mails pendentes. Retorna quantos foram processados."""
+    agora = datetime.now()
+    async with LocalAsyncSession() as session:
+        query = (
+            select(EmailOutbox)
+            .where(
+                EmailOutbox.enviado_em.is_(None),
+                EmailOutbox.proxima_tentativa <= agora,
+                EmailOutbox.tentativas < MAX_TENTATIVAS,
+            )
+            .order_by(EmailOutbox.id)
+            .limit(BATCH_SIZE)
+            .with_for_update(skip_locked=True)
+        )
+        emails = (await session.scalars(query)).all()
+        if not emails:
+            return 0
+
+        # Reserva o lote: outros workers não o pegam enquanto ele é enviado
+        for email in emails:
+            email.proxima_tentativa = agora + RESERVA
+        await session.commit()
+
+        erros = await asyncio.to_thread(
+            _enviar_lote, [(e.id, e.destinatario, e.assunto, e.corpo) for e in emails]
+        )
+
+        for email in emails:
+            erro = erros.get(email.id)
+            if erro is None:
+                email.enviado_em = datetime.now()
+                email.corpo = ""
+                email.ultimo_erro = None
+            else:
+                email.tentativas += 1
+                email.ultimo_erro = erro[:255]
+                email.proxima_tentativa = datetime.now() + _backoff(email.tentativas)
+                if email.tentativas >= MAX_TENTATIVAS:
+                    # Desistência: o corpo tem a senha inicial do professor e não fica guardado
+                    email.corpo = ""
+                    logger.warning(
+                        "E-mail %s para %s descartado após %s tentativas: %s",
+                        email.id, email.destinatario, email.tentativas, email.ultimo_erro,
+                    )
+        await session.commit()
+    return len(emails)
+
+
+async def _executar():
+    while not _encerrando:
+        _acordar.clear()
+        try:
+            while await entregar_lote() == BATCH_SIZE and not _encerrando:
+                pass
+        except Exception:
+            logger.exception("Erro no worker de e-mails")
+        try:
+            await asyncio.wait_for(_acordar.wait(), timeout=INTERVALO)
+        except asyncio.TimeoutError:
+            pass
+
+
+def iniciar_worker():
+    """Inicia o worker de entrega de e-mails (no startup da aplicação)."""
+    global _acordar, _worker
+    if _worker is None:
+        _acordar = asyncio.Event()
+        _worker = asyncio.create_task(_executar())
+
 
-async def enviar_email_acesso(email_destinatario: EmailStr, senha: str):
+async def parar_worker(timeout: float):
     """
-    Função mock para "enviar" o e-mail de acesso.
-    Numa aplicação real, aqui entraria a lógica de envio de e-mail (ex: com fastapi-mail).
+    Encerra o worker (no desligamento): o lote em andamento é concluído (ou cancelado
+    depois de `timeout` segundos, voltando à fila quando a reserva expirar). Os
+    demais pendentes ficam na fila.
     """
-    print("--- SIMULAÇÃO DE ENVIO DE E-MAIL ---")
-    print(f"Para: {email_destinatario}")
-    print("Assunto: Sua conta na plataforma 'Extensão UNEB em Foco' foi criada!")
-    print("\nOlá!")
-    print("Sua conta foi criada com sucesso. Use as seguintes credenciais para acessar a plataforma:")
-    print(f"  Login: {email_destinatario}")
-    print(f"  Senha: {senha}")
-    print("É recomendado que você altere sua senha no primeiro acesso.")
-    print("-------------------------------------")
-    # Retorna True para indicar sucesso na simulação
-    return True
\ No newline at end of file
+    global _acordar, _worker, _encerrando
+    if _worker is not None:
+        _encerrando = True
+        _acordar.set()
+        try:
+            await asyncio.wait_for(_worker, timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            pass
+        _acordar = _worker = None
+        _encerrando = False
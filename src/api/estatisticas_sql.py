@@ -0,0 +1,133 @@
+"""
+Estatísticas agregadas por formato de consulta SQL (no estilo do pg_stat_statements).
+
+Com `instrumentacao.ESTATISTICAS_SQL`, eventos dos engines de `models.db` reduzem
+cada comando executado a uma "impressão digital" (fingerprint): literais e
+parâmetros viram `?`, listas de `IN (...)` e de `VALUES (...)` de qualquer tamanho
+viram uma só e os espaços são normalizados. Para cada fingerprint são acumulados
+chamadas, tempo total, médio e máximo e linhas afetadas/retornadas (quando o
+driver informa).
+
+A memória é limitada a `ESTATISTICAS_SQL_MAX` fingerprints: ao encher, as 5% com
+menor tempo total são descartadas (e contadas em `descartadas`). Os números são
+do worker que responde a GET /admin/sql/stats.
+"""
+import heapq
+import re
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from sqlalchemy import Engine, event
+
+from config import settings
+
+ATIVO = settings.instrumentacao.ESTATISTICAS_SQL
+MAX_FINGERPRINTS = settings.instrumentacao.ESTATISTICAS_SQL_MAX
+# Tamanho máximo do texto guardado de cada fingerprint
+MAX_TEXTO = 2000
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMERO = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_PARAMETRO = re.compile(r"%s|%\(\w+\)s|:\w+|\?")
+_LISTA_IN = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_LISTA_VALUES = re.compile(r"\bVALUES\s*\([^()]*\)(?:\s*,\s*\([^()]*\))*", re.IGNORECASE)
+_ESPACOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Forma normalizada de `statement` (memorizada: o SQLAlchemy repete os mesmos textos)."""
+    texto = _STRING.sub("?", statement)
+    texto = _PARAMETRO.sub("?", texto)
+    texto = _NUMERO.sub("?", texto)
+    texto = _LISTA_IN.sub("IN (...)", texto)
+    texto = _LISTA_VALUES.sub("VALUES (...)", texto)
+    return _ESPACOS.sub(" ", texto).strip()[:MAX_TEXTO]
+
+
+class _Estatistica:
+    __slots__ = ("chamadas", "tempo_total", "tempo_max", "linhas")
+
+    def __init__(self):
+        self.chamadas = 0
+        self.tempo_total = 0.0
+        self.tempo_max = 0.0
+        self.linhas = 0
+
+
+class EstatisticasSQL:
+    def __init__(self, maximo: int):
+        self.maximo = maximo
+        self._lock = threading.Lock()  # O engine síncrono pode ser usado de várias threads
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._itens: dict[str, _Estatistica] = {}
+            self.descartadas = 0
+            self.desde = datetime.now()
+
+    def registrar(self, statement: str, duracao: float, linhas: int):
+        chave = fingerprint(statement)
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                if len(self._itens) >= self.maximo:
+                    self._descartar()
+                item = self._itens[chave] = _Estatistica()
+            item.chamadas += 1
+            item.tempo_total += duracao
+            item.tempo_max = max(item.tempo_max, duracao)
+            if linhas > 0:
+                item.linhas += linhas
+
+    def _descartar(self):
+        quantidade = max(1, self.maximo // 20)
+        for chave in heapq.nsmallest(quantidade, self._itens, key=lambda c: self._itens[c].tempo_total):
+            del self._itens[chave]
+        self.descartadas += quantidade
+
+    def relatorio(self, ordenar: str = "total_ms", limite: int = 50) -> dict:
+        with self._lock:
+            itens = [
+                {
+                    "fingerprint": chave,
+                    "chamadas": item.chamadas,
+                    "total_ms": round(item.tempo_total * 1000, 3),
+                    "media_ms": round(item.tempo_total * 1000 / item.chamadas, 3),
+                    "max_ms": round(item.tempo_max * 1000, 3),
+                    "linhas": item.linhas,
+                }
+                for chave, item in self._itens.items()
+            ]
+            tempo_total = sum(item.tempo_total for item in self._itens.values())
+            cabecalho = {
+                "ativo": ATIVO,
+                "desde": self.desde.isoformat(timespec="seconds"),
+                "fingerprints": len(self._itens),
+                "descartadas": self.descartadas,
+                "tempo_total_ms": round(tempo_total * 1000, 3),
+            }
+        itens.sort(key=lambda item: item[ordenar], reverse=True)
+        return {**cabecalho, "consultas": itens[:limite]}
+
+
+estatisticas = EstatisticasSQL(MAX_FINGERPRINTS)
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    context._inicio_estatistica = time.perf_counter()
+
+
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_inicio_estatistica", None)
+    if inicio is not None:
+        estatisticas.registrar(statement, time.perf_counter() - inicio, cursor.rowcount)
+
+
+def registrar_engines():
+    """Liga a coleta a todos os engines (na classe Engine: inclui os criados depois)."""
+    event.listen(Engine, "before_cursor_execute", _antes)
+    event.listen(Engine, "after_cursor_execute", _depois)
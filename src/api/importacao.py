@@ -0,0 +1,205 @@
+"""
+Importação em lote de professores (POST /admin/cadastrar/lote).
+
+O corpo da requisição, CSV com cabeçalho (nome,email,cpf[,senha]) ou NDJSON (um
+objeto JSON por linha), é lido em streaming e processado em lotes de
+`importacao.LOTE` linhas. Para cada lote: uma consulta verifica de uma vez os
+emails e CPFs já cadastrados, as senhas são hasheadas em paralelo no pool do
+bcrypt, os professores são inseridos com um INSERT de várias linhas e os e-mails
+de acesso entram na fila no mesmo commit. Se o INSERT esbarrar nos índices únicos
+(cadastro concorrente), o lote é desfeito e refeito linha a linha.
+"""
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import email_service, schemas, security
+from config import settings
+from models.db import Professor
+
+LOTE = settings.importacao.LOTE
+
+FORMATOS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+COLUNAS_OBRIGATORIAS = {"nome", "email", "cpf"}
+
+
+def formato_do_corpo(request: Request) -> str:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in FORMATOS:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Envie o arquivo como {', '.join(FORMATOS)}.",
+        )
+    return FORMATOS[content_type]
+
+
+async def _linhas(request: Request) -> AsyncIterator[tuple[int, str]]:
+    """Linhas não vazias do corpo, com o número da linha, à medida que chegam."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    numero = 0
+    async for pedaco in request.stream():
+        *linhas, resto = (resto + decoder.decode(pedaco)).split("\n")
+        for linha in linhas:
+            numero += 1
+            if linha.strip():
+                yield numero, linha.rstrip("\r")
+    resto += decoder.decode(b"", final=True)
+    if resto.strip():
+        yield numero + 1, resto.rstrip("\r")
+
+
+async def _registros(request: Request, formato: str) -> AsyncIterator[tuple[int, Optional[dict], Optional[str]]]:
+    """Converte as linhas em (número da linha, dados, erro). Campos com quebra de linha não são suportados no CSV."""
+    cabecalho = None
+    async for numero, linha in _linhas(request):
+        if formato == "ndjson":
+            try:
+                dados = json.loads(linha)
+            except json.JSONDecodeError as e:
+                yield numero, None, f"JSON inválido: {e.msg}"
+                continue
+            if not isinstance(dados, dict):
+                yield numero, None, "Cada linha deve ser um objeto JSON."
+                continue
+            yield numero, dados, None
+            continue
+
+        valores = next(csv.reader([linha]))
+        if cabecalho is None:
+            cabecalho = [coluna.strip().lower() for coluna in valores]
+            faltando = COLUNAS_OBRIGATORIAS - set(cabecalho)
+            if faltando:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Colunas obrigatórias ausentes no cabeçalho: {', '.join(sorted(faltando))}.",
+                )
+            continue
+        if len(valores) != len(cabecalho):
+            yield numero, None, f"Esperados {len(cabecalho)} campos, encontrados {len(valores)}."
+            continue
+        yield numero, dict(zip(cabecalho, (valor.strip() for valor in valores))), None
+
+
+def _validar(dados: dict) -> tuple[Optional[schemas.ProfessorCreate], Optional[str]]:
+    dados = dict(dados)
+    # Email em minúsculas (a comparação do SQLite diferencia maiúsculas) e CPF só
+    # com dígitos; sem senha informada, gera uma temporária
+    if isinstance(dados.get("email"), str):
+        dados["email"] = dados["email"].strip().lower()
+    dados["cpf"] = "".join(c for c in str(dados.get("cpf") or "") if c not in ".- ")
+    dados["senha"] = dados.get("senha") or security.gerar_senha_temporaria()
+    try:
+        professor = schemas.ProfessorCreate.model_validate(dados)
+    except ValidationError as e:
+        erro = e.errors()[0]
+        return None, f"{'.'.join(map(str, erro['loc']))}: {erro['msg']}"
+    if not (professor.cpf.isdigit() and len(professor.cpf) == 11):
+        return None, "cpf: deve ter 11 dígitos."
+    return professor, None
+
+
+class _Importacao:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self.relatorio: list[schemas.ImportacaoLinha] = []
+        self.emails_vistos: set[str] = set()
+        self.cpfs_vistos: set[str] = set()
+
+    def registrar(self, linha: int, email: Optional[str], situacao: str, detalhe: Optional[str] = None):
+        self.relatorio.append(schemas.ImportacaoLinha(linha=linha, email=email, status=situacao, detalhe=detalhe))
+
+    async def processar_lote(self, lote: list[tuple[int, schemas.ProfessorCreate]]):
+        if not lote:
+            return
+
+        # Uma única consulta para os duplicados do lote inteiro
+        emails = [professor.email for _, professor in lote]
+        cpfs = [professor.cpf for _, professor in lote]
+        existentes = (await self.session.execute(
+            select(Professor.email, Professor.cpf)
+            .where(or_(Professor.email.in_(emails), Professor.cpf.in_(cpfs)))
+        )).all()
+        emails_existentes = {email for email, _ in existentes}
+        cpfs_existentes = {cpf for _, cpf in existentes}
+
+        novos = []
+        for linha, professor in lote:
+            if professor.email in emails_existentes or professor.cpf in cpfs_existentes:
+                self.registrar(linha, professor.email, "duplicado", "Email ou CPF já cadastrado.")
+            elif professor.email in self.emails_vistos or professor.cpf in self.cpfs_vistos:
+                self.registrar(linha, professor.email, "duplicado", "Email ou CPF repetido no arquivo.")
+            else:
+                self.emails_vistos.add(professor.email)
+                self.cpfs_vistos.add(professor.cpf)
+                novos.append((linha, professor))
+        if not novos:
+            return
+
+        hashes = await security.hash_passwords_async([professor.senha for _, professor in novos])
+        try:
+            await self._inserir(novos, hashes)
+        except IntegrityError:
+            # Email ou CPF cadastrado por outra requisição depois da consulta acima:
+            # desfaz o lote e insere linha a linha, marcando só as que conflitarem
+            await self.session.rollback()
+            for (linha, professor), senha_hasheada in zip(novos, hashes):
+                try:
+                    await self._inserir([(linha, professor)], [senha_hasheada])
+                except IntegrityError:
+                    await self.session.rollback()
+                    self.registrar(linha, professor.email, "duplicado", "Email ou CPF já cadastrado.")
+
+    async def _inserir(self, novos: list[tuple[int, schemas.ProfessorCreate]], hashes: list[str]):
+        """Insere os professores e enfileira os e-mails de acesso num único commit."""
+        # Lista de parâmetros: o SQLAlchemy agrupa em INSERTs de várias linhas (insertmanyvalues)
+        await self.session.execute(insert(Professor), [
+            {"nome": professor.nome, "email": professor.email, "cpf": professor.cpf, "senha": senha_hasheada}
+            for (_, professor), senha_hasheada in zip(novos, hashes)
+        ])
+        await email_service.enfileirar_emails_acesso(
+            self.session, [(professor.email, professor.senha) for _, professor in novos]
+        )
+        await self.session.commit()
+        for linha, professor in novos:
+            self.registrar(linha, professor.email, "criado")
+
+
+async def importar_professores(request: Request, session: AsyncSession) -> schemas.ImportacaoResponse:
+    formato = formato_do_corpo(request)
+    importacao = _Importacao(session)
+    lote: list[tuple[int, schemas.ProfessorCreate]] = []
+
+    async for linha, dados, erro in _registros(request, formato):
+        professor = None
+        if erro is None:
+            professor, erro = _validar(dados)
+        if erro is not None:
+            email = dados.get("email") if isinstance(dados, dict) else None
+            importacao.registrar(linha, str(email) if email else None, "invalido", erro)
+            continue
+        lote.append((linha, professor))
+        if len(lote) >= LOTE:
+            await importacao.processar_lote(lote)
+            lote = []
+    await importacao.processar_lote(lote)
+    email_service.notificar()
+
+    relatorio = sorted(importacao.relatorio, key=lambda item: item.linha)
+    return schemas.ImportacaoResponse(
+        criados=sum(item.status == "criado" for item in relatorio),
+        duplicados=sum(item.status == "duplicado" for item in relatorio),
+        invalidos=sum(item.status == "invalido" for item in relatorio),
+        linhas=relatorio,
+    )
@@ -0,0 +1,128 @@
+"""
+Instrumentação das consultas SQL por requisição.
+
+Com `instrumentacao.ATIVO`, eventos do engine (`before/after_cursor_execute`) contam
+os comandos SQL e somam o tempo gasto no banco de cada requisição, guardados numa
+ContextVar aberta pelo `InstrumentacaoMiddleware`. O resultado vai no cabeçalho
+`Server-Timing` da resposta (visível nas ferramentas de desenvolvedor do navegador):
+
+    Server-Timing: db;dur=12.41;desc="6 consultas", app;dur=20.03
+
+e, com `instrumentacao.LOG_ACESSO`, numa linha JSON por requisição no logger
+`api.acesso`. Desativada, nem os eventos nem o middleware são registrados.
+
+O tempo de banco é medido em torno da execução no driver: inclui a espera pelo
+event loop quando há outras requisições em andamento.
+"""
+import json
+import logging
+import sys
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Receive, Scope, Send
+
+from config import settings
+
+ATIVO = settings.instrumentacao.ATIVO
+LOG_ACESSO = settings.instrumentacao.LOG_ACESSO
+
+logger = logging.getLogger("api.acesso")
+
+
+class MetricasSQL:
+    __slots__ = ("consultas", "tempo_db")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tempo_db = 0.0
+
+
+_metricas: ContextVar[Optional[MetricasSQL]] = ContextVar("metricas_sql", default=None)
+
+
+def metricas_atuais() -> Optional[MetricasSQL]:
+    """Métricas da requisição em andamento (None fora de uma requisição instrumentada)."""
+    return _metricas.get()
+
+
+def _antes(conn, cursor, statement, parameters, context, executemany):
+    if _metricas.get() is not None:
+        context._inicio_sql = time.perf_counter()
+
+
+def _depois(conn, cursor, statement, parameters, context, executemany):
+    metricas = _metricas.get()
+    inicio = getattr(context, "_inicio_sql", None)
+    if metricas is not None and inicio is not None:
+        metricas.consultas += 1
+        metricas.tempo_db += time.perf_counter() - inicio
+
+
+def instrumentar_engines():
+    """
+    Registra os eventos que alimentam as métricas (uma vez, no import da aplicação).
+    O registro é na classe Engine: vale também para os engines criados depois.
+    """
+    event.listen(Engine, "before_cursor_execute", _antes)
+    event.listen(Engine, "after_cursor_execute", _depois)
+
+
+def configurar_log_acesso():
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+
+class InstrumentacaoMiddleware:
+    """
+    Abre as métricas de cada requisição HTTP, adiciona o `Server-Timing` à resposta
+    e registra a linha do log de acesso. Middleware ASGI puro, como
+    `LimiteUploadMiddleware`: não intermedia o corpo das respostas.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metricas = MetricasSQL()
+        token = _metricas.set(metricas)
+        inicio = time.perf_counter()
+        status_code = 500
+
+        async def enviar(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                consultas = f"{metricas.consultas} consulta" + ("" if metricas.consultas == 1 else "s")
+                headers.append("Server-Timing", (
+                    f'db;dur={metricas.tempo_db * 1000:.2f};desc="{consultas}", '
+                    f"app;dur={(time.perf_counter() - inicio) * 1000:.2f}"
+                ))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            _metricas.reset(token)
+            if LOG_ACESSO:
+                rota = scope.get("route")
+                logger.info(json.dumps({
+                    "metodo": scope["method"],
+                    "caminho": scope["path"],
+                    "rota": getattr(rota, "path", None),
+                    "status": status_code,
+                    "duracao_ms": round((time.perf_counter() - inicio) * 1000, 2),
+                    "db_consultas": metricas.consultas,
+                    "db_ms": round(metricas.tempo_db * 1000, 2),
+                }, ensure_ascii=False))
@@ -1,8 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from . import email_service, estatisticas_sql, instrumentacao, metricas
+from .security import shutdown_bcrypt_executor
+from .storage import MEDIA_URL, UPLOAD_DIR, LimiteUploadMiddleware, MediaFiles
+from .variantes import aguardar_variantes, shutdown_image_executor
+from config import settings
+from models import db, replicas
 from .routers import auth, admin, professores, projetos, postagens, campus, departamentos, cursos
 
+# Nada abre conexões nem inicia trabalhos no import: tudo começa e termina aqui
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await db.abrir_pools()
+    email_service.iniciar_worker()
+    yield
+    # Conclui os trabalhos em segundo plano enquanto o banco ainda está acessível
+    await email_service.parar_worker(settings.DESLIGAMENTO_TIMEOUT)
+    await aguardar_variantes(settings.DESLIGAMENTO_TIMEOUT)
+    # Encerra os pools de processos/threads usados pelo bcrypt e pelas imagens
+    # (fora do event loop: o shutdown espera as tarefas já enviadas)
+    await asyncio.to_thread(shutdown_bcrypt_executor)
+    await asyncio.to_thread(shutdown_image_executor)
+    await replicas.fechar_pools()
+    await db.fechar_pools()
+    metricas.encerrar_processo()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="Extensão UNEB em Foco API",
     description="API para gerenciar projetos de extensão, notícias e eventos da UNEB.",
     version="0.1.0"
@@ -23,6 +50,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Recusa uploads grandes demais antes de o corpo ser lido
+app.add_middleware(LimiteUploadMiddleware)
+
+# Contadores e histogramas por rota expostos em /metrics
+app.add_middleware(metricas.MetricasMiddleware, montagens=(MEDIA_URL,))
+metricas.monitorar_pools()
+
+# Contagem de consultas e tempo de banco por requisição (Server-Timing e log de acesso).
+# Adicionado por último para ser o mais externo e medir a requisição inteira
+if instrumentacao.ATIVO:
+    instrumentacao.instrumentar_engines()
+    if instrumentacao.LOG_ACESSO:
+        instrumentacao.configurar_log_acesso()
+    app.add_middleware(instrumentacao.InstrumentacaoMiddleware)
+
+# Tempo total e chamadas por formato de consulta (GET /admin/sql/stats)
+if estatisticas_sql.ATIVO:
+    estatisticas_sql.registrar_engines()
+
+# Leituras públicas nas réplicas, se configuradas (logo após uma escrita, no primário)
+if replicas.REPLICAS:
+    replicas.registrar_escritas()
+
 # Incluir os routers
 app.include_router(auth.router, prefix="/auth", tags=["Autenticação"])
 app.include_router(admin.router, prefix="/admin", tags=["Administração"])
@@ -33,6 +83,14 @@ app.include_router(campus.router, prefix="/campus", tags=["Campus"])
 app.include_router(departamentos.router, prefix="/departamentos", tags=["Departamentos"])
 app.include_router(cursos.router, prefix="/cursos", tags=["Cursos"])
 
+# Imagens enviadas (os caminhos gravados no banco já apontam para cá)
+app.mount(MEDIA_URL, MediaFiles(directory=UPLOAD_DIR, check_dir=False), name="media")
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas no formato de exposição do Prometheus (somadas entre os workers no modo multiprocesso)."""
+    return metricas.metrics_response()
+
 @app.get("/", tags=["Root"])
 async def read_root():
     return {"message": "Bem-vindo à API Extensão UNEB em Foco!"}
@@ -0,0 +1,136 @@
+"""
+Métricas da aplicação no formato de exposição do Prometheus (GET /metrics).
+
+- `http_requisicoes_total` e `http_requisicao_duracao_segundos` (histograma), por
+  método, rota (o modelo, ex.: /projetos/exibir/{projeto_id}) e status;
+- `http_requisicoes_em_andamento`, por método;
+- `db_pool_conexoes_em_uso`, `db_pool_overflow` e `db_pool_tamanho` de cada engine
+  (rótulo `engine`: async ou sync), atualizados a cada checkout/checkin do pool;
+- `bcrypt_fila`: hashes/verificações de senha enviados ao pool do bcrypt e ainda
+  não concluídos (na fila ou em execução).
+
+Com vários workers do uvicorn, defina `metricas.MULTIPROCESSO_DIR`: cada worker grava
+seus valores em arquivos mapeados em memória nesse diretório e /metrics soma os de
+todos (modo multiprocesso do prometheus_client). O diretório deve ser esvaziado
+antes de cada início do servidor.
+"""
+import os
+
+from config import settings
+
+MULTIPROCESSO_DIR = settings.metricas.get("MULTIPROCESSO_DIR")
+if MULTIPROCESSO_DIR:
+    # Precisa estar definido antes do import do prometheus_client
+    os.makedirs(MULTIPROCESSO_DIR, exist_ok=True)
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", MULTIPROCESSO_DIR)
+
+import time  # noqa: E402
+
+from prometheus_client import (  # noqa: E402
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram,
+    generate_latest, multiprocess,
+)
+from starlette.responses import Response  # noqa: E402
+from starlette.types import Message, Receive, Scope, Send  # noqa: E402
+
+from models import pool as pools  # noqa: E402
+
+# Limites (s) do histograma de latência: das respostas em cache aos logins (bcrypt)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUISICOES = Counter(
+    "http_requisicoes", "Requisições HTTP atendidas.", ["metodo", "rota", "status"]
+)
+DURACAO = Histogram(
+    "http_requisicao_duracao_segundos", "Duração das requisições HTTP.",
+    ["metodo", "rota", "status"], buckets=BUCKETS,
+)
+EM_ANDAMENTO = Gauge(
+    "http_requisicoes_em_andamento", "Requisições HTTP sendo atendidas.",
+    ["metodo"], multiprocess_mode="livesum",
+)
+POOL_EM_USO = Gauge(
+    "db_pool_conexoes_em_uso", "Conexões do pool emprestadas (checked out).",
+    ["engine"], multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Conexões abertas além do tamanho fixo do pool.",
+    ["engine"], multiprocess_mode="livesum",
+)
+POOL_TAMANHO = Gauge(
+    "db_pool_tamanho", "Tamanho fixo do pool de conexões.",
+    ["engine"], multiprocess_mode="livesum",
+)
+BCRYPT_FILA = Gauge(
+    "bcrypt_fila", "Operações de bcrypt enviadas ao pool e ainda não concluídas.",
+    multiprocess_mode="livesum",
+)
+
+
+def _atualizar_pool(pool: pools._PoolMonitorado):
+    POOL_TAMANHO.labels(pool.nome).set(pool.size())
+    POOL_EM_USO.labels(pool.nome).set(pool.checkedout())
+    POOL_OVERFLOW.labels(pool.nome).set(max(pool.overflow(), 0))
+
+
+def monitorar_pools():
+    """Mantém os gauges dos pools atualizados (uma vez, no import da aplicação)."""
+    pools.observadores.append(_atualizar_pool)
+
+
+def _rota(scope: Scope, montagens: tuple[str, ...]) -> str:
+    """Modelo da rota atendida; caminhos sem rota viram um único rótulo (cardinalidade fixa)."""
+    rota = scope.get("route")
+    if rota is not None:
+        return rota.path
+    for prefixo in montagens:
+        if scope["path"].startswith(prefixo + "/"):
+            return prefixo + "/{arquivo}"
+    return "<sem rota>"
+
+
+class MetricasMiddleware:
+    """Conta e cronometra as requisições HTTP. Middleware ASGI puro, como `LimiteUploadMiddleware`."""
+
+    def __init__(self, app, montagens: tuple[str, ...] = ()):
+        self.app = app
+        self.montagens = montagens
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metodo = scope["method"]
+        status_code = 500
+        inicio = time.perf_counter()
+
+        async def enviar(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        em_andamento = EM_ANDAMENTO.labels(metodo)
+        em_andamento.inc()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            em_andamento.dec()
+            rotulos = (metodo, _rota(scope, self.montagens), str(status_code))
+            REQUISICOES.labels(*rotulos).inc()
+            DURACAO.labels(*rotulos).observe(time.perf_counter() - inicio)
+
+
+def metrics_response() -> Response:
+    if MULTIPROCESSO_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def encerrar_processo():
+    """Descarta os gauges deste worker no agregado (chamado no desligamento)."""
+    if MULTIPROCESSO_DIR:
+        multiprocess.mark_process_dead(os.getpid())
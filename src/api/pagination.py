@@ -0,0 +1,83 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.orm import InstrumentedAttribute
+
+
+def encode_cursor(valor: Any, item_id: int) -> str:
+    """
+    Gera um cursor opaco a partir do valor da coluna de ordenação e do id do último item.
+    """
+    if isinstance(valor, (date, datetime)):
+        valor = valor.isoformat()
+    raw = json.dumps([valor, item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, coluna: InstrumentedAttribute) -> Tuple[Any, int]:
+    """
+    Decodifica um cursor gerado por `encode_cursor`.
+    Levanta HTTPException 400 se o cursor for inválido.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valor, item_id = json.loads(raw)
+        tipo = coluna.type.python_type
+        if tipo in (date, datetime):
+            valor = tipo.fromisoformat(valor)
+        return valor, int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido."
+        )
+
+
+def paginar(
+    query: Select,
+    coluna: InstrumentedAttribute,
+    coluna_id: InstrumentedAttribute,
+    limit: int,
+    skip: int = 0,
+    cursor: Optional[str] = None,
+) -> Select:
+    """
+    Aplica ordenação descendente por (coluna, id) e a paginação à consulta.
+
+    Com `cursor`, usa paginação por chave (keyset): o banco salta direto para a
+    posição do último item pelo índice composto (coluna, id), sem descartar as
+    linhas anteriores como o OFFSET faz. Sem `cursor`, mantém o `skip` antigo.
+    Busca um item a mais que o `limit` para saber se existe próxima página.
+    """
+    query = query.order_by(coluna.desc(), coluna_id.desc())
+
+    if cursor:
+        valor, item_id = decode_cursor(cursor, coluna)
+        query = query.where(
+            or_(
+                coluna < valor,
+                and_(coluna == valor, coluna_id < item_id),
+            )
+        )
+    elif skip:
+        query = query.offset(skip)
+
+    return query.limit(limit + 1)
+
+
+def proximo_cursor(
+    itens: Sequence[Any], limit: int, atributo: str
+) -> Tuple[Sequence[Any], Optional[str]]:
+    """
+    Recebe o resultado de uma consulta feita com `paginar` e devolve
+    os itens da página e o cursor da próxima página (ou None se for a última).
+    """
+    if len(itens) <= limit:
+        return itens, None
+    itens = itens[:limit]
+    ultimo = itens[-1]
+    return itens, encode_cursor(getattr(ultimo, atributo), ultimo.id)
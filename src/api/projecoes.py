@@ -0,0 +1,178 @@
+"""
+Leitura das listagens públicas sem o ORM.
+
+O caminho ORM (`select(Projeto)` + `selectinload` + `from_attributes`) cria um
+objeto instrumentado por linha e por relacionamento, registra todos no identity
+map da sessão e o pydantic depois percorre cada um, atributo por atributo; nas
+listagens, isso domina o tempo de CPU dos workers. Aqui as consultas selecionam
+só as colunas dos schemas de resposta (linhas do Core, tuplas), os itens são
+montados como dicionários e o JSON sai direto do orjson.
+
+O formato é o mesmo de `schemas.PaginatedProjetoResponse`,
+`schemas.PaginatedPublicacaoResponse` e das listas de campus, departamentos e
+cursos, na mesma ordem de campos. Os routers mantêm o `response_model` para a
+documentação, mas as respostas não passam pela validação do pydantic: ao mudar
+um desses schemas, mude também as colunas abaixo.
+"""
+from typing import Any, Iterable, Sequence
+
+import orjson
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.db import Campus, Curso, Departamento, Professor, Projeto, Publicacao
+
+_campus = Campus.__table__.c
+_departamento = Departamento.__table__.c
+_curso = Curso.__table__.c
+_projeto = Projeto.__table__.c
+_publicacao = Publicacao.__table__.c
+_professor = Professor.__table__.c
+
+
+def dumps(dados: Any) -> bytes:
+    """JSON compacto, como o do pydantic (datas em ISO 8601 e enums pelo valor)."""
+    return orjson.dumps(dados)
+
+
+# ---- Campus, departamentos e cursos ----
+
+# Colunas de CursoResponse > DepartamentoResponse > CampusResponse, nessa ordem
+_COLUNAS_CURSO = (
+    _curso.nome, _curso.departamento_id, _curso.id,
+    _departamento.nome, _departamento.campus_id, _departamento.id,
+    _campus.nome, _campus.id,
+)
+
+
+def _departamento_dict(nome, campus_id, id, campus_nome, campus_id_) -> dict:
+    return {"nome": nome, "campus_id": campus_id, "id": id, "campus": {"nome": campus_nome, "id": campus_id_}}
+
+
+def _curso_dict(linha: Row) -> dict:
+    nome, departamento_id, id, *departamento = linha
+    return {"nome": nome, "departamento_id": departamento_id, "id": id, "departamento": _departamento_dict(*departamento)}
+
+
+def _select_cursos() -> Select:
+    return (
+        select(*_COLUNAS_CURSO)
+        .join_from(Curso.__table__, Departamento.__table__, _curso.departamento_id == _departamento.id)
+        .join(Campus.__table__, _departamento.campus_id == _campus.id)
+    )
+
+
+async def lista_campus(session: AsyncSession) -> list[dict]:
+    """Itens de CampusResponse, por nome."""
+    result = await session.execute(select(_campus.nome, _campus.id).order_by(_campus.nome))
+    return [{"nome": nome, "id": id} for nome, id in result]
+
+
+async def lista_departamentos(session: AsyncSession) -> list[dict]:
+    """Itens de DepartamentoResponse (com o campus), por nome."""
+    result = await session.execute(
+        select(*_COLUNAS_CURSO[3:])
+        .join_from(Departamento.__table__, Campus.__table__, _departamento.campus_id == _campus.id)
+        .order_by(_departamento.nome)
+    )
+    return [_departamento_dict(*linha) for linha in result]
+
+
+async def lista_cursos(session: AsyncSession) -> list[dict]:
+    """Itens de CursoResponse (com departamento e campus), por nome."""
+    result = await session.execute(_select_cursos().order_by(_curso.nome))
+    return [_curso_dict(linha) for linha in result]
+
+
+# ---- Projetos ----
+
+# Colunas próprias de ProjetoResponse, na ordem do schema
+_COLUNAS_PROJETO = (
+    _projeto.titulo, _projeto.descricao, _projeto.path_imagem, _projeto.data_inicio,
+    _projeto.data_fim, _projeto.status, _projeto.publico, _projeto.curso_id,
+    _projeto.id, _projeto.path_imagem_thumb, _projeto.path_imagem_medio,
+)
+
+
+def select_projetos() -> Select:
+    """Consulta base das listagens de projetos (filtros e paginação são do router)."""
+    return select(*_COLUNAS_PROJETO)
+
+
+async def projetos(session: AsyncSession, linhas: Sequence[Row]) -> list[dict]:
+    """
+    Itens de ProjetoResponse para as linhas de `select_projetos`, na mesma ordem.
+    Faz mais duas consultas para a página inteira: os cursos e as publicações.
+    """
+    itens = [linha._asdict() for linha in linhas]
+    if not itens:
+        return []
+
+    result = await session.execute(
+        _select_cursos().where(_curso.id.in_({item["curso_id"] for item in itens}))
+    )
+    cursos = {curso["id"]: curso for curso in map(_curso_dict, result)}
+
+    publicacoes: dict[int, list[dict]] = {item["id"]: [] for item in itens}
+    result = await session.execute(
+        select(_publicacao.projeto_id, _publicacao.id, _publicacao.titulo)
+        .where(_publicacao.projeto_id.in_(publicacoes))
+        .order_by(_publicacao.id)
+    )
+    for projeto_id, id, titulo in result:
+        publicacoes[projeto_id].append({"id": id, "titulo": titulo})
+
+    for item in itens:
+        item["curso"] = cursos[item["curso_id"]]
+        # Projeto não tem o atributo `professores`: o caminho ORM sempre devolveu a lista vazia
+        item["professores"] = []
+        item["publicacoes"] = publicacoes[item["id"]]
+    return itens
+
+
+# ---- Publicações ----
+
+# Colunas de PublicacaoResponse, ProfessorResponse e ProjetoSimplesResponse, nessa ordem
+_COLUNAS_PUBLICACAO = (
+    _publicacao.titulo, _publicacao.tipo, _publicacao.data_publicacao, _publicacao.id,
+    _publicacao.conteudo, _publicacao.path_imagem, _publicacao.path_imagem_thumb,
+    _publicacao.path_imagem_medio,
+)
+_COLUNAS_AUTOR = (
+    _professor.nome, _professor.email, _professor.id, _professor.path_imagem,
+    _professor.path_imagem_thumb, _professor.path_imagem_medio,
+)
+
+
+def select_publicacoes() -> Select:
+    """
+    Consulta base das listagens de publicações, já com o projeto (para filtros
+    como `Projeto.curso_id`) e o autor.
+    """
+    return (
+        select(
+            *_COLUNAS_PUBLICACAO,
+            # Rótulos: sem nomes repetidos, a linha ainda dá acesso por nome (ex.: cursor)
+            *(coluna.label(f"autor_{coluna.name}") for coluna in _COLUNAS_AUTOR),
+            _projeto.id.label("projeto_id"), _projeto.titulo.label("projeto_titulo"),
+        )
+        .join_from(Publicacao.__table__, Projeto.__table__, _publicacao.projeto_id == _projeto.id)
+        .join(Professor.__table__, _publicacao.professor_id == _professor.id)
+    )
+
+
+_N_PUBLICACAO = len(_COLUNAS_PUBLICACAO)
+_N_AUTOR = _N_PUBLICACAO + len(_COLUNAS_AUTOR)
+_CAMPOS_PUBLICACAO = tuple(coluna.name for coluna in _COLUNAS_PUBLICACAO)
+_CAMPOS_AUTOR = tuple(coluna.name for coluna in _COLUNAS_AUTOR)
+
+
+def publicacoes(linhas: Iterable[Row]) -> list[dict]:
+    """Itens de PublicacaoResponse para as linhas de `select_publicacoes`."""
+    itens = []
+    for linha in linhas:
+        item = dict(zip(_CAMPOS_PUBLICACAO, linha[:_N_PUBLICACAO]))
+        item["professor"] = dict(zip(_CAMPOS_AUTOR, linha[_N_PUBLICACAO:_N_AUTOR]))
+        item["projeto"] = {"id": linha[_N_AUTOR], "titulo": linha[_N_AUTOR + 1]}
+        itens.append(item)
+    return itens
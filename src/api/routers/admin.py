@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 
 from .. import schemas, security
-from ..dependencies import get_db_session, get_current_admin_user
-from models.db import Professor, Administrador
-from ..email_service import enviar_email_acesso
+from ..dependencies import get_db_session, get_current_admin_claims, invalidate_principal
+from ..cache import cache_stats, invalidate_detalhes
+from ..estatisticas_sql import estatisticas
+from models import replicas
+from models.db import Professor, pool_stats
+from .. import email_service
+from ..importacao import FORMATOS, importar_professores
 
 router = APIRouter()
 
@@ -19,7 +25,7 @@ router = APIRouter()
 )
 async def cadastrar_professor(
     dados_professor: schemas.ProfessorCreate,
-    admin: Administrador = Depends(get_current_admin_user),
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -33,7 +39,7 @@ async def cadastrar_professor(
         raise HTTPException(status_code=409, detail="Email ou CPF já cadastrado.")
 
     # Hashear a senha antes de salvar
-    senha_hasheada = security.hash_password(dados_professor.senha)
+    senha_hasheada = await security.hash_password_async(dados_professor.senha)
 
     novo_professor = Professor(
         nome=dados_professor.nome,
@@ -43,14 +49,46 @@ async def cadastrar_professor(
     )
     session.add(novo_professor)
 
-    await session.commit()
-    await session.refresh(novo_professor)
+    # Enfileira o email com a senha original (não hasheada); é gravado no mesmo commit
+    email_service.enfileirar_email_acesso(session, email_destinatario=novo_professor.email, senha=dados_professor.senha)
 
-    # Envia o email com a senha original (não hasheada)
-    await enviar_email_acesso(email_destinatario=novo_professor.email, senha=dados_professor.senha)
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Cadastro concorrente com o mesmo email/CPF (índices únicos)
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="Email ou CPF já cadastrado.")
+    await session.refresh(novo_professor)
+    email_service.notificar()
     
     return novo_professor
 
+# ROTA PARA ADMINISTRADOR CADASTRAR VÁRIOS PROFESSORES DE UMA VEZ
+@router.post(
+    "/cadastrar/lote",
+    response_model=schemas.ImportacaoResponse,
+    summary="Cadastrar professores em lote (Admin)",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {formato: {"schema": {"type": "string"}} for formato in FORMATOS},
+        }
+    },
+)
+async def cadastrar_professores_em_lote(
+    request: Request,
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
+    session: AsyncSession = Depends(get_db_session)
+):
+    """
+    Cadastra vários professores a partir de um CSV com cabeçalho (nome,email,cpf[,senha])
+    ou de um NDJSON (um objeto por linha, com os mesmos campos), enviado como corpo da requisição.
+    Sem senha, uma senha temporária é gerada. Cada professor criado recebe o e-mail de acesso.
+    Retorna o resultado de cada linha: criado, duplicado (email/CPF já existente ou repetido
+    no arquivo) ou inválido.
+    """
+    return await importar_professores(request, session)
+
 # ROTA PARA ADMINISTRADOR EDITAR PROFESSOR
 @router.put(
     "/editar/{professor_id}",
@@ -60,7 +98,7 @@ async def cadastrar_professor(
 async def editar_professor(
     professor_id: int,
     dados_edicao: schemas.ProfessorUpdate,
-    admin: Administrador = Depends(get_current_admin_user),
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -76,8 +114,15 @@ async def editar_professor(
         setattr(professor, key, value)
     
     session.add(professor)
-    await session.commit()
+    try:
+        await session.commit()
+    except IntegrityError:
+        # Email de outro professor (índice único)
+        await session.rollback()
+        raise HTTPException(status_code=409, detail="Email já cadastrado.")
     await session.refresh(professor)
+    invalidate_principal("professor", professor.id)
+    invalidate_detalhes() # nome/email do professor aparecem nos detalhes de projetos e publicações
     
     return professor
 
@@ -89,7 +134,7 @@ async def editar_professor(
 )
 async def reenviar_acesso_professor(
     professor_id: int,
-    admin: Administrador = Depends(get_current_admin_user),
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -101,17 +146,76 @@ async def reenviar_acesso_professor(
         raise HTTPException(status_code=404, detail="Professor não encontrado.")
 
     # Gera uma nova senha temporária (ex: 8 caracteres aleatórios)
-    import secrets
-    import string
-    alphabet = string.ascii_letters + string.digits
-    nova_senha_temporaria = ''.join(secrets.choice(alphabet) for i in range(8))
+    nova_senha_temporaria = security.gerar_senha_temporaria()
     
-    # Atualiza o hash da senha no banco
-    professor.senha = security.hash_password(nova_senha_temporaria)
+    # Atualiza o hash da senha no banco e revoga os tokens já emitidos
+    professor.senha = await security.hash_password_async(nova_senha_temporaria)
+    professor.token_version += 1
     session.add(professor)
-    await session.commit()
 
-    # Envia o e-mail com a NOVA senha
-    await enviar_email_acesso(email_destinatario=professor.email, senha=nova_senha_temporaria)
+    # Enfileira o e-mail com a NOVA senha (gravado no mesmo commit da troca)
+    email_service.enfileirar_email_acesso(session, email_destinatario=professor.email, senha=nova_senha_temporaria)
+
+    await session.commit()
+    invalidate_principal("professor", professor.id)
+    email_service.notificar()
     
     return {"detail": f"Um e-mail com uma nova senha de acesso foi enviado para {professor.email}."}
+
+# ROTA PARA CONSULTAR A EFICIÊNCIA DOS CACHES EM MEMÓRIA
+@router.get(
+    "/cache/stats",
+    summary="Estatísticas dos caches em memória (Admin)"
+)
+async def estatisticas_cache(
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
+):
+    """
+    Retorna o número de itens, acertos (hits) e falhas (misses) dos caches de
+    detalhe deste worker. Cada worker tem os seus próprios caches e contadores.
+    """
+    return cache_stats()
+
+# ROTAS PARA CONSULTAR E ZERAR AS ESTATÍSTICAS POR FORMATO DE CONSULTA SQL
+@router.get(
+    "/sql/stats",
+    summary="Estatísticas agregadas das consultas SQL (Admin)"
+)
+async def estatisticas_sql(
+    ordenar: Literal["total_ms", "media_ms", "max_ms", "chamadas", "linhas"] = "total_ms",
+    limite: int = 50,
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
+):
+    """
+    Lista os formatos de consulta (literais e parâmetros trocados por `?`) com chamadas,
+    tempo total, médio e máximo e linhas, desde o último reset. Exige
+    `instrumentacao.ESTATISTICAS_SQL` ativo. Os números são do worker que atende a requisição.
+    """
+    return estatisticas.relatorio(ordenar=ordenar, limite=limite)
+
+@router.post(
+    "/sql/stats/reset",
+    summary="Zerar as estatísticas das consultas SQL (Admin)"
+)
+async def zerar_estatisticas_sql(
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
+):
+    """Descarta as estatísticas acumuladas por este worker."""
+    estatisticas.reset()
+    return {"detail": "Estatísticas zeradas."}
+
+
+# ROTA PARA CONSULTAR OS POOLS DE CONEXÃO
+@router.get(
+    "/db/pool",
+    summary="Estado dos pools de conexão com o banco (Admin)"
+)
+async def estatisticas_pool(
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
+):
+    """
+    Para cada engine já criado (async, sync e réplicas de leitura): configuração,
+    conexões em uso, ociosas e em overflow, pico de uso, checkouts, espera por
+    conexão e timeouts. Os números são do worker que atende a requisição.
+    """
+    return {**pool_stats(), **replicas.pool_stats()}
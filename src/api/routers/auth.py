@@ -2,8 +2,8 @@ from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Union
+from sqlalchemy import Row, literal, select, union_all
+from typing import Optional, Union
 
 from .. import schemas
 from ..dependencies import get_db_session, get_current_active_user
@@ -15,6 +15,33 @@ ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT.ACCESS_TOKEN_EXPIRE_MINUTES
 
 router = APIRouter()
 
+async def _buscar_conta(session: AsyncSession, email: str) -> Optional[Row]:
+    """
+    Busca a conta com o email informado nas tabelas de administradores e professores
+    com um único UNION ALL (cada lado usa o índice de email da sua tabela).
+    Retorna uma linha com role, id, senha e token_version, ou None.
+    Se o email existir nas duas tabelas, a conta de administrador tem prioridade.
+    """
+    contas = union_all(
+        select(
+            literal("administrador").label("role"),
+            Administrador.id,
+            Administrador.senha,
+            Administrador.token_version,
+            literal(0).label("prioridade"),
+        ).where(Administrador.email == email),
+        select(
+            literal("professor").label("role"),
+            Professor.id,
+            Professor.senha,
+            Professor.token_version,
+            literal(1).label("prioridade"),
+        ).where(Professor.email == email),
+    ).subquery()
+
+    query = select(contas).order_by(contas.c.prioridade).limit(1)
+    return (await session.execute(query)).first()
+
 @router.post("/login", response_model=schemas.Token, summary="Login de Usuário")
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -24,49 +51,25 @@ async def login_for_access_token(
     Autentica um usuário (professor ou administrador) e retorna um token de acesso.
     O campo 'username' do formulário é o email.
     """
-    user = None
-    role = None
-
-    # 1. Tenta encontrar o usuário como Administrador
-    admin_result = await session.execute(
-        select(Administrador).where(Administrador.email == form_data.username)
-    )
-    user_admin = admin_result.scalar_one_or_none()
-
-    if user_admin:
-        # Verifica a senha do administrador
-        if security.verify_password(form_data.password, user_admin.senha):
-            user = user_admin
-            role = "administrador"
-    
-    # 2. Se não for admin, tenta encontrar como Professor
-    if not user:
-        professor_result = await session.execute(
-            select(Professor).where(Professor.email == form_data.username)
-        )
-        user_professor = professor_result.scalar_one_or_none()
-        
-        if user_professor:
-            # Verifica a senha do professor
-            if security.verify_password(form_data.password, user_professor.senha):
-                user = user_professor
-                role = "professor"
+    # 1. Busca a conta (administrador ou professor) em uma única consulta
+    conta = await _buscar_conta(session, form_data.username)
 
-    # 3. Se não encontrou usuário ou a senha não bateu
-    if not user:
+    # 2. Verifica a senha (no máximo um hash bcrypt por tentativa)
+    if not conta or not await security.verify_password_async(form_data.password, conta.senha):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email ou senha incorretos",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # 4. Cria o token de acesso com o papel (role) e o email (sub)
+    # 3. Cria o token de acesso com o id, o papel (role) e a versão do token do usuário
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    # O "subject" do token conterá o email e o papel para uso futuro
-    token_data = {"sub": user.email, "role": role}
     access_token = security.create_access_token(
-        subject=token_data, expires_delta=access_token_expires
+        uid=conta.id,
+        role=conta.role,
+        token_version=conta.token_version,
+        expires_delta=access_token_expires,
     )
     
     return {"access_token": access_token, "token_type": "bearer"}
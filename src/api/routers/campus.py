@@ -1,28 +1,36 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from .. import schemas
-from ..dependencies import get_db_session, get_current_admin_user
-from models.db import Administrador, Campus
+from .. import projecoes, schemas
+from ..cache import Snapshot, etag_response
+from config import settings
+from ..dependencies import get_db_session, get_db_session_leitura, get_current_admin_claims
+from models.db import Campus
 
 router = APIRouter()
 
+# A lista de campus muda raramente: é servida de um snapshot em memória,
+# reconstruído depois de criar_campus, com ETag para respostas 304.
+_snapshot = Snapshot(ttl=settings.cache.TAXONOMIA_TTL)
+
 @router.get(
     "/listar",
     response_model=List[schemas.CampusResponse],
     summary="Listar todos os campus"
 )
-async def listar_campus(session: AsyncSession = Depends(get_db_session)):
+async def listar_campus(request: Request, session: AsyncSession = Depends(get_db_session_leitura)):
     """
     Lista todos os campus cadastrados, ordenados por nome.
     Esta rota é pública.
     """
-    query = select(Campus).order_by(Campus.nome)
-    result = await session.execute(query)
-    campi = result.scalars().all()
-    return campi
+    async def construir() -> bytes:
+        # Colunas do Core e orjson: sem objetos do ORM
+        return projecoes.dumps(await projecoes.lista_campus(session))
+
+    corpo, etag = await _snapshot.get(construir)
+    return etag_response(request, corpo, etag)
 
 @router.post(
     "/criar",
@@ -32,7 +40,7 @@ async def listar_campus(session: AsyncSession = Depends(get_db_session)):
 )
 async def criar_campus(
     dados_campus: schemas.CampusCreate,
-    admin: Administrador = Depends(get_current_admin_user),
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -52,5 +60,6 @@ async def criar_campus(
     session.add(novo_campus)
     await session.commit()
     await session.refresh(novo_campus)
+    _snapshot.invalidate()
 
     return novo_campus
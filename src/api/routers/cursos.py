@@ -1,36 +1,37 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
-from .. import schemas
-from ..dependencies import get_db_session, get_current_admin_user
-from models.db import Administrador, Departamento, Curso
+from .. import projecoes, schemas
+from ..cache import Snapshot, etag_response
+from config import settings
+from ..dependencies import get_db_session, get_db_session_leitura, get_current_admin_claims
+from models.db import Departamento, Curso
 
 router = APIRouter()
 
+# A lista de cursos muda raramente: é servida de um snapshot em memória,
+# reconstruído depois de criar_curso, com ETag para respostas 304.
+_snapshot = Snapshot(ttl=settings.cache.TAXONOMIA_TTL)
+
 @router.get(
     "/listar",
     response_model=List[schemas.CursoResponse],
     summary="Listar todos os cursos"
 )
-async def listar_cursos(session: AsyncSession = Depends(get_db_session)):
+async def listar_cursos(request: Request, session: AsyncSession = Depends(get_db_session_leitura)):
     """
     Lista todos os cursos cadastrados, incluindo o departamento e campus ao qual pertencem.
     Esta rota é pública.
     """
-    query = (
-        select(Curso)
-        # Eager loading aninhado: carrega o departamento e, dentro dele, o campus
-        .options(
-            selectinload(Curso.departamento).selectinload(Departamento.campus)
-        )
-        .order_by(Curso.nome)
-    )
-    result = await session.execute(query)
-    cursos = result.scalars().all()
-    return cursos
+    async def construir() -> bytes:
+        # Colunas do Core e orjson: sem objetos do ORM
+        return projecoes.dumps(await projecoes.lista_cursos(session))
+
+    corpo, etag = await _snapshot.get(construir)
+    return etag_response(request, corpo, etag)
 
 
 # ROTA 2: CRIAR UM NOVO CURSO (ADMIN)
@@ -42,7 +43,7 @@ async def listar_cursos(session: AsyncSession = Depends(get_db_session)):
 )
 async def criar_curso(
     dados_curso: schemas.CursoCreate,
-    admin: Administrador = Depends(get_current_admin_user),
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -84,5 +85,6 @@ async def criar_curso(
         )
     )
     curso_final = (await session.execute(query_final)).scalar_one()
+    _snapshot.invalidate()
 
     return curso_final
@@ -1,34 +1,37 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from sqlalchemy.orm import selectinload
 
-from .. import schemas
-from ..dependencies import get_db_session, get_current_admin_user
-from models.db import Administrador, Campus, Departamento
+from .. import projecoes, schemas
+from ..cache import Snapshot, etag_response
+from config import settings
+from ..dependencies import get_db_session, get_db_session_leitura, get_current_admin_claims
+from models.db import Campus, Departamento
 
 router = APIRouter()
 
+# A lista de departamentos muda raramente: é servida de um snapshot em memória,
+# reconstruído depois de criar_departamento, com ETag para respostas 304.
+_snapshot = Snapshot(ttl=settings.cache.TAXONOMIA_TTL)
+
 # ROTA 1: LISTAR TODOS OS DEPARTAMENTOS (PÚBLICA)
 @router.get(
     "/listar",
     response_model=List[schemas.DepartamentoResponse],
     summary="Listar todos os departamentos"
 )
-async def listar_departamentos(session: AsyncSession = Depends(get_db_session)):
+async def listar_departamentos(request: Request, session: AsyncSession = Depends(get_db_session_leitura)):
     """
     Lista todos os departamentos cadastrados, incluindo o campus ao qual pertencem.
     Esta rota é pública.
     """
-    query = (
-        select(Departamento)
-        .options(selectinload(Departamento.campus)) # Carrega os dados do campus junto
-        .order_by(Departamento.nome)
-    )
-    result = await session.execute(query)
-    departamentos = result.scalars().all()
-    return departamentos
+    async def construir() -> bytes:
+        # Colunas do Core e orjson: sem objetos do ORM
+        return projecoes.dumps(await projecoes.lista_departamentos(session))
+
+    corpo, etag = await _snapshot.get(construir)
+    return etag_response(request, corpo, etag)
 
 
 # ROTA 2: CRIAR UM NOVO DEPARTAMENTO (ADMIN)
@@ -40,7 +43,7 @@ async def listar_departamentos(session: AsyncSession = Depends(get_db_session)):
 )
 async def criar_departamento(
     dados_departamento: schemas.DepartamentoCreate,
-    admin: Administrador = Depends(get_current_admin_user),
+    admin: schemas.TokenClaims = Depends(get_current_admin_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -74,5 +77,6 @@ async def criar_departamento(
     await session.commit()
     # Recarrega o objeto para incluir o relacionamento com o campus na resposta
     await session.refresh(novo_departamento, ["campus"])
+    _snapshot.invalidate()
     
     return novo_departamento
@@ -1,13 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from typing import Optional, Union
+from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_
+from sqlalchemy import select, func
 from sqlalchemy.orm import selectinload
 
-from .. import schemas
-from ..dependencies import get_db_session, get_current_active_user
+from .. import carregamento, projecoes, schemas
+from ..cache import publicacao_detalhes, json_response, invalidate_publicacao
+from ..storage import salvar_imagem
+from ..variantes import aplicar_imagem, agendar_variantes
+from ..pagination import paginar, proximo_cursor
+from ..search import criar_busca
+from ..dependencies import get_db_session, get_db_session_leitura, get_token_claims
 from enums.tipo import PublicacaoTipoEnum
-from models.db import Publicacao, Projeto, Professor, Administrador
+from models.db import Publicacao, Projeto
 
 router = APIRouter()
 
@@ -18,72 +23,80 @@ router = APIRouter()
     summary="Listar, buscar e filtrar publicações"
 )
 async def listar_publicacoes(
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_db_session_leitura),
     skip: int = 0,
     limit: int = 6,
     search: Optional[str] = None, # Parâmetro para busca por palavra-chave
     tipo: Optional[PublicacaoTipoEnum] = None, # Parâmetro para filtro por tipo
     projeto_id: Optional[int] = None, # Parâmetro para filtro por projeto
-    curso_id: Optional[int] = None # Parâmetro para filtro por curso
+    curso_id: Optional[int] = None, # Parâmetro para filtro por curso
+    cursor: Optional[str] = None # Cursor opaco retornado em 'next_cursor' (substitui o 'skip')
 ):
-    # Consulta base
-    query = (
-        select(Publicacao)
-        .join(Publicacao.projeto) # Join para permitir filtro por curso
-        .order_by(Publicacao.data_publicacao.desc())
-    )
+    # Consulta base: só as colunas da resposta, com o projeto (permite filtrar por curso) e o autor
+    query = projecoes.select_publicacoes()
 
     # Aplica os filtros dinamicamente se eles forem fornecidos
-    if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            or_(
-                Publicacao.titulo.ilike(search_term),
-                Publicacao.conteudo.ilike(search_term)
-            )
-        )
+    busca = criar_busca(session, Publicacao, search)
+    filtros = []
+    if busca:
+        filtros.append(busca.filtro)
     if tipo:
-        query = query.filter(Publicacao.tipo == tipo)
+        filtros.append(Publicacao.tipo == tipo)
     if projeto_id:
-        query = query.filter(Publicacao.projeto_id == projeto_id)
+        filtros.append(Publicacao.projeto_id == projeto_id)
     if curso_id:
-        query = query.filter(Projeto.curso_id == curso_id)
+        filtros.append(Projeto.curso_id == curso_id)
+    query = query.where(*filtros)
 
     # Primeiro, contamos o total de itens com os filtros aplicados
-    count_query = select(func.count()).select_from(query.subquery())
+    # (sem as colunas da resposta nem o autor, que não mudam a contagem)
+    count_query = select(func.count(Publicacao.id)).join(Publicacao.projeto).where(*filtros)
     total_result = await session.execute(count_query)
     total = total_result.scalar_one()
 
-    # Depois, aplicamos a paginação para a consulta final
-    paginated_query = (
-        query
-        .offset(skip)
-        .limit(limit)
-        .options(selectinload(Publicacao.professor), selectinload(Publicacao.projeto))
-    )
-    
+    # Com busca, ordena por relevância e pagina pelo 'skip' (sem cursor)
+    if busca:
+        query = busca.ordenar(query)
+        cursor = None
+
+    # Depois, aplicamos a paginação para a consulta final (JSON montado sem o ORM)
+    paginated_query = paginar(query, Publicacao.data_publicacao, Publicacao.id, limit, skip=skip, cursor=cursor)
+
     result = await session.execute(paginated_query)
-    publicacoes = result.scalars().unique().all()
-    
-    return {"total": total, "publicacoes": publicacoes}
+    linhas, next_cursor = proximo_cursor(result.all(), limit, "data_publicacao")
+
+    return json_response(projecoes.dumps({
+        "total": total,
+        "publicacoes": projecoes.publicacoes(linhas),
+        "next_cursor": None if busca else next_cursor,
+    }))
 
 # ROTA 2: EXIBIR UMA PUBLICAÇÃO ESPECÍFICA (PÚBLICA)
 @router.get("/exibir/{publicacao_id}", response_model=schemas.PublicacaoResponse)
-async def get_detalhes_publicacao(publicacao_id: int, session: AsyncSession = Depends(get_db_session)):
+async def get_detalhes_publicacao(publicacao_id: int, session: AsyncSession = Depends(get_db_session_leitura)):
+    # Resposta já serializada em cache (invalidada pelas rotas de escrita)
+    corpo = publicacao_detalhes.get(publicacao_id)
+    if corpo is not None:
+        return json_response(corpo)
+    # Lida antes da consulta: uma invalidação durante o await descarta este corpo
+    versao = publicacao_detalhes.version
+
     query = (
         select(Publicacao)
         .where(Publicacao.id == publicacao_id)
-        .options(selectinload(Publicacao.professor), selectinload(Publicacao.projeto))
+        .options(*carregamento.PUBLICACAO_RESPOSTA)
     )
     publicacao = (await session.execute(query)).scalar_one_or_none()
     if not publicacao:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Publicação não encontrada.")
-    return publicacao
+    corpo = schemas.PublicacaoResponse.model_validate(publicacao).model_dump_json().encode()
+    publicacao_detalhes.set(publicacao_id, corpo, version=versao)
+    return json_response(corpo)
 
 # ROTA 3: CRIAR UMA NOVA PUBLICAÇÃO (PRIVADA)
 @router.post("/criar", response_model=schemas.PublicacaoResponse, status_code=status.HTTP_201_CREATED)
 async def criar_publicacao(
-    current_user: Union[Professor, Administrador] = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     session: AsyncSession = Depends(get_db_session),
     titulo: str = Form(...),
     conteudo: str = Form(...),
@@ -97,23 +110,26 @@ async def criar_publicacao(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Projeto não encontrado.")
 
     # Autorização: Professor só pode postar em projeto do qual é responsável
-    if isinstance(current_user, Professor):
+    if not claims.is_admin:
         professor_ids_do_projeto = {link.professor_id for link in projeto.link_professores}
-        if current_user.id not in professor_ids_do_projeto:
+        if claims.uid not in professor_ids_do_projeto:
             raise HTTPException(status_code=403, detail="Você não tem permissão para publicar neste projeto.")
 
-    path_imagem_salva = f"static/images/publicacoes/{imagem.filename}" if imagem else None
+    path_imagem_salva = await salvar_imagem(imagem, "publicacoes") if imagem else None
 
     nova_publicacao = Publicacao(
         titulo=titulo,
         conteudo=conteudo,
         tipo=tipo,
         projeto_id=projeto_id,
-        professor_id=current_user.id, # O autor é sempre o usuário logado
-        path_imagem=path_imagem_salva
+        professor_id=claims.uid, # O autor é sempre o usuário logado
     )
+    if path_imagem_salva:
+        aplicar_imagem(nova_publicacao, path_imagem_salva)
     session.add(nova_publicacao)
     await session.commit()
+    agendar_variantes(nova_publicacao)
+    invalidate_publicacao(nova_publicacao.id, projeto_id)
     await session.refresh(nova_publicacao, ["professor", "projeto"]) # Recarrega as relações
     return nova_publicacao
 
@@ -121,7 +137,7 @@ async def criar_publicacao(
 @router.put("/editar/{publicacao_id}", response_model=schemas.PublicacaoResponse)
 async def editar_publicacao(
     publicacao_id: int,
-    current_user: Union[Professor, Administrador] = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     session: AsyncSession = Depends(get_db_session),
     titulo: str = Form(...),
     conteudo: str = Form(...),
@@ -134,19 +150,22 @@ async def editar_publicacao(
         raise HTTPException(status_code=404, detail="Publicação não encontrada.")
 
     # Autorização: Apenas o professor que criou a postagem ou um admin pode editar
-    if isinstance(current_user, Professor) and publicacao.professor_id != current_user.id:
+    if not claims.is_admin and publicacao.professor_id != claims.uid:
         raise HTTPException(status_code=403, detail="Você não tem permissão para editar esta publicação.")
 
     # Atualiza os campos
+    projeto_anterior_id = publicacao.projeto_id
     publicacao.titulo = titulo
     publicacao.conteudo = conteudo
     publicacao.tipo = tipo
     publicacao.projeto_id = projeto_id # Permite mover a publicação para outro projeto
 
     if imagem:
-        publicacao.path_imagem = f"static/images/publicacoes/{imagem.filename}"
+        aplicar_imagem(publicacao, await salvar_imagem(imagem, "publicacoes"))
     
     await session.commit()
+    invalidate_publicacao(publicacao_id, projeto_anterior_id, projeto_id)
+    agendar_variantes(publicacao)
     await session.refresh(publicacao, ["professor", "projeto"])
     return publicacao
 
@@ -156,7 +175,7 @@ async def editar_publicacao(
     summary="Listar as publicações do usuário autenticado"
 )
 async def listar_minhas_publicacoes(
-    current_user: Professor = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     session: AsyncSession = Depends(get_db_session),
     skip: int = 0,
     limit: int = 9,
@@ -168,16 +187,12 @@ async def listar_minhas_publicacoes(
     """
     # 2. Lista de filtros a serem aplicados
     # Começa com o filtro obrigatório: publicações que pertencem ao usuário logado.
-    filters = [Publicacao.professor_id == current_user.id]
+    filters = [Publicacao.professor_id == claims.uid]
 
     # 3. Se um termo de busca for enviado, adiciona um novo filtro à lista
-    if search_query:
-        search_filter = or_(
-            Publicacao.titulo.ilike(f"%{search_query}%"),
-            # IMPORTANTE: Altere 'Publicacao.conteudo' se o nome do campo de texto for outro
-            Publicacao.conteudo.ilike(f"%{search_query}%")
-        )
-        filters.append(search_filter)
+    busca = criar_busca(session, Publicacao, search_query)
+    if busca:
+        filters.append(busca.filtro)
 
     # 4. Aplica TODOS os filtros da lista às consultas
     
@@ -187,13 +202,15 @@ async def listar_minhas_publicacoes(
     total = total_result.scalar_one()
 
     # Consulta paginada para buscar as publicações (também com todos os filtros)
+    query = select(Publicacao).where(*filters) # Aplica os filtros aqui
+    if busca:
+        query = busca.ordenar(query)
     query = (
-        select(Publicacao)
-        .where(*filters) # Aplica os filtros aqui
+        query
         .order_by(Publicacao.data_publicacao.desc())
         .offset(skip)
         .limit(limit)
-        .options(selectinload(Publicacao.professor), selectinload(Publicacao.projeto))
+        .options(*carregamento.PUBLICACAO_RESPOSTA)
     )
     result = await session.execute(query)
     publicacoes = result.scalars().all()
@@ -203,7 +220,7 @@ async def listar_minhas_publicacoes(
 @router.delete("/deletar/{publicacao_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def deletar_publicacao(
     publicacao_id: int,
-    current_user: Union[Professor, Administrador] = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -216,12 +233,13 @@ async def deletar_publicacao(
         raise HTTPException(status_code=404, detail="Publicação não encontrada.")
 
     # Lógica de autorização
-    is_owner = isinstance(current_user, Professor) and publicacao.professor_id == current_user.id
-    is_admin = isinstance(current_user, Administrador)
+    is_owner = not claims.is_admin and publicacao.professor_id == claims.uid
+    is_admin = claims.is_admin
 
     if not is_owner and not is_admin:
         raise HTTPException(status_code=403, detail="Você não tem permissão para excluir esta publicação.")
 
     await session.delete(publicacao)
     await session.commit()
+    invalidate_publicacao(publicacao_id, publicacao.projeto_id)
     return None # Retorna uma resposta 204 No Content
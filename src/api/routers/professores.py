@@ -4,7 +4,10 @@ from typing import List, Union
 from sqlalchemy import select
 
 from .. import schemas
-from ..dependencies import get_db_session, get_current_active_user
+from ..dependencies import get_db_session, get_db_session_leitura, get_current_active_user, invalidate_principal
+from ..cache import invalidate_detalhes
+from ..storage import salvar_imagem
+from ..variantes import aplicar_imagem, agendar_variantes
 from models.db import Professor, Administrador
 from .. import security
 
@@ -15,7 +18,7 @@ router = APIRouter()
     response_model=List[schemas.ProfessorResponse],
     summary="Listar todos os professores"
 )
-async def listar_professores(session: AsyncSession = Depends(get_db_session)):
+async def listar_professores(session: AsyncSession = Depends(get_db_session_leitura)):
     """
     Lista todos os professores cadastrados.
     Esta rota é pública e não requer autenticação.
@@ -27,6 +30,7 @@ async def listar_professores(session: AsyncSession = Depends(get_db_session)):
 
 @router.put(
     "/me/mudar-senha",
+    response_model=schemas.PasswordChangeResponse,
     status_code=status.HTTP_200_OK,
     summary="Alterar a própria senha"
 )
@@ -38,6 +42,7 @@ async def mudar_propria_senha(
     """
     Permite que um professor autenticado altere sua própria senha.
     O usuário deve fornecer a senha antiga e a nova.
+    Os tokens emitidos antes da troca são revogados; a resposta traz um novo token.
     """
     # Garante que apenas um professor está usando esta rota
     if not isinstance(current_user, Professor):
@@ -46,22 +51,32 @@ async def mudar_propria_senha(
             detail="Apenas professores podem alterar a própria senha por esta rota."
         )
 
-    # 1. Verifica se a senha antiga está correta
-    if not security.verify_password(dados_senha.senha_antiga, current_user.senha):
+    # 1. Relê a linha com lock: o usuário vem do cache de autenticação (sem o hash
+    # da senha) e uma troca concorrente só prossegue depois deste commit
+    professor = await session.get(Professor, current_user.id, with_for_update=True, populate_existing=True)
+
+    # 2. Verifica se a senha antiga está correta
+    if not await security.verify_password_async(dados_senha.senha_antiga, professor.senha):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A senha antiga está incorreta."
         )
 
-    # 2. Cria o hash da nova senha
-    hash_nova_senha = security.hash_password(dados_senha.senha_nova)
+    # 3. Cria o hash da nova senha
+    hash_nova_senha = await security.hash_password_async(dados_senha.senha_nova)
 
-    # 3. Atualiza a senha no objeto do usuário e salva no banco
-    current_user.senha = hash_nova_senha
-    session.add(current_user)
+    # 4. Atualiza a senha, revoga os tokens antigos (incremento feito no próprio UPDATE) e salva no banco
+    professor.senha = hash_nova_senha
+    professor.token_version = Professor.token_version + 1
+    await session.flush()
+    await session.refresh(professor, ["token_version"])
     await session.commit()
+    invalidate_principal("professor", professor.id)
 
-    return {"detail": "Senha alterada com sucesso."}
+    access_token = security.create_access_token(
+        uid=professor.id, role="professor", token_version=professor.token_version
+    )
+    return {"detail": "Senha alterada com sucesso.", "access_token": access_token, "token_type": "bearer"}
 
 @router.put(
     "/me/foto-perfil",
@@ -83,20 +98,15 @@ async def atualizar_foto_perfil(
             detail="Apenas professores podem atualizar a foto de perfil."
         )
 
-    # Lógica para salvar o arquivo (semelhante à de publicações)
-    # Você pode criar uma função reutilizável para isso
-    # Por segurança, o nome do arquivo pode ser baseado no ID do usuário para evitar conflitos
-    nome_arquivo = f"professor{current_user.id}{imagem.filename}"
-    path_imagem_salva = f"static/images/professores/{nome_arquivo}"
-
-    # with open(path_imagem_salva, "wb") as buffer:
-    #     buffer.write(await imagem.read())
-
-    current_user.path_imagem = path_imagem_salva
+    # Salva o arquivo (o nome é o hash do conteúdo, então não há conflitos)
+    aplicar_imagem(current_user, await salvar_imagem(imagem, "professores"))
 
     session.add(current_user)
     await session.commit()
     await session.refresh(current_user)
+    invalidate_principal("professor", current_user.id)
+    invalidate_detalhes() # a foto do professor aparece nos detalhes das publicações
+    agendar_variantes(current_user)
 
     return current_user
 
@@ -1,14 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from typing import List, Optional, Union
+from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
-from sqlalchemy import select, and_, func, delete, or_
+from sqlalchemy import select, and_, func, delete
 from sqlalchemy.orm import selectinload
 
-from .. import schemas
-from ..dependencies import get_db_session, get_current_active_user
+from .. import carregamento, projecoes, schemas
+from ..cache import projeto_detalhes, json_response, invalidate_projeto
+from ..storage import salvar_imagem
+from ..variantes import aplicar_imagem, agendar_variantes
+from ..pagination import paginar, proximo_cursor
+from ..search import criar_busca
+from ..dependencies import get_db_session, get_db_session_leitura, get_token_claims
 from enums.status import ProjetoStatusEnum
-from models.db import Projeto, Professor, Administrador, ProjetoProfessor, Curso, Departamento, Publicacao
+from models.db import Projeto, Professor, ProjetoProfessor, Publicacao
 
 router = APIRouter()
 
@@ -22,7 +27,7 @@ router = APIRouter()
 async def criar_novo_projeto(
     # Dependências
     session: AsyncSession = Depends(get_db_session),
-    current_user: Union[Professor, Administrador] = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     
     # Dados do Formulário
     titulo: str = Form(...),
@@ -55,9 +60,9 @@ async def criar_novo_projeto(
         )
 
     # 2. APLICAR REGRAS DE NEGÓCIO BASEADAS NO PAPEL (ROLE)
-    if isinstance(current_user, Professor):
+    if not claims.is_admin:
         # RN: O professor que está criando o projeto DEVE estar na lista de responsáveis. 
-        if current_user.id not in professor_ids_responsaveis:
+        if claims.uid not in professor_ids_responsaveis:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, 
                 detail="O professor que cria o projeto deve estar na lista de responsáveis."
@@ -73,20 +78,19 @@ async def criar_novo_projeto(
     # 3. Lógica para salvar a imagem (se houver)
     path_imagem_salva = None
     if imagem_capa:
-        # A implementação real de `save_upload_file` é recomendada
-        # path_imagem_salva = await save_upload_file(imagem_capa, "projetos")
-        path_imagem_salva = f"static/images/projetos/{imagem_capa.filename}" # Placeholder
+        path_imagem_salva = await salvar_imagem(imagem_capa, "projetos")
 
-        novo_projeto = Projeto(
+    novo_projeto = Projeto(
         titulo=titulo,
         descricao=descricao,
-        path_imagem=path_imagem_salva,
         data_inicio=data_inicio,
         data_fim=data_fim,
         status=status.value,
         publico=publico,
         curso_id=curso_id
     )
+    if path_imagem_salva:
+        aplicar_imagem(novo_projeto, path_imagem_salva)
 
     # 2. Crie as associações na tabela projeto_professor
     # Adicionamos o projeto primeiro para que ele tenha um estado 'pending' na sessão
@@ -111,17 +115,14 @@ async def criar_novo_projeto(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Erro ao salvar: um dos IDs de professor pode não existir. Detalhe: {e}"
         )
+    agendar_variantes(novo_projeto)
 
     # 4. Refresque o objeto para carregar as relações antes de retornar
     # Usamos o eager loading para garantir que a resposta Pydantic não cause erros
     query_final = (
         select(Projeto)
         .where(Projeto.id == novo_projeto.id)
-        .options(
-            selectinload(Projeto.curso).selectinload(Curso.departamento), 
-            selectinload(Projeto.link_professores).selectinload(ProjetoProfessor.professor),
-            selectinload(Projeto.publicacoes) 
-        )
+        .options(*carregamento.PROJETO_RESPOSTA)
     )
 
     projeto_final = (await session.execute(query_final)).scalar_one()
@@ -134,50 +135,47 @@ async def criar_novo_projeto(
     summary="Listar todos os projetos de extensão"
 )
 async def listar_projetos(
-    session: AsyncSession = Depends(get_db_session),
+    session: AsyncSession = Depends(get_db_session_leitura),
     skip: int = 0,
     limit: int = 8,
-    search_query: str | None = None  # 1. Adicionar o parâmetro de busca (opcional)
+    search_query: str | None = None,  # 1. Adicionar o parâmetro de busca (opcional)
+    cursor: str | None = None  # Cursor opaco retornado em 'next_cursor' da página anterior
 ):
     """
     Lista todos os projetos de extensão de forma paginada.
-    Se 'search_query' for fornecido, filtra os projetos pelo título ou descrição.
+    Se 'search_query' for fornecido, filtra os projetos pelo título ou descrição
+    e ordena pela relevância (nesse caso a paginação é feita pelo 'skip').
+    Se 'cursor' for fornecido, pagina por chave (data_inicio, id) e ignora o 'skip'.
     """
-    # 2. Construir a base da consulta (para itens e contagem)
-    query = select(Projeto)
+    # 2. Construir a base da consulta (para itens e contagem): só as colunas da resposta
+    query = projecoes.select_projetos()
     count_query = select(func.count(Projeto.id))
 
     # 3. Se um termo de busca for fornecido, adicionar um filtro (cláusula WHERE)
-    if search_query:
-        search_filter = or_(
-            Projeto.titulo.ilike(f"%{search_query}%"),
-            Projeto.descricao.ilike(f"%{search_query}%")
-        )
+    busca = criar_busca(session, Projeto, search_query)
+    if busca:
         # Aplicando o filtro à consulta principal
-        query = query.where(search_filter)
+        query = busca.ordenar(query.where(busca.filtro))
         # E TAMBÉM à consulta de contagem (MUITO IMPORTANTE para a paginação correta)
-        count_query = count_query.where(search_filter)
+        count_query = count_query.where(busca.filtro)
+        # A ordem por relevância não é compatível com a paginação por chave
+        cursor = None
 
     # Executa a consulta de contagem já com o filtro (se houver)
     total_result = await session.execute(count_query)
     total = total_result.scalar_one()
 
-    # Executa a consulta principal com filtro, ordenação e paginação
-    query = (
-        query
-        .order_by(Projeto.data_inicio.desc())
-        .offset(skip)
-        .limit(limit)
-        .options(
-            selectinload(Projeto.curso).selectinload(Curso.departamento).selectinload(Departamento.campus),
-            selectinload(Projeto.link_professores).selectinload(ProjetoProfessor.professor),
-            selectinload(Projeto.publicacoes)
-        )
-    )
+    # Executa a consulta principal com filtro, ordenação e paginação. Curso e
+    # publicações vêm em mais duas consultas, e o JSON é montado sem o ORM
+    query = paginar(query, Projeto.data_inicio, Projeto.id, limit, skip=skip, cursor=cursor)
     result = await session.execute(query)
-    projetos = result.scalars().unique().all()
+    linhas, next_cursor = proximo_cursor(result.all(), limit, "data_inicio")
 
-    return {"total": total, "items": projetos}
+    return json_response(projecoes.dumps({
+        "total": total,
+        "items": await projecoes.projetos(session, linhas),
+        "next_cursor": None if busca else next_cursor,
+    }))
 
 @router.get(
     "/exibir/{projeto_id}",
@@ -186,22 +184,25 @@ async def listar_projetos(
 )
 async def get_detalhes_projeto(
     projeto_id: int,
-    session: AsyncSession = Depends(get_db_session)
+    session: AsyncSession = Depends(get_db_session_leitura)
     # REMOVEMOS a dependência 'current_user' para tornar a rota pública
 ):
     """
     Obtém os dados detalhados de um único projeto.
     Esta rota é pública e pode ser acessada por qualquer visitante. 
     """
+    # Resposta já serializada em cache (invalidada pelas rotas de escrita)
+    corpo = projeto_detalhes.get(projeto_id)
+    if corpo is not None:
+        return json_response(corpo)
+    # Lida antes da consulta: uma invalidação durante o await descarta este corpo
+    versao = projeto_detalhes.version
+
     # A lógica de busca e eager loading continua a mesma
     query = (
         select(Projeto)
         .where(Projeto.id == projeto_id)
-        .options(
-            selectinload(Projeto.curso).selectinload(Curso.departamento).selectinload(Departamento.campus),
-            selectinload(Projeto.link_professores).selectinload(ProjetoProfessor.professor),
-            selectinload(Projeto.publicacoes)
-        )
+        .options(*carregamento.PROJETO_RESPOSTA)
     )
     projeto = (await session.execute(query)).scalar_one_or_none()
 
@@ -209,7 +210,9 @@ async def get_detalhes_projeto(
     if not projeto:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Projeto não encontrado.")
     
-    return projeto
+    corpo = schemas.ProjetoResponse.model_validate(projeto).model_dump_json().encode()
+    projeto_detalhes.set(projeto_id, corpo, version=versao)
+    return json_response(corpo)
 
 # 2. ROTA PARA SALVAR AS INFORMAÇÕES EDITADAS
 @router.put(
@@ -220,7 +223,7 @@ async def get_detalhes_projeto(
 async def editar_projeto(
     projeto_id: int,
     session: AsyncSession = Depends(get_db_session),
-    current_user: Union[Professor, Administrador] = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     # Os dados vêm do formulário de edição, assim como na criação
     titulo: str = Form(...),
     descricao: Optional[str] = Form(None),
@@ -244,9 +247,9 @@ async def editar_projeto(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Projeto não encontrado.")
 
     # Lógica de autorização para edição
-    if isinstance(current_user, Professor):
+    if not claims.is_admin:
         professor_ids_do_projeto = {link.professor_id for link in projeto_a_editar.link_professores}
-        if current_user.id not in professor_ids_do_projeto:
+        if claims.uid not in professor_ids_do_projeto:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Você não tem permissão para editar este projeto."
@@ -254,9 +257,8 @@ async def editar_projeto(
 
     # Lógica para lidar com a imagem (se uma nova for enviada)
     if imagem_capa:
-        # Aqui você pode adicionar lógica para deletar a imagem antiga e salvar a nova
-        path_imagem_salva = f"static/images/projetos/{imagem_capa.filename}"
-        projeto_a_editar.path_imagem = path_imagem_salva
+        # A imagem antiga não é apagada: o arquivo pode ser compartilhado (nome = hash do conteúdo)
+        aplicar_imagem(projeto_a_editar, await salvar_imagem(imagem_capa, "projetos"))
 
     # Atualiza os campos do projeto com os novos dados
     projeto_a_editar.titulo = titulo
@@ -271,6 +273,8 @@ async def editar_projeto(
     # 1. Remove as associações antigas
     for link in projeto_a_editar.link_professores:
         await session.delete(link)
+    # As remoções vão ao banco antes das inserções: reenviar o mesmo professor não viola a chave única
+    await session.flush()
     
     # 2. Cria as novas associações
     novas_associacoes = [
@@ -285,18 +289,14 @@ async def editar_projeto(
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=400, detail=f"Erro ao atualizar o projeto: {e}")
+    invalidate_projeto(projeto_id)
+    agendar_variantes(projeto_a_editar)
 
     # Para a resposta, recarregamos com todas as informações
     query_final = (
         select(Projeto)
         .where(Projeto.id == projeto_id)
-        .options(
-            selectinload(Projeto.curso)
-                .selectinload(Curso.departamento)
-                .selectinload(Departamento.campus),
-            selectinload(Projeto.link_professores).selectinload(ProjetoProfessor.professor),
-            selectinload(Projeto.publicacoes)
-        )
+        .options(*carregamento.PROJETO_RESPOSTA)
     )
     projeto_atualizado = (await session.execute(query_final)).scalar_one()
     return projeto_atualizado
@@ -307,7 +307,7 @@ async def editar_projeto(
     summary="Listar os projetos do usuário autenticado"
 )
 async def listar_meus_projetos(
-    current_user: Professor = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     session: AsyncSession = Depends(get_db_session),
     skip: int = 0,
     limit: int = 8,
@@ -320,19 +320,16 @@ async def listar_meus_projetos(
     # Filtro obrigatório: projetos pertencentes ao usuário atual
     project_ids_subquery = (
         select(ProjetoProfessor.projeto_id)
-        .where(ProjetoProfessor.professor_id == current_user.id)
+        .where(ProjetoProfessor.professor_id == claims.uid)
     )
     
     # Lista de filtros a serem aplicados. Começa com o filtro obrigatório.
     filters = [Projeto.id.in_(project_ids_subquery)]
 
     # Se um termo de busca for fornecido, adiciona o filtro de busca à lista
-    if search_query:
-        search_filter = or_(
-            Projeto.titulo.ilike(f"%{search_query}%"),
-            Projeto.descricao.ilike(f"%{search_query}%")
-        )
-        filters.append(search_filter)
+    busca = criar_busca(session, Projeto, search_query)
+    if busca:
+        filters.append(busca.filtro)
 
     # Aplica todos os filtros coletados na consulta de contagem
     count_query = select(func.count(Projeto.id)).where(*filters) # O '*' desempacota a lista
@@ -340,17 +337,15 @@ async def listar_meus_projetos(
     total = total_result.scalar_one()
 
     # Aplica todos os filtros na consulta principal
+    query = select(Projeto).where(*filters) # O '*' desempacota a lista
+    if busca:
+        query = busca.ordenar(query)
     query = (
-        select(Projeto)
-        .where(*filters) # O '*' desempacota a lista
+        query
         .order_by(Projeto.data_inicio.desc())
         .offset(skip)
         .limit(limit)
-        .options(
-            selectinload(Projeto.curso).selectinload(Curso.departamento).selectinload(Departamento.campus),
-            selectinload(Projeto.link_professores).selectinload(ProjetoProfessor.professor),
-            selectinload(Projeto.publicacoes)
-        )
+        .options(*carregamento.PROJETO_RESPOSTA)
     )
 
     result = await session.execute(query)
@@ -362,7 +357,7 @@ async def listar_meus_projetos(
 @router.delete("/deletar/{projeto_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def deletar_projeto(
     projeto_id: int,
-    current_user: Union[Professor, Administrador] = Depends(get_current_active_user),
+    claims: schemas.TokenClaims = Depends(get_token_claims),
     session: AsyncSession = Depends(get_db_session)
 ):
     """
@@ -374,11 +369,11 @@ async def deletar_projeto(
     if not projeto:
         raise HTTPException(status_code=404, detail="Projeto não encontrado.")
 
-    is_admin = isinstance(current_user, Administrador)
+    is_admin = claims.is_admin
     is_owner = False
-    if isinstance(current_user, Professor):
+    if not claims.is_admin:
         professor_ids_do_projeto = {link.professor_id for link in projeto.link_professores}
-        if current_user.id in professor_ids_do_projeto:
+        if claims.uid in professor_ids_do_projeto:
             is_owner = True
 
     if not is_owner and not is_admin:
@@ -390,5 +385,6 @@ async def deletar_projeto(
 
     await session.delete(projeto)
     await session.commit()
+    invalidate_projeto(projeto_id)
 
     return None
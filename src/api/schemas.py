@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional, Union
+from typing import List, Literal, Optional, Union
 from datetime import datetime, date
 from enums.status import ProjetoStatusEnum
 from enums.tipo import PublicacaoTipoEnum
@@ -9,6 +9,19 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class TokenClaims(BaseModel):
+    """Claims do token de acesso (ver security.create_access_token)."""
+    uid: int
+    role: Literal["administrador", "professor"]
+    tv: int
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == "administrador"
+
+class PasswordChangeResponse(Token):
+    detail: str
+
 class PasswordChange(BaseModel):
     senha_antiga: str
     senha_nova: str
@@ -86,10 +99,24 @@ class ProfessorUpdate(BaseModel):
 class ProfessorResponse(ProfessorBase):
     id: int
     path_imagem: str | None = None
+    path_imagem_thumb: str | None = None
+    path_imagem_medio: str | None = None
 
     class Config:
         from_attributes = True
 
+class ImportacaoLinha(BaseModel):
+    linha: int
+    email: Optional[str] = None
+    status: Literal["criado", "duplicado", "invalido"]
+    detalhe: Optional[str] = None
+
+class ImportacaoResponse(BaseModel):
+    criados: int
+    duplicados: int
+    invalidos: int
+    linhas: List[ImportacaoLinha]
+
 class ProfessorSimplificado(ProfessorBase):
     id: int
 
@@ -124,6 +151,10 @@ class ProjetoSimplesResponse(BaseModel):
 
 class ProjetoResponse(ProjetoBase):
     id: int
+    # Variantes reduzidas de path_imagem (miniatura para os cards das listagens);
+    # ficam nulas por alguns instantes após o upload, até serem geradas
+    path_imagem_thumb: Optional[str] = None
+    path_imagem_medio: Optional[str] = None
     curso: CursoResponse 
     professores: List[ProfessorSimplificado] = []
     publicacoes: List[PublicacaoSimplificado] = []
@@ -134,6 +165,7 @@ class ProjetoResponse(ProjetoBase):
 class PaginatedProjetoResponse(BaseModel):
     total: int
     items: List[ProjetoResponse]
+    next_cursor: Optional[str] = None
 
 # ---- Publicação (Schemas Completos) ----
 class PublicacaoBase(BaseModel):
@@ -145,6 +177,8 @@ class PublicacaoResponse(PublicacaoBase):
     id: int
     conteudo: str
     path_imagem: str | None = None
+    path_imagem_thumb: str | None = None
+    path_imagem_medio: str | None = None
     professor: ProfessorResponse
     projeto: ProjetoSimplesResponse
 
@@ -154,6 +188,7 @@ class PublicacaoResponse(PublicacaoBase):
 class PaginatedPublicacaoResponse(BaseModel):
     total: int
     publicacoes: List[PublicacaoResponse]
+    next_cursor: Optional[str] = None
 
 UserDetail = Union[ProfessorResponse, AdministradorResponse]
 
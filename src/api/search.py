@@ -0,0 +1,95 @@
+import re
+from typing import Optional
+
+from sqlalchemy import ColumnElement, and_, column, func, literal_column, or_, select, table
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.db import BaseModel
+from models.fulltext import FULLTEXT_COLUMNS, fts5_table
+
+# Palavras de busca: sequências de letras/dígitos (descarta operadores e pontuação)
+_PALAVRA = re.compile(r"\w+", re.UNICODE)
+
+
+class Busca:
+    """
+    Busca textual com ranking de relevância sobre as colunas de FULLTEXT_COLUMNS.
+
+    - MySQL: MATCH ... AGAINST em modo booleano sobre o índice FULLTEXT.
+    - SQLite: tabela virtual FTS5 com ranking bm25.
+    - Outros bancos: ILIKE, sem ranking (comportamento antigo).
+
+    Cada palavra do termo é obrigatória e casa por prefixo, para que a busca
+    funcione enquanto o usuário digita.
+    """
+
+    def __init__(self, modelo: type[BaseModel], palavras: list[str], dialeto: str):
+        self.modelo = modelo
+        self.palavras = palavras
+        self.dialeto = dialeto
+        self.colunas = [
+            getattr(modelo, nome) for nome in FULLTEXT_COLUMNS[modelo.__tablename__]
+        ]
+
+    def _match_mysql(self) -> ColumnElement:
+        termo = " ".join(f"+{palavra}*" for palavra in self.palavras)
+        return match(*self.colunas, against=termo).in_boolean_mode()
+
+    def _match_sqlite(self):
+        fts = table(fts5_table(self.modelo.__tablename__), column("rowid"))
+        termo = " ".join('"{}"*'.format(palavra) for palavra in self.palavras)
+        return fts, literal_column(fts.name).op("MATCH")(termo)
+
+    @property
+    def filtro(self) -> ColumnElement[bool]:
+        """Cláusula WHERE que restringe às linhas que casam com o termo."""
+        if self.dialeto == "mysql":
+            return self._match_mysql()
+        if self.dialeto == "sqlite":
+            fts, condicao = self._match_sqlite()
+            return self.modelo.id.in_(select(fts.c.rowid).where(condicao))
+
+        return and_(
+            *[
+                or_(*[coluna.ilike(f"%{palavra}%") for coluna in self.colunas])
+                for palavra in self.palavras
+            ]
+        )
+
+    @property
+    def relevancia(self) -> Optional[ColumnElement]:
+        """Expressão de relevância (maior = mais relevante), ou None se não houver ranking."""
+        if self.dialeto == "mysql":
+            return self._match_mysql()
+        if self.dialeto == "sqlite":
+            fts, condicao = self._match_sqlite()
+            # bm25 é menor para documentos mais relevantes
+            return (
+                select(-func.bm25(literal_column(fts.name)))
+                .where(condicao, fts.c.rowid == self.modelo.id)
+                .scalar_subquery()
+            )
+        return None
+
+    def ordenar(self, query):
+        """Ordena a consulta por relevância (antes de qualquer outra ordenação)."""
+        relevancia = self.relevancia
+        if relevancia is None:
+            return query
+        return query.order_by(relevancia.desc())
+
+
+def criar_busca(
+    session: AsyncSession, modelo: type[BaseModel], termo: Optional[str]
+) -> Optional[Busca]:
+    """
+    Ponto único de entrada da busca textual usado pelos routers.
+    Retorna None se não houver termo de busca utilizável.
+    """
+    if not termo:
+        return None
+    palavras = _PALAVRA.findall(termo)
+    if not palavras:
+        return None
+    return Busca(modelo, palavras, session.bind.dialect.name)
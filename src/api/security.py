@@ -1,11 +1,18 @@
 # app/core/security.py
+import asyncio
+import math
+import multiprocessing
+import secrets
+import string
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Any, Union
+from typing import Any, Optional
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from config import settings
+from .metricas import BCRYPT_FILA
 
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.JWT.ACCESS_TOKEN_EXPIRE_MINUTES
 SECRET_KEY = settings.JWT.SECRET_KEY
@@ -22,12 +29,88 @@ def hash_password(password: str) -> str:
     """Cria o hash de uma senha."""
     return pwd_context.hash(password)
 
+def gerar_senha_temporaria(tamanho: int = 8) -> str:
+    """Gera uma senha temporária aleatória (letras e dígitos)."""
+    alphabet = string.ascii_letters + string.digits
+    return ''.join(secrets.choice(alphabet) for _ in range(tamanho))
+
+# O bcrypt leva centenas de milissegundos por chamada. Para não bloquear o event loop
+# (e com ele todas as requisições do worker), as versões assíncronas abaixo rodam em
+# um pool dedicado de tamanho fixo: rajadas de login ficam na fila do pool.
+BCRYPT_WORKERS = settings.security.BCRYPT_WORKERS
+BCRYPT_EXECUTOR = settings.security.BCRYPT_EXECUTOR  # "thread" ou "process"
+
+_bcrypt_executor: Optional[Executor] = None
+
+def _get_bcrypt_executor() -> Executor:
+    global _bcrypt_executor
+    if _bcrypt_executor is None:
+        if BCRYPT_EXECUTOR == "process":
+            _bcrypt_executor = ProcessPoolExecutor(
+                max_workers=BCRYPT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _bcrypt_executor = ThreadPoolExecutor(
+                max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt"
+            )
+    return _bcrypt_executor
+
+async def _no_pool_bcrypt(func, *args):
+    """Roda `func` no pool do bcrypt, contabilizando a fila no gauge `bcrypt_fila`."""
+    loop = asyncio.get_running_loop()
+    BCRYPT_FILA.inc()
+    try:
+        return await loop.run_in_executor(_get_bcrypt_executor(), func, *args)
+    finally:
+        BCRYPT_FILA.dec()
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Versão de `verify_password` que roda no pool do bcrypt, sem bloquear o event loop."""
+    return await _no_pool_bcrypt(verify_password, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """Versão de `hash_password` que roda no pool do bcrypt, sem bloquear o event loop."""
+    return await _no_pool_bcrypt(hash_password, password)
+
+def _hash_passwords(passwords: list[str]) -> list[str]:
+    return [hash_password(password) for password in passwords]
+
+async def hash_passwords_async(passwords: list[str], max_chunk_size: int = 8) -> list[str]:
+    """
+    Cria o hash de várias senhas em paralelo no pool do bcrypt (importação em lote).
+    As senhas são divididas entre os `BCRYPT_WORKERS` workers, em blocos de no
+    máximo `max_chunk_size` (menos comunicação entre processos sem deixar workers
+    ociosos em lotes pequenos), com no máximo `BCRYPT_WORKERS` blocos no pool ao
+    mesmo tempo: a fila do pool é FIFO, então um login que chega durante a
+    importação espera só os blocos já enviados, e não a importação inteira.
+    """
+    tamanho = max(1, min(max_chunk_size, math.ceil(len(passwords) / BCRYPT_WORKERS)))
+    em_andamento = asyncio.Semaphore(BCRYPT_WORKERS)
+
+    async def bloco(inicio: int) -> list[str]:
+        async with em_andamento:
+            return await _no_pool_bcrypt(_hash_passwords, passwords[inicio:inicio + tamanho])
+
+    blocos = await asyncio.gather(*(bloco(i) for i in range(0, len(passwords), tamanho)))
+    return [hashed for bloco in blocos for hashed in bloco]
+
+def shutdown_bcrypt_executor():
+    """Encerra o pool do bcrypt (chamado no desligamento da aplicação)."""
+    global _bcrypt_executor
+    if _bcrypt_executor is not None:
+        _bcrypt_executor.shutdown(wait=True)
+        _bcrypt_executor = None
+
 def create_access_token(
-    subject: Union[str, Any], expires_delta: timedelta = None
+    uid: int, role: str, token_version: int, expires_delta: timedelta = None
 ) -> str:
     """
-    Cria um token de acesso JWT.
-    :param subject: O assunto (identificador) do token, como o email do usuário.
+    Cria um token de acesso JWT com claims tipadas.
+    :param uid: O id do usuário na tabela do seu papel.
+    :param role: O papel do usuário ("administrador" ou "professor").
+    :param token_version: A versão atual dos tokens do usuário (claim "tv");
+        tokens com versão diferente da do usuário são rejeitados.
     :param expires_delta: Tempo de vida do token.
     """
     if expires_delta:
@@ -36,6 +119,19 @@ def create_access_token(
         # Usa o tempo de expiração padrão das configurações
         expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {
+        "exp": expire,
+        "sub": f"{role}:{uid}",
+        "uid": uid,
+        "role": role,
+        "tv": token_version,
+    }
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
+
+def decode_access_token(token: str) -> dict[str, Any]:
+    """
+    Valida a assinatura e a expiração do token e retorna suas claims.
+    Levanta JWTError se o token for inválido.
+    """
+    return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
@@ -0,0 +1,204 @@
+"""
+Armazenamento das imagens enviadas (capas de projeto, publicações e fotos de perfil).
+
+O arquivo é copiado em blocos para o disco numa thread, sem carregá-lo inteiro na
+memória e sem bloquear o event loop. O nome final é o hash SHA-256 do conteúdo,
+então o mesmo arquivo enviado várias vezes é gravado uma única vez.
+
+As imagens são servidas pela própria aplicação em `/<UPLOAD_DIR>` (ver `MediaFiles`),
+o mesmo caminho gravado no banco.
+"""
+import hashlib
+import os
+import re
+import tempfile
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile, status
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Receive, Scope, Send
+
+from config import settings
+
+UPLOAD_DIR = settings.uploads.DIR
+MAX_BYTES = settings.uploads.MAX_BYTES
+CHUNK_SIZE = settings.uploads.CHUNK_SIZE
+# Folga para os demais campos do formulário e os delimitadores do multipart
+MAX_FORM_OVERHEAD = 1024 * 1024
+
+# Assinatura (primeiros bytes) -> extensão. O tipo é decidido pelo conteúdo,
+# não pelo Content-Type nem pelo nome enviados pelo cliente.
+_ASSINATURAS = {
+    b"\xff\xd8\xff": ".jpg",
+    b"\x89PNG\r\n\x1a\n": ".png",
+    b"GIF87a": ".gif",
+    b"GIF89a": ".gif",
+}
+
+
+def _extensao(inicio: bytes) -> Optional[str]:
+    for assinatura, extensao in _ASSINATURAS.items():
+        if inicio.startswith(assinatura):
+            return extensao
+    if inicio[:4] == b"RIFF" and inicio[8:12] == b"WEBP":
+        return ".webp"
+    return None
+
+
+def _arquivo_muito_grande() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"A imagem deve ter no máximo {MAX_BYTES // (1024 * 1024)} MB.",
+    )
+
+
+def _gravar(origem: BinaryIO, pasta: str) -> str:
+    """Copia `origem` em blocos para `pasta`, validando tipo e tamanho. Roda numa thread."""
+    primeiro = origem.read(CHUNK_SIZE)
+    extensao = _extensao(primeiro)
+    if extensao is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Formato de imagem não suportado (use JPEG, PNG, GIF ou WebP).",
+        )
+
+    os.makedirs(pasta, exist_ok=True)
+    digest = hashlib.sha256()
+    tamanho = 0
+    fd, temporario = tempfile.mkstemp(dir=pasta, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as destino:
+            bloco = primeiro
+            while bloco:
+                tamanho += len(bloco)
+                if tamanho > MAX_BYTES:
+                    raise _arquivo_muito_grande()
+                digest.update(bloco)
+                destino.write(bloco)
+                bloco = origem.read(CHUNK_SIZE)
+
+        nome = digest.hexdigest() + extensao
+        final = os.path.join(pasta, nome)
+        if os.path.exists(final):
+            os.remove(temporario)  # Conteúdo já armazenado
+        else:
+            os.replace(temporario, final)
+        return nome
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+async def salvar_imagem(imagem: UploadFile, categoria: str) -> str:
+    """
+    Grava a imagem enviada em `<UPLOAD_DIR>/<categoria>/<sha256>.<ext>` e retorna esse caminho.
+
+    Rejeita com 413 arquivos maiores que `uploads.MAX_BYTES` (pelo tamanho informado
+    no upload, antes de ler qualquer byte, e de novo durante a cópia) e com 415
+    arquivos que não são JPEG, PNG, GIF ou WebP.
+    """
+    if imagem.size is not None and imagem.size > MAX_BYTES:
+        raise _arquivo_muito_grande()
+
+    await imagem.seek(0)
+    nome = await run_in_threadpool(_gravar, imagem.file, os.path.join(UPLOAD_DIR, categoria))
+    return f"{UPLOAD_DIR}/{categoria}/{nome}"
+
+
+class LimiteUploadMiddleware:
+    """
+    Recusa com 413 formulários multipart cujo Content-Length já excede o limite,
+    antes que o corpo seja lido e guardado em arquivo temporário pelo parser.
+
+    É um middleware ASGI puro (e não `@app.middleware("http")`) para não intermediar
+    o corpo das demais respostas, o que impediria o envio sem cópia de `MediaResponse`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            content_length = headers.get("content-length", "")
+            if (
+                headers.get("content-type", "").startswith("multipart/form-data")
+                and content_length.isdigit()
+                and int(content_length) > MAX_BYTES + MAX_FORM_OVERHEAD
+            ):
+                response = JSONResponse(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    content={"detail": _arquivo_muito_grande().detail},
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
+
+
+# <sha256>.<ext> ou <sha256>_<variante>.webp: o conteúdo de uma URL nunca muda
+_NOME_POR_HASH = re.compile(r"^([0-9a-f]{64}(?:_[a-z]+)?)\.[a-z0-9]+$")
+
+MEDIA_URL = "/" + UPLOAD_DIR.strip("/")
+
+
+class MediaResponse(FileResponse):
+    """
+    FileResponse que entrega o arquivo sem cópia (sendfile) quando o servidor ASGI
+    oferece a extensão `http.response.pathsend` ou `http.response.zerocopysend`.
+    Caso contrário, e para requisições HEAD ou com Range, usa o envio em blocos
+    do Starlette (que trata Range/If-Range e responde 206/416).
+    """
+
+    chunk_size = 256 * 1024
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        extensoes = scope.get("extensions") or {}
+        zero_copia = "http.response.pathsend" in extensoes or "http.response.zerocopysend" in extensoes
+        if (
+            not zero_copia
+            or self.stat_result is None
+            or scope["method"].upper() == "HEAD"
+            or "range" in Headers(scope=scope)
+        ):
+            return await super().__call__(scope, receive, send)
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if "http.response.pathsend" in extensoes:
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+        else:
+            with open(self.path, "rb") as arquivo:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": arquivo,
+                    "count": self.stat_result.st_size,
+                })
+
+
+class MediaFiles(StaticFiles):
+    """
+    Serve as imagens enviadas. Arquivos nomeados pelo hash do conteúdo recebem o
+    próprio hash como ETag forte e `Cache-Control: immutable` de um ano, então o
+    navegador não volta a pedi-los; os demais são revalidados a cada uso.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        nome_por_hash = _NOME_POR_HASH.match(os.path.basename(full_path))
+        if nome_por_hash:
+            headers = {
+                "ETag": f'"{nome_por_hash.group(1)}"',
+                "Cache-Control": "public, max-age=31536000, immutable",
+            }
+        else:
+            headers = {"Cache-Control": "no-cache"}
+
+        response = MediaResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return Response(status_code=304, headers={
+                nome: valor for nome, valor in response.headers.items()
+                if nome in ("etag", "cache-control", "last-modified")
+            })
+        return response
@@ -0,0 +1,143 @@
+"""
+Variantes reduzidas das imagens enviadas (miniatura para listagens e tamanho médio).
+
+Depois que um upload é aceito e salvo, `agendar_variantes` gera as variantes em
+segundo plano, num pool de processos (o redimensionamento usa CPU e não pode
+atrasar as requisições), e grava os caminhos nas colunas `path_imagem_thumb` e
+`path_imagem_medio` do registro. Como o nome do original é o hash do conteúdo,
+as variantes de uma imagem já conhecida são reaproveitadas na hora.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Union
+
+from sqlalchemy import update
+
+from config import settings
+from models.db import LocalAsyncSession, Professor, Projeto, Publicacao
+from .cache import invalidate_detalhes
+from .dependencies import invalidate_principal
+
+# Nome da variante -> maior lado, em pixels
+VARIANTES = {
+    "thumb": settings.uploads.THUMB_SIZE,
+    "medio": settings.uploads.MEDIO_SIZE,
+}
+IMAGE_WORKERS = settings.uploads.IMAGE_WORKERS
+
+Registro = Union[Projeto, Publicacao, Professor]
+
+logger = logging.getLogger("api.variantes")
+
+_executor: Optional[ProcessPoolExecutor] = None
+_tarefas: set[asyncio.Task] = set()
+
+
+def caminho_variante(caminho: str, variante: str) -> str:
+    base, _ = os.path.splitext(caminho)
+    return f"{base}_{variante}.webp"
+
+
+def gerar_variantes(caminho: str) -> dict[str, str]:
+    """Gera (se ainda não existirem) as variantes WebP de `caminho`. Roda no pool de processos."""
+    from PIL import Image, ImageOps
+
+    caminhos = {}
+    with Image.open(caminho) as original:
+        original = ImageOps.exif_transpose(original)
+        if original.mode not in ("RGB", "RGBA"):
+            original = original.convert("RGBA" if "A" in original.getbands() else "RGB")
+        for variante, tamanho in VARIANTES.items():
+            destino = caminho_variante(caminho, variante)
+            if not os.path.exists(destino):
+                imagem = original.copy()
+                imagem.thumbnail((tamanho, tamanho))
+                # Grava num arquivo temporário e renomeia: leitores nunca veem um arquivo pela metade
+                temporario = f"{destino}.{os.getpid()}.part"
+                imagem.save(temporario, "WEBP", quality=80)
+                os.replace(temporario, destino)
+            caminhos[f"path_imagem_{variante}"] = destino
+    return caminhos
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=IMAGE_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_image_executor():
+    """Encerra o pool de imagens (chamado no desligamento da aplicação)."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+async def aguardar_variantes(timeout: float):
+    """Espera as gerações agendadas terminarem (no desligamento); cancela as que passarem de `timeout`."""
+    if _tarefas:
+        _, pendentes = await asyncio.wait(set(_tarefas), timeout=timeout)
+        for tarefa in pendentes:
+            tarefa.cancel()
+        await asyncio.gather(*pendentes, return_exceptions=True)
+
+
+def aplicar_imagem(registro: Registro, caminho: str):
+    """
+    Define a imagem do registro. As variantes já existentes em disco (mesmo conteúdo
+    enviado antes) são usadas diretamente; as demais ficam vazias até serem geradas.
+    """
+    registro.path_imagem = caminho
+    for variante in VARIANTES:
+        destino = caminho_variante(caminho, variante)
+        setattr(registro, f"path_imagem_{variante}", destino if os.path.exists(destino) else None)
+
+
+def agendar_variantes(registro: Registro):
+    """Agenda a geração das variantes que faltam (chamar depois do commit)."""
+    if not registro.path_imagem or all(
+        getattr(registro, f"path_imagem_{variante}") for variante in VARIANTES
+    ):
+        return
+    tarefa = asyncio.create_task(
+        _processar(type(registro), registro.id, registro.path_imagem)
+    )
+    _tarefas.add(tarefa)  # Mantém a referência até a tarefa terminar
+    tarefa.add_done_callback(_tarefas.discard)
+
+
+async def _processar(modelo: type[Registro], registro_id: int, caminho: str):
+    loop = asyncio.get_running_loop()
+    try:
+        caminhos = await loop.run_in_executor(_get_executor(), gerar_variantes, caminho)
+    except Exception:
+        # Tarefa sem ninguém aguardando: o erro só aparece no log
+        logger.exception("Erro ao gerar as variantes de %s", caminho)
+        return
+
+    try:
+        async with LocalAsyncSession() as session:
+            # Só atualiza se a imagem não foi trocada enquanto as variantes eram geradas
+            await session.execute(
+                update(modelo)
+                .where(modelo.id == registro_id, modelo.path_imagem == caminho)
+                .values(**caminhos)
+            )
+            await session.commit()
+    except Exception:
+        logger.exception(
+            "Erro ao gravar as variantes de %s em %s %s", caminho, modelo.__tablename__, registro_id
+        )
+        return
+
+    invalidate_detalhes()
+    if modelo is Professor:
+        invalidate_principal("professor", registro_id)
@@ -1,16 +1,17 @@
 import asyncio
 
-from datetime import date
-from typing import Annotated, cast
+from datetime import date, datetime
+from typing import Annotated, Optional
 from urllib.parse import quote
 from sqlalchemy import (
     Engine,
     create_engine,
     ForeignKey,
+    Index,
     select,
     UniqueConstraint,
 )
-from sqlalchemy.dialects.mysql import VARCHAR
+from sqlalchemy.dialects.mysql import TIMESTAMP, VARCHAR
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
@@ -25,11 +26,14 @@ from sqlalchemy.orm import (
     DeclarativeBase,
     Session,
 )
-from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.engine import URL, make_url
 
 from config import settings
 from enums.status import ProjetoStatusEnum
 from enums.tipo import PublicacaoTipoEnum
+from models.fulltext import register_fts5
+from models import upsert
+from models.pool import AsyncPoolMonitorado, PoolMonitorado
 from models.db_annotations import (
     text,
     datetime_default_now,
@@ -38,49 +42,117 @@ from models.db_annotations import (
 )
 
 
-engine = cast(Engine, None)
+# Engines e fábricas de sessão são criados no primeiro uso (get_engine/get_async_engine):
+# importar os modelos não abre pools nem carrega os dialetos
+_engine: Optional[Engine] = None
 
-async_engine = cast(AsyncEngine, None)
+_async_engine: Optional[AsyncEngine] = None
 
-__async_session = cast(async_sessionmaker, None)
+_async_session: Optional[async_sessionmaker] = None
 
-__session = cast(sessionmaker, None)
+_session: Optional[sessionmaker] = None
 
 
-def setup_db():
-    global engine, async_engine, __async_session, __session
+def _com_driver(url: str, use_async: bool) -> URL:
+    """Ajusta o driver de uma URL completa (SQLite ou MySQL) para o modo sync/async."""
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite" if use_async else "sqlite")
+    return url.set(drivername="mysql+asyncmy" if use_async else "mysql+mysqldb")
 
-    engine = create_engine(
-        (
-            f"mysql+mysqldb://{settings.database.USERNAME}:{quote(settings.database.PASSWORD)}@"
-            f"{settings.database.HOST}:{settings.database.PORT}/{settings.database.DATABASE}"
-        ),
-        pool_size=256,
-        max_overflow=2048,
-        pool_recycle=3600,
-        echo=settings.DEBUG_ALCHEMY,
+
+def database_url(use_async: bool) -> URL | str:
+    """
+    Monta a URL de conexão a partir de `settings.database`.
+    Se `database.URL` estiver definida (ex.: "sqlite:///lab_web.db" para desenvolvimento),
+    ela tem precedência e apenas o driver é ajustado para o modo sync/async.
+    """
+    url = settings.database.get("URL")
+    if url:
+        return _com_driver(url, use_async)
+
+    driver = "mysql+asyncmy" if use_async else "mysql+mysqldb"
+    return (
+        f"{driver}://{settings.database.USERNAME}:{quote(settings.database.PASSWORD)}@"
+        f"{settings.database.HOST}:{settings.database.PORT}/{settings.database.DATABASE}"
     )
 
-    __session = sessionmaker(engine, autocommit=False)
-
-    async_engine = create_async_engine(
-        (
-            f"mysql+asyncmy://{settings.database.USERNAME}:{quote(settings.database.PASSWORD)}@"
-            f"{settings.database.HOST}:{settings.database.PORT}/{settings.database.DATABASE}"
-        ),
-        poolclass=AsyncAdaptedQueuePool,
-        pool_size=10,
-        max_overflow=2048,
-        pool_recycle=3600,
+
+def _pool_kwargs() -> dict:
+    """Dimensionamento dos pools a partir de `settings.database` (valores por worker)."""
+    return {
+        "pool_size": settings.database.POOL_SIZE,
+        "max_overflow": settings.database.MAX_OVERFLOW,
+        "pool_timeout": settings.database.POOL_TIMEOUT,
+        "pool_pre_ping": settings.database.POOL_PRE_PING,
+        "pool_recycle": settings.database.POOL_RECYCLE,
+    }
+
+
+def criar_async_engine(url: URL | str, nome_pool: str = AsyncPoolMonitorado.nome) -> AsyncEngine:
+    """Engine assíncrono com o pool monitorado e dimensionado por `settings.database`."""
+    engine = create_async_engine(
+        url,
+        poolclass=AsyncPoolMonitorado,
         echo=settings.DEBUG_ALCHEMY,
+        **_pool_kwargs(),
     )
+    engine.pool.nome = nome_pool
+    return engine
 
-    __async_session = async_sessionmaker(
-        async_engine, expire_on_commit=False, autoflush=False
-    )
+
+def replica_url(url: str) -> URL:
+    """URL assíncrona de uma réplica de leitura (`database.REPLICAS`)."""
+    return _com_driver(url, use_async=True)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Engine assíncrono usado pela aplicação (criado no primeiro uso)."""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = criar_async_engine(database_url(use_async=True))
+    return _async_engine
+
+
+def get_engine() -> Engine:
+    """Engine síncrono, para scripts e ferramentas que precisem dele. A aplicação não o usa."""
+    global _engine
+    if _engine is None:
+        _engine = create_engine(
+            database_url(use_async=False),
+            poolclass=PoolMonitorado,
+            echo=settings.DEBUG_ALCHEMY,
+            **_pool_kwargs(),
+        )
+    return _engine
+
+
+async def abrir_pools():
+    """
+    Cria o engine assíncrono e abre a primeira conexão do pool (no startup da
+    aplicação): um banco inacessível impede o início em vez de falhar na primeira requisição.
+    """
+    async with get_async_engine().connect():
+        pass
+
+
+async def fechar_pools():
+    """Fecha as conexões e descarta os engines criados (no desligamento da aplicação)."""
+    global _engine, _async_engine, _session, _async_session
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
+    _engine = _async_engine = _session = _async_session = None
 
 
-setup_db()
+def pool_stats() -> dict:
+    """Telemetria dos pools já criados neste processo."""
+    return {
+        engine.pool.nome: engine.pool.stats()
+        for engine in (_async_engine and _async_engine.sync_engine, _engine)
+        if engine is not None
+    }
 
 
 source_fk = Annotated[int, mapped_column(ForeignKey("source.id"))]
@@ -89,13 +161,19 @@ lock = asyncio.Lock()
 
 
 def LocalSession() -> Session:
-    global __session
-    return __session()
+    global _session
+    if _session is None:
+        _session = sessionmaker(get_engine(), autocommit=False)
+    return _session()
 
 
 def LocalAsyncSession() -> AsyncSession:
-    global __async_session
-    return __async_session()
+    global _async_session
+    if _async_session is None:
+        _async_session = async_sessionmaker(
+            get_async_engine(), expire_on_commit=False, autoflush=False
+        )
+    return _async_session()
 
 
 class BaseModel(DeclarativeBase):
@@ -104,43 +182,50 @@ class BaseModel(DeclarativeBase):
 
 class Professor(BaseModel):
     __tablename__ = "professor"
+    __table_args__ = (
+        # Únicos: identificam o professor (login, cadastro e get_or_create)
+        Index("ix_professor_email", "email", unique=True),
+        Index("ix_professor_cpf", "cpf", unique=True),
+    )
 
     id: Mapped[big_intpk]
     nome: Mapped[str] = mapped_column(VARCHAR(255))
     email: Mapped[str] = mapped_column(VARCHAR(255))
     senha: Mapped[str] = mapped_column(VARCHAR(255))
     path_imagem: Mapped[str | None] = mapped_column(VARCHAR(255))
+    # Variantes reduzidas da imagem (ver api/variantes.py), geradas em segundo plano
+    path_imagem_thumb: Mapped[str | None] = mapped_column(VARCHAR(255))
+    path_imagem_medio: Mapped[str | None] = mapped_column(VARCHAR(255))
     cpf: Mapped[str] = mapped_column(VARCHAR(11))
+    # Incrementado para revogar os tokens de acesso já emitidos (ex.: troca de senha)
+    token_version: Mapped[int] = mapped_column(default=0, server_default="0")
 
     link_projetos: Mapped[list["ProjetoProfessor"]] = relationship(back_populates="professor")
     publicacoes: Mapped[list["Publicacao"]] = relationship(back_populates="professor")
 
     @staticmethod
     async def get_or_create(session: AsyncSession, nome: str, email: str, senha: str, cpf: str):
-        just_created = False
-
-        professor = await session.scalar(
-            select(Professor).where(
-                Professor.nome == nome,
-                Professor.cpf == cpf,
-            )
-        )
-        if not professor:
-            professor = Professor(nome=nome, email=email, senha=senha, cpf=cpf)
-            just_created = True
-            session.add(professor)
-            await session.commit()
-
-        return professor, just_created
+        return await upsert.get_or_create(session, Professor, nome=nome, email=email, senha=senha, cpf=cpf)
 
 
 class Projeto(BaseModel):
     __tablename__ = "projeto"
+    __table_args__ = (
+        # Paginação por chave (cursor) em /projetos/listar
+        Index("ix_projeto_data_inicio_id", "data_inicio", "id"),
+        # Verificação de título duplicado entre projetos ativos
+        Index("ix_projeto_status_titulo", "status", "titulo"),
+        # Busca textual (ver models/fulltext.py para o equivalente no SQLite)
+        Index("ft_projeto_titulo_descricao", "titulo", "descricao", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id: Mapped[big_intpk]
     titulo: Mapped[str] = mapped_column(VARCHAR(255))
     descricao: Mapped[text | None]
     path_imagem: Mapped[str] = mapped_column(VARCHAR(255))
+    # Variantes reduzidas da imagem (ver api/variantes.py), geradas em segundo plano
+    path_imagem_thumb: Mapped[str | None] = mapped_column(VARCHAR(255))
+    path_imagem_medio: Mapped[str | None] = mapped_column(VARCHAR(255))
     data_inicio: Mapped[date]
     data_fim: Mapped[date | None]
     status: Mapped[ProjetoStatusEnum] = mapped_column(default=ProjetoStatusEnum.ATIVO)
@@ -151,6 +236,7 @@ class Projeto(BaseModel):
     publicacoes: Mapped[list["Publicacao"]] = relationship(back_populates="projeto")
     curso: Mapped["Curso"] = relationship(back_populates="projetos")
 
+    # Sem chave natural única (títulos podem se repetir), então não usa upsert.get_or_create
     @staticmethod
     async def get_or_create(session: AsyncSession, titulo: str, path_imagem: str, data_inicio: date, status: ProjetoStatusEnum, publico: str, curso_id: int):
         just_created = False
@@ -171,6 +257,9 @@ class Projeto(BaseModel):
 
 class Curso(BaseModel):
     __tablename__ = "curso"
+    __table_args__ = (
+        Index("uq_curso_departamento_id_nome", "departamento_id", "nome", unique=True),
+    )
 
     id: Mapped[big_intpk]
     nome: Mapped[str] = mapped_column(VARCHAR(255))
@@ -181,22 +270,14 @@ class Curso(BaseModel):
 
     @staticmethod
     async def get_or_create(session: AsyncSession, nome: str, departamento_id: int):
-        just_created = False
-
-        curso = await session.scalar(
-            select(Curso).where(Curso.nome == nome)
-        )
-        if not curso:
-            curso = Curso(nome=nome, departamento_id=departamento_id)
-            just_created = True
-            session.add(curso)
-            await session.commit()
-
-        return curso, just_created
+        return await upsert.get_or_create(session, Curso, nome=nome, departamento_id=departamento_id)
     
 
 class Departamento(BaseModel):
     __tablename__ = "departamento"
+    __table_args__ = (
+        Index("uq_departamento_campus_id_nome", "campus_id", "nome", unique=True),
+    )
 
     id: Mapped[big_intpk]
     nome: Mapped[str] = mapped_column(VARCHAR(255))
@@ -207,22 +288,14 @@ class Departamento(BaseModel):
 
     @staticmethod
     async def get_or_create(session: AsyncSession, nome: str, campus_id: int):
-        just_created = False
-
-        departamento = await session.scalar(
-            select(Departamento).where(Departamento.nome == nome)
-        )
-        if not departamento:
-            departamento = Departamento(nome=nome, campus_id=campus_id)
-            just_created = True
-            session.add(departamento)
-            await session.commit()
-
-        return departamento, just_created
+        return await upsert.get_or_create(session, Departamento, nome=nome, campus_id=campus_id)
     
 
 class Campus(BaseModel):
     __tablename__ = "campus"
+    __table_args__ = (
+        Index("uq_campus_nome", "nome", unique=True),
+    )
 
     id: Mapped[big_intpk]
     nome: Mapped[str] = mapped_column(VARCHAR(255))
@@ -231,35 +304,40 @@ class Campus(BaseModel):
 
     @staticmethod
     async def get_or_create(session: AsyncSession, nome: str):
-        just_created = False
-
-        campus = await session.scalar(
-            select(Campus).where(Campus.nome == nome)
-        )
-        if not campus:
-            campus = Campus(nome=nome)
-            just_created = True
-            session.add(campus)
-            await session.commit()
-
-        return campus, just_created
+        return await upsert.get_or_create(session, Campus, nome=nome)
     
 
 class Publicacao(BaseModel):
     __tablename__ = "publicacao"
+    __table_args__ = (
+        # Paginação por chave (cursor) em /postagens/listar
+        Index("ix_publicacao_data_publicacao_id", "data_publicacao", "id"),
+        # Publicações do professor logado (/postagens/me)
+        Index("ix_publicacao_professor_id_data_publicacao", "professor_id", "data_publicacao"),
+        # Carregamento de Projeto.publicacoes. No MySQL o InnoDB já cria este índice para a chave estrangeira.
+        Index("ix_publicacao_projeto_id", "projeto_id").ddl_if(dialect="sqlite"),
+        # Busca textual (ver models/fulltext.py para o equivalente no SQLite)
+        Index("ft_publicacao_titulo_conteudo", "titulo", "conteudo", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id: Mapped[big_intpk]
     titulo: Mapped[str] = mapped_column(VARCHAR(255))
-    conteudo: Mapped[longtext]
+    # Adiado: só é lido com undefer (ver api/carregamento.py). Os resumos de
+    # publicação (id e título) não trazem o texto, que pode ter megabytes
+    conteudo: Mapped[longtext] = mapped_column(deferred=True, deferred_raiseload=True)
     tipo: Mapped[PublicacaoTipoEnum]
     data_publicacao: Mapped[datetime_default_now]
     path_imagem: Mapped[str] = mapped_column(VARCHAR(255))
+    # Variantes reduzidas da imagem (ver api/variantes.py), geradas em segundo plano
+    path_imagem_thumb: Mapped[str | None] = mapped_column(VARCHAR(255))
+    path_imagem_medio: Mapped[str | None] = mapped_column(VARCHAR(255))
     professor_id: Mapped[int] = mapped_column(ForeignKey("professor.id"))
     projeto_id: Mapped[int] = mapped_column(ForeignKey("projeto.id"))
 
     professor: Mapped["Professor"] = relationship(back_populates="publicacoes")
     projeto: Mapped["Projeto"] = relationship(back_populates="publicacoes")
 
+    # Sem chave natural única (títulos podem se repetir), então não usa upsert.get_or_create
     @staticmethod
     async def get_or_create(session: AsyncSession, titulo: str, conteudo: str, tipo: PublicacaoTipoEnum, path_imagem: str, professor_id: int, projeto_id: int): 
         just_created = False
@@ -280,34 +358,29 @@ class Publicacao(BaseModel):
 
 class Administrador(BaseModel):
     __tablename__ = "administrador"
+    __table_args__ = (
+        Index("ix_administrador_email", "email", unique=True),
+    )
 
     id: Mapped[big_intpk]
     nome: Mapped[str] = mapped_column(VARCHAR(255))
     email: Mapped[str] = mapped_column(VARCHAR(255))
     senha: Mapped[str] = mapped_column(VARCHAR(255))
+    # Incrementado para revogar os tokens de acesso já emitidos
+    token_version: Mapped[int] = mapped_column(default=0, server_default="0")
 
     @staticmethod
     async def get_or_create(session: AsyncSession, nome: str, email: str, senha: str):
-        just_created = False
-
-        administrador = await session.scalar(
-            select(Administrador).where(
-                Administrador.nome == nome,
-                Administrador.email == email,
-            )
-        )
-        if not administrador:
-            administrador = Administrador(nome=nome, email=email, senha=senha)
-            just_created = True
-            session.add(administrador)
-            await session.commit()
-
-        return administrador, just_created
+        return await upsert.get_or_create(session, Administrador, nome=nome, email=email, senha=senha)
     
 
 class ProjetoProfessor(BaseModel):
     __tablename__ = "projeto_professor"
-    __table_args__ = (UniqueConstraint("projeto_id", "professor_id"),)
+    __table_args__ = (
+        UniqueConstraint("projeto_id", "professor_id"),
+        # Projetos do professor logado (/projetos/me)
+        Index("ix_projeto_professor_professor_id", "professor_id"),
+    )
 
     id: Mapped[big_intpk]
     projeto_id: Mapped[int] = mapped_column(ForeignKey("projeto.id"))
@@ -318,25 +391,36 @@ class ProjetoProfessor(BaseModel):
 
     @staticmethod
     async def get_or_create(session: AsyncSession, projeto_id: str, professor_id: str):
-        just_created = False
+        return await upsert.get_or_create(session, ProjetoProfessor, projeto_id=projeto_id, professor_id=professor_id)
+
+
+class EmailOutbox(BaseModel):
+    """
+    Fila de saída de e-mails. As rotas só inserem a linha (na mesma transação dos
+    dados que originam o e-mail); o envio é feito pelo worker de api/email_service.py.
+    """
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        # Busca dos e-mails pendentes pelo worker de entrega
+        Index("ix_email_outbox_enviado_em_proxima_tentativa", "enviado_em", "proxima_tentativa"),
+    )
+
+    id: Mapped[big_intpk]
+    destinatario: Mapped[str] = mapped_column(VARCHAR(255))
+    assunto: Mapped[str] = mapped_column(VARCHAR(255))
+    corpo: Mapped[text] # Esvaziado após o envio ou a última tentativa (pode conter senhas temporárias)
+    criado_em: Mapped[datetime_default_now]
+    proxima_tentativa: Mapped[datetime_default_now]
+    tentativas: Mapped[int] = mapped_column(default=0, server_default="0")
+    enviado_em: Mapped[datetime | None] = mapped_column(TIMESTAMP, nullable=True)
+    ultimo_erro: Mapped[str | None] = mapped_column(VARCHAR(255))
 
-        projeto_professor = await session.scalar(
-            select(ProjetoProfessor).where(
-                ProjetoProfessor.projeto_id == projeto_id,
-                ProjetoProfessor.professor_id == professor_id,
-            )
-        )
-        if not projeto_professor:
-            projeto_professor = ProjetoProfessor(projeto_id=projeto_id, professor_id=professor_id)
-            just_created = True
-            session.add(projeto_professor)
-            await session.commit()
 
-        return projeto_professor, just_created
+register_fts5(BaseModel.metadata)
 
 
 async def create_all():
-    async with async_engine.begin() as conn:
+    async with get_async_engine().begin() as conn:
         await conn.run_sync(BaseModel.metadata.create_all)
 
 
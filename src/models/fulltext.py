@@ -0,0 +1,58 @@
+from sqlalchemy import DDL, MetaData, event
+
+
+# Colunas indexadas para busca textual, por tabela.
+# No MySQL viram índices FULLTEXT (declarados nos modelos);
+# no SQLite viram tabelas virtuais FTS5 "<tabela>_fts" sincronizadas por triggers.
+FULLTEXT_COLUMNS = {
+    "projeto": ("titulo", "descricao"),
+    "publicacao": ("titulo", "conteudo"),
+}
+
+
+def fts5_table(tabela: str) -> str:
+    return f"{tabela}_fts"
+
+
+def _fts5_ddl(tabela: str, colunas: tuple[str, ...]) -> list[str]:
+    fts = fts5_table(tabela)
+    cols = ", ".join(colunas)
+    new_cols = ", ".join(f"new.{c}" for c in colunas)
+    old_cols = ", ".join(f"old.{c}" for c in colunas)
+    return [
+        (
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{cols}, content='{tabela}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        ),
+        (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tabela} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+        ),
+        (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tabela} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); END"
+        ),
+        (
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {tabela} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols}); END"
+        ),
+        # Indexa as linhas que já existiam antes da criação da tabela virtual
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def register_fts5(metadata: MetaData):
+    """
+    Registra a criação das tabelas FTS5 (apenas no SQLite) junto com o `create_all`.
+    """
+    for tabela, colunas in FULLTEXT_COLUMNS.items():
+        for statement in _fts5_ddl(tabela, colunas):
+            event.listen(
+                metadata, "after_create", DDL(statement).execute_if(dialect="sqlite")
+            )
+        event.listen(
+            metadata,
+            "before_drop",
+            DDL(f"DROP TABLE IF EXISTS {fts5_table(tabela)}").execute_if(dialect="sqlite"),
+        )
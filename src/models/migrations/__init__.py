@@ -0,0 +1,112 @@
+"""
+Migrações versionadas do esquema do banco.
+
+Cada migração é um módulo `mNNNN_<descricao>.py` deste pacote que define:
+
+    VERSION: int
+    DESCRIPTION: str
+    def upgrade(conn: Connection) -> None
+
+As migrações recebem uma conexão síncrona (via `run_sync`) e devem ser
+idempotentes, usando os helpers de `models.migrations.ops`: assim o esquema
+evolui sem recriar tabelas, e um banco novo (criado pela migração inicial já
+com o esquema atual) passa pelas migrações seguintes sem erro.
+As versões aplicadas ficam registradas na tabela `schema_version`.
+
+Uso:
+    python -m models.migrations            # aplica as migrações pendentes
+    python -m models.migrations status     # mostra as versões aplicadas/pendentes
+"""
+import asyncio
+import importlib
+import pkgutil
+import re
+import sys
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import Column, Integer, MetaData, String, Table, DateTime, select, insert
+from sqlalchemy.engine import Connection
+
+import models.db as db
+
+_MODULO_MIGRACAO = re.compile(r"^m\d{4}_\w+$")
+
+_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    _metadata,
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+def load_migrations() -> list[ModuleType]:
+    """Importa e retorna os módulos de migração, ordenados pela versão."""
+    migracoes = [
+        importlib.import_module(f"{__name__}.{info.name}")
+        for info in pkgutil.iter_modules(__path__)
+        if _MODULO_MIGRACAO.match(info.name)
+    ]
+    migracoes.sort(key=lambda m: m.VERSION)
+
+    versoes = [m.VERSION for m in migracoes]
+    if len(versoes) != len(set(versoes)):
+        raise RuntimeError(f"Versões de migração duplicadas: {versoes}")
+    return migracoes
+
+
+def _versoes_aplicadas(conn: Connection) -> set[int]:
+    _metadata.create_all(conn, checkfirst=True)
+    return set(conn.scalars(select(schema_version.c.version)))
+
+
+async def applied_versions() -> set[int]:
+    async with db.get_async_engine().begin() as conn:
+        return await conn.run_sync(_versoes_aplicadas)
+
+
+async def upgrade() -> list[int]:
+    """
+    Aplica, em ordem, as migrações ainda não registradas em `schema_version`.
+    Cada migração roda na sua própria transação. Retorna as versões aplicadas.
+    """
+    aplicadas = await applied_versions()
+    novas = []
+
+    for migracao in load_migrations():
+        if migracao.VERSION in aplicadas:
+            continue
+
+        async with db.get_async_engine().begin() as conn:
+            await conn.run_sync(migracao.upgrade)
+            await conn.execute(
+                insert(schema_version).values(
+                    version=migracao.VERSION,
+                    description=migracao.DESCRIPTION,
+                    applied_at=datetime.now(),
+                )
+            )
+        novas.append(migracao.VERSION)
+        print(f"Migração {migracao.VERSION:04d} aplicada: {migracao.DESCRIPTION}")
+
+    return novas
+
+
+async def status():
+    aplicadas = await applied_versions()
+    for migracao in load_migrations():
+        marca = "x" if migracao.VERSION in aplicadas else " "
+        print(f"[{marca}] {migracao.VERSION:04d} {migracao.DESCRIPTION}")
+
+
+def main():
+    comando = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if comando == "upgrade":
+        asyncio.run(upgrade())
+    elif comando == "status":
+        asyncio.run(status())
+    else:
+        sys.exit(f"Comando desconhecido: {comando} (use 'upgrade' ou 'status')")
@@ -0,0 +1,3 @@
+from models.migrations import main
+
+main()
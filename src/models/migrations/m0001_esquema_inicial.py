@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+
+from models.migrations import ops
+
+VERSION = 1
+DESCRIPTION = "Esquema inicial (cria as tabelas que ainda não existem)"
+
+
+def upgrade(conn: Connection):
+    ops.create_missing_tables(conn)
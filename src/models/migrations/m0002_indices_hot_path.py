@@ -0,0 +1,28 @@
+from sqlalchemy.engine import Connection
+
+from models.migrations import ops
+
+VERSION = 2
+DESCRIPTION = "Índices das consultas mais frequentes (login, listagens, paginação e busca)"
+
+# projeto.data_inicio e publicacao.data_publicacao são cobertos pelo prefixo
+# dos índices compostos usados na paginação por cursor.
+# Definições congeladas (não as do modelo): os de e-mail só ficam únicos na 0007.
+INDICES = [
+    ops.index("professor", "ix_professor_email", "email"),
+    ops.index("administrador", "ix_administrador_email", "email"),
+    ops.index("projeto", "ix_projeto_status_titulo", "status", "titulo"),
+    ops.index("projeto", "ix_projeto_data_inicio_id", "data_inicio", "id"),
+    ops.index("projeto", "ft_projeto_titulo_descricao", "titulo", "descricao", dialect="mysql", mysql_prefix="FULLTEXT"),
+    ops.index("publicacao", "ix_publicacao_data_publicacao_id", "data_publicacao", "id"),
+    ops.index("publicacao", "ix_publicacao_professor_id_data_publicacao", "professor_id", "data_publicacao"),
+    # No MySQL o InnoDB já cria este índice para a chave estrangeira
+    ops.index("publicacao", "ix_publicacao_projeto_id", "projeto_id", dialect="sqlite"),
+    ops.index("publicacao", "ft_publicacao_titulo_conteudo", "titulo", "conteudo", dialect="mysql", mysql_prefix="FULLTEXT"),
+    ops.index("projeto_professor", "ix_projeto_professor_professor_id", "professor_id"),
+]
+
+
+def upgrade(conn: Connection):
+    for indice in INDICES:
+        ops.create_index(conn, indice)
@@ -0,0 +1,11 @@
+from sqlalchemy.engine import Connection
+
+from models.migrations import ops
+
+VERSION = 3
+DESCRIPTION = "Versão do token de acesso em professor e administrador"
+
+
+def upgrade(conn: Connection):
+    ops.add_column(conn, "professor", "token_version")
+    ops.add_column(conn, "administrador", "token_version")
@@ -0,0 +1,12 @@
+from sqlalchemy.engine import Connection
+
+from models.migrations import ops
+
+VERSION = 4
+DESCRIPTION = "Caminhos das variantes reduzidas (miniatura e média) das imagens"
+
+
+def upgrade(conn: Connection):
+    for tabela in ("projeto", "publicacao", "professor"):
+        ops.add_column(conn, tabela, "path_imagem_thumb")
+        ops.add_column(conn, tabela, "path_imagem_medio")
@@ -0,0 +1,10 @@
+from sqlalchemy.engine import Connection
+
+from models.migrations import ops
+
+VERSION = 5
+DESCRIPTION = "Fila de saída de e-mails (email_outbox)"
+
+
+def upgrade(conn: Connection):
+    ops.create_table(conn, "email_outbox")
@@ -0,0 +1,14 @@
+from sqlalchemy.engine import Connection
+
+from models.migrations import ops
+
+VERSION = 6
+DESCRIPTION = "Índice de CPF do professor (verificação de duplicados no cadastro)"
+
+
+# Não único aqui: a unicidade vem na 0007, depois da verificação de duplicados
+INDICE_CPF = ops.index("professor", "ix_professor_cpf", "cpf")
+
+
+def upgrade(conn: Connection):
+    ops.create_index(conn, INDICE_CPF)
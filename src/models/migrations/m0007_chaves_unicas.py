@@ -0,0 +1,30 @@
+from sqlalchemy.engine import Connection
+
+from models.migrations import ops
+
+VERSION = 7
+DESCRIPTION = "Chaves únicas usadas pelo upsert (campus, departamento, curso, professor, administrador)"
+
+
+NOVOS = [
+    ops.index("campus", "uq_campus_nome", "nome", unique=True),
+    ops.index("departamento", "uq_departamento_campus_id_nome", "campus_id", "nome", unique=True),
+    ops.index("curso", "uq_curso_departamento_id_nome", "departamento_id", "nome", unique=True),
+]
+# Índices criados pelas migrações 0002 e 0006 que passam a ser únicos
+TORNADOS_UNICOS = [
+    ops.index("professor", "ix_professor_email", "email", unique=True),
+    ops.index("professor", "ix_professor_cpf", "cpf", unique=True),
+    ops.index("administrador", "ix_administrador_email", "email", unique=True),
+]
+
+
+def upgrade(conn: Connection):
+    # O get_or_create antigo (SELECT e depois INSERT) podia duplicar linhas: verifica
+    # todas as chaves antes de alterar qualquer índice
+    ops.check_unique(conn, NOVOS + TORNADOS_UNICOS)
+
+    for indice in NOVOS:
+        ops.create_index(conn, indice)
+    for indice in TORNADOS_UNICOS:
+        ops.recreate_index(conn, indice)
@@ -0,0 +1,114 @@
+"""
+Operações idempotentes de esquema usadas pelas migrações.
+
+Todas recebem uma conexão síncrona e consultam o estado atual do banco antes
+de alterar algo, para que uma migração possa rodar sobre um banco recém-criado
+(que já tem o esquema atual) ou sobre um banco antigo.
+"""
+from sqlalchemy import Column, Index, MetaData, Table, func, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import CreateColumn
+
+from models.db import BaseModel
+
+
+# Chaves repetidas listadas por índice quando `check_unique` falha
+_DUPLICADOS_LISTADOS = 20
+
+
+def _tabela(nome: str):
+    return BaseModel.metadata.tables[nome]
+
+
+def index(tabela: str, nome: str, *colunas: str, unique: bool = False, dialect: str | None = None, **kwargs) -> Index:
+    """
+    Definição de um índice congelada na migração. Os índices são criados a partir
+    desta definição, e não do modelo atual: se o modelo mudar depois (ex.: o índice
+    passar a ser único), a migração antiga continua criando o mesmo índice.
+    `dialect` restringe o índice a um dialeto (`ddl_if`); `kwargs` são os do `Index`
+    (ex.: `mysql_prefix="FULLTEXT"`).
+    """
+    # Tabela avulsa, só com os nomes das colunas: não altera os índices do modelo
+    avulsa = Table(tabela, MetaData(), *(Column(coluna) for coluna in colunas))
+    indice = Index(nome, *(avulsa.c[coluna] for coluna in colunas), unique=unique, **kwargs)
+    return indice.ddl_if(dialect=dialect) if dialect else indice
+
+
+def create_missing_tables(conn: Connection):
+    """Cria as tabelas (e seus índices) que ainda não existem no banco."""
+    BaseModel.metadata.create_all(conn, checkfirst=True)
+
+
+def create_table(conn: Connection, tabela: str):
+    """Cria a `tabela` declarada nos modelos (com seus índices), se ela ainda não existir."""
+    _tabela(tabela).create(conn, checkfirst=True)
+
+
+def create_index(conn: Connection, indice: Index):
+    """
+    Cria o `indice` (ver `index`), se ainda não existir um índice com esse nome.
+    Respeita as restrições de dialeto do índice (`ddl_if`).
+    """
+    indice.create(conn, checkfirst=True)
+
+
+def recreate_index(conn: Connection, indice: Index):
+    """
+    Recria o `indice` (ver `index`) se a definição no banco (colunas ou unicidade) for
+    diferente, ou o cria se ainda não existir. Tornar um índice único falha se a
+    tabela já tiver valores repetidos nessas colunas: verifique antes com `check_unique`.
+    """
+    tabela = indice.table.name
+    existente = next(
+        (ix for ix in inspect(conn).get_indexes(tabela) if ix["name"] == indice.name), None
+    )
+    if existente is not None:
+        if bool(existente["unique"]) == bool(indice.unique) and existente["column_names"] == [c.name for c in indice.columns]:
+            return
+        indice.drop(conn)
+    indice.create(conn)
+
+
+def check_unique(conn: Connection, indices: list[Index]):
+    """
+    Verifica se os índices únicos `indices` (ver `index`) podem ser criados sobre os
+    dados atuais. Se alguma chave se repete, aborta a migração listando as chaves
+    repetidas (até `_DUPLICADOS_LISTADOS` por índice), que precisam ser resolvidas à
+    mão antes de rodar de novo.
+    Chame antes de qualquer DDL da migração: no MySQL o DDL não é desfeito no rollback.
+    """
+    erros = []
+    for indice in indices:
+        tabela = indice.table.name
+        colunas = list(indice.columns)
+        repetidas = conn.execute(
+            select(*colunas, func.count().label("linhas"))
+            .select_from(indice.table)
+            .group_by(*colunas)
+            .having(func.count() > 1)
+            .order_by(func.count().desc())
+            .limit(_DUPLICADOS_LISTADOS)
+        ).all()
+        if repetidas:
+            chaves = "; ".join(
+                f"{', '.join(f'{c.name}={v!r}' for c, v in zip(colunas, linha[:-1]))} ({linha[-1]} linhas)"
+                for linha in repetidas
+            )
+            erros.append(f"{tabela}.{indice.name}: {chaves}")
+    if erros:
+        raise RuntimeError(
+            "Valores repetidos impedem a criação de índices únicos (remova ou una as linhas e rode de novo):\n  "
+            + "\n  ".join(erros)
+        )
+
+
+def add_column(conn: Connection, tabela: str, coluna: str):
+    """
+    Adiciona a `coluna`, declarada no modelo da `tabela`, se ela ainda não existir.
+    Colunas NOT NULL precisam de `server_default` para serem adicionadas a tabelas com dados.
+    """
+    existentes = {c["name"] for c in inspect(conn).get_columns(tabela)}
+    if coluna in existentes:
+        return
+    definicao = CreateColumn(_tabela(tabela).c[coluna]).compile(dialect=conn.dialect)
+    conn.exec_driver_sql(f"ALTER TABLE {tabela} ADD COLUMN {definicao}")
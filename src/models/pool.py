@@ -0,0 +1,98 @@
+"""
+Pools de conexão com telemetria (usados pelos engines de `models.db`).
+
+Além do que o QueuePool já expõe (conexões em uso, ociosas e overflow), cada pool
+conta os checkouts, o tempo de espera por uma conexão (fila quando o pool e o
+overflow estão esgotados, mais a abertura de conexões novas), os timeouts e o
+maior número de conexões em uso ao mesmo tempo. Os números são do processo
+(worker) e recomeçam quando o pool é recriado (`engine.dispose()`).
+"""
+import time
+from typing import Callable
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Chamados com o pool a cada checkout/checkin (ex.: gauges do /metrics)
+observadores: list[Callable[["_PoolMonitorado"], None]] = []
+
+# Esperas acima deste tempo (s) são contadas em `checkouts_com_espera`
+ESPERA_RELEVANTE = 0.001
+
+
+class TelemetriaPool:
+    __slots__ = ("checkouts", "checkouts_com_espera", "espera_total", "espera_max", "timeouts", "pico_em_uso")
+
+    def __init__(self):
+        self.checkouts = 0
+        self.checkouts_com_espera = 0
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+        self.timeouts = 0
+        self.pico_em_uso = 0
+
+
+class _PoolMonitorado:
+    nome = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.telemetria = TelemetriaPool()
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            conexao = super().connect()
+        except exc.TimeoutError:
+            self.telemetria.timeouts += 1
+            raise
+        espera = time.perf_counter() - inicio
+
+        telemetria = self.telemetria
+        telemetria.checkouts += 1
+        telemetria.espera_total += espera
+        telemetria.espera_max = max(telemetria.espera_max, espera)
+        if espera > ESPERA_RELEVANTE:
+            telemetria.checkouts_com_espera += 1
+        telemetria.pico_em_uso = max(telemetria.pico_em_uso, self.checkedout())
+        self._notificar()
+        return conexao
+
+    def recreate(self):
+        # O pool novo (engine.dispose()) mantém o nome
+        pool = super().recreate()
+        pool.nome = self.nome
+        return pool
+
+    def _do_return_conn(self, record):
+        super()._do_return_conn(record)
+        self._notificar()
+
+    def _notificar(self):
+        for observador in observadores:
+            observador(self)
+
+    def stats(self) -> dict:
+        telemetria = self.telemetria
+        return {
+            "tamanho": self.size(),
+            "max_overflow": self._max_overflow,
+            "timeout_s": self.timeout(),
+            "em_uso": self.checkedout(),
+            "ociosas": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "pico_em_uso": telemetria.pico_em_uso,
+            "checkouts": telemetria.checkouts,
+            "checkouts_com_espera": telemetria.checkouts_com_espera,
+            "espera_media_ms": round(telemetria.espera_total * 1000 / telemetria.checkouts, 3) if telemetria.checkouts else 0.0,
+            "espera_max_ms": round(telemetria.espera_max * 1000, 3),
+            "timeouts": telemetria.timeouts,
+        }
+
+
+class PoolMonitorado(_PoolMonitorado, QueuePool):
+    nome = "sync"
+
+
+class AsyncPoolMonitorado(_PoolMonitorado, AsyncAdaptedQueuePool):
+    nome = "async"
@@ -0,0 +1,144 @@
+"""
+Réplicas de leitura (opcionais) para as rotas públicas de consulta.
+
+Com `database.REPLICAS` definida, `abrir_sessao_leitura` alterna (round-robin) entre
+as réplicas. Antes de entregar a sessão, ela abre a conexão: o `pool_pre_ping`
+verifica a réplica. Uma réplica que falha fica fora do rodízio por
+`REPLICA_QUARENTENA` segundos e a próxima é tentada. Sem réplica disponível, a
+leitura vai para o primário.
+
+Ficam sempre no primário:
+- as escritas (`LocalAsyncSession`/`get_db_session`);
+- as leituras de usuários autenticados, que são quem escreve: eles veem as
+  próprias alterações (read-your-writes);
+- por `REPLICA_ATRASO_MAX` segundos depois de um commit com escrita neste
+  processo, todas as leituras, para que os caches invalidados pela escrita sejam
+  reconstruídos com os dados novos mesmo se a réplica estiver atrasada.
+
+Para testar localmente, aponte `REPLICAS` para outro arquivo SQLite (ex.:
+`["sqlite:////tmp/replica.db"]`) com o mesmo esquema.
+"""
+import itertools
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from config import settings
+from models import db
+
+REPLICAS: list[str] = list(settings.database.get("REPLICAS") or [])
+QUARENTENA = settings.database.REPLICA_QUARENTENA
+ATRASO_MAX = settings.database.REPLICA_ATRASO_MAX
+
+logger = logging.getLogger("models.replicas")
+
+
+class Replica:
+    __slots__ = ("nome", "engine", "sessoes", "falhou_em")
+
+    def __init__(self, nome: str, engine: AsyncEngine):
+        self.nome = nome
+        self.engine = engine
+        self.sessoes = async_sessionmaker(engine, expire_on_commit=False, autoflush=False)
+        self.falhou_em: Optional[float] = None
+
+    def disponivel(self, agora: float) -> bool:
+        return self.falhou_em is None or agora - self.falhou_em >= QUARENTENA
+
+
+# Engines das réplicas: criados no primeiro uso, como os de `models.db`
+_replicas: Optional[list[Replica]] = None
+_rodizio = itertools.count()
+_ultima_escrita = float("-inf")
+
+
+def _get_replicas() -> list[Replica]:
+    global _replicas
+    if _replicas is None:
+        _replicas = [
+            Replica(f"replica-{i}", db.criar_async_engine(db.replica_url(url), nome_pool=f"replica-{i}"))
+            for i, url in enumerate(REPLICAS, 1)
+        ]
+    return _replicas
+
+
+# Pelo texto: `context.isinsert` etc. não cobrem `text()` nem `exec_driver_sql`
+_ESCRITAS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+def _depois_do_comando(conn, cursor, statement, parameters, context, executemany):
+    if cursor.rowcount != 0 and statement.lstrip()[:7].upper().startswith(_ESCRITAS):
+        conn.info["escreveu"] = True
+
+
+def _commit(conn):
+    global _ultima_escrita
+    if conn.info.pop("escreveu", False):
+        _ultima_escrita = time.monotonic()
+
+
+def _rollback(conn):
+    conn.info.pop("escreveu", None)
+
+
+def registrar_escritas():
+    """
+    Registra os commits com escrita (uma vez, no import da aplicação). Os eventos
+    ficam na classe Engine, mas só o primário recebe escritas.
+    """
+    event.listen(Engine, "after_cursor_execute", _depois_do_comando)
+    event.listen(Engine, "commit", _commit)
+    event.listen(Engine, "rollback", _rollback)
+
+
+async def abrir_sessao_leitura(primario: bool = False) -> AsyncSession:
+    """
+    Sessão somente leitura numa réplica disponível, já conectada. Com `primario`,
+    logo depois de uma escrita ou sem réplicas disponíveis, usa o primário.
+    """
+    agora = time.monotonic()
+    if primario or not REPLICAS or agora - _ultima_escrita < ATRASO_MAX:
+        return db.LocalAsyncSession()
+
+    replicas = _get_replicas()
+    inicio = next(_rodizio)
+    for deslocamento in range(len(replicas)):
+        replica = replicas[(inicio + deslocamento) % len(replicas)]
+        if not replica.disponivel(agora):
+            continue
+        session = replica.sessoes()
+        session.info["replica"] = replica
+        try:
+            await session.connection()
+            replica.falhou_em = None
+            return session
+        except (exc.DBAPIError, exc.TimeoutError) as e:
+            await session.close()
+            registrar_falha(replica, e)
+    return db.LocalAsyncSession()
+
+
+def registrar_falha(replica: Replica, erro: Exception):
+    """Tira a réplica do rodízio por `QUARENTENA` segundos."""
+    replica.falhou_em = time.monotonic()
+    logger.warning("Réplica %s indisponível por %ss: %s", replica.nome, QUARENTENA, erro)
+
+
+def pool_stats() -> dict:
+    """Telemetria dos pools das réplicas, com o estado de cada uma."""
+    agora = time.monotonic()
+    return {
+        replica.nome: {**replica.engine.pool.stats(), "disponivel": replica.disponivel(agora)}
+        for replica in _replicas or ()
+    }
+
+
+async def fechar_pools():
+    """Fecha as conexões das réplicas (no desligamento da aplicação)."""
+    global _replicas
+    for replica in _replicas or ():
+        await replica.engine.dispose()
+    _replicas = None
@@ -0,0 +1,63 @@
+"""
+Busca ou criação de uma linha pelas chaves únicas dos modelos (`get_or_create`).
+
+Sem risco de duplicar linhas sob concorrência: as chaves naturais dos modelos
+têm restrição ou índice único no banco (ver a migração 0007), e o INSERT que
+perde a corrida vira "já existe". Não há versão em lote: as importações em lote
+(ex.: api/importacao.py) fazem um INSERT de várias linhas e tratam os
+conflitos do lote.
+"""
+from typing import Any
+
+from sqlalchemy import Table, UniqueConstraint, and_, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def _chaves_unicas(tabela: Table) -> list[tuple[str, ...]]:
+    """Colunas de cada restrição ou índice único da tabela, sem a chave primária."""
+    chaves = [
+        tuple(c.name for c in restricao.columns)
+        for restricao in tabela.constraints
+        if isinstance(restricao, UniqueConstraint)
+    ] + [tuple(c.name for c in indice.columns) for indice in tabela.indexes if indice.unique]
+    return list(dict.fromkeys(chaves))
+
+
+async def get_or_create(session: AsyncSession, modelo, **valores) -> tuple[Any, bool]:
+    """
+    Busca a linha de `modelo` que tem os `valores` em alguma das suas chaves únicas
+    ou a cria com `valores`. Retorna (objeto, criado) e faz commit quando cria.
+
+    Sob concorrência, só a chamada cujo INSERT gravou a linha informa `criado=True`:
+    se outra chamada criou a linha (ou outra linha já usa uma das chaves, ex.: o
+    e-mail de um professor com outro cpf) entre a busca e o INSERT, o
+    `IntegrityError` vira "já existe" e a linha existente é retornada.
+    """
+    tabela: Table = modelo.__table__
+    chaves = _chaves_unicas(tabela)
+    if not chaves:
+        raise ValueError(f"{tabela.name} não tem chave única.")
+    filtro = or_(*(
+        and_(*(tabela.c[coluna] == valores[coluna] for coluna in chave))
+        for chave in chaves
+    ))
+
+    existente = await session.scalar(select(modelo).where(filtro).limit(1))
+    if existente is not None:
+        return existente, False
+
+    objeto = modelo(**valores)
+    try:
+        # Savepoint: a falha desfaz só este INSERT, sem expirar os objetos já carregados na sessão
+        async with session.begin_nested():
+            session.add(objeto)
+    except IntegrityError:
+        # Com bloqueio compartilhado: no MySQL (REPEATABLE READ) a leitura simples
+        # ainda usaria o snapshot da busca acima, sem a linha concorrente
+        existente = await session.scalar(select(modelo).where(filtro).limit(1).with_for_update(read=True))
+        if existente is None:
+            raise
+        return existente, False
+    await session.commit()
+    return objeto, True
@@ -0,0 +1,520 @@
+"""
+Benchmark de carga dos endpoints da API.
+
+O script sobe a aplicação (`api.main:app`) em processo, contra o banco configurado
+em `settings.database`, e dispara cada rota dos routers (auth, projetos, postagens,
+professores, campus, departamentos, cursos e admin) com N requisições simultâneas.
+Para cada rota e nível de concorrência reporta a vazão (req/s) e as latências
+p50/p95/p99, e grava tudo num JSON para comparar execuções entre commits.
+
+Use um banco só para o benchmark: as rotas de escrita criam (e apagam) linhas.
+Com SQLite, o próprio script povoa o banco na primeira execução:
+
+    export DYNACONF_DATABASE__URL=sqlite:///benchmark.db
+    python -m scripts.benchmark --projetos 20000 --publicacoes 50000
+    python -m scripts.benchmark --concorrencia 1,10,50 --comparar ../benchmarks/<anterior>.json
+
+Com MySQL, suba um container local e aponte a URL para ele:
+
+    docker run -d --name labweb-bench -p 3307:3306 \\
+        -e MYSQL_ALLOW_EMPTY_PASSWORD=yes -e MYSQL_DATABASE=lab_web_bench mysql:8
+    export DYNACONF_DATABASE__URL=mysql://root@127.0.0.1:3307/lab_web_bench
+
+O cliente (httpx) e a aplicação dividem o mesmo event loop, como num único worker
+do uvicorn: os números medem um processo da API, sem rede. O worker de e-mails não
+é iniciado; os e-mails gerados pelas rotas de admin ficam na fila (email_outbox).
+
+Os relatórios vão para `--diretorio` (padrão: `benchmarks/` na raiz do repositório,
+fora de `src/`). As imagens gravadas em `uploads.DIR` durante a execução (a da
+fixture e as enviadas pelas rotas de escrita, com as variantes) são apagadas no fim;
+as que já existiam antes ficam.
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import io
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Callable
+
+import httpx
+from sqlalchemy import func, insert, select
+
+import models.db as db
+from api import security
+from api.main import app
+from api.security import shutdown_bcrypt_executor
+from api.storage import UPLOAD_DIR
+from api.variantes import aguardar_variantes, shutdown_image_executor
+from config import settings
+from models.db import (
+    Administrador, Campus, Curso, Departamento, Professor, Projeto, ProjetoProfessor,
+    ProjetoStatusEnum, Publicacao, PublicacaoTipoEnum,
+)
+from models.migrations import upgrade
+from scripts.populate_db import _inserir_em_lotes, populate_volume
+
+# Relatórios: fora do pacote (src/), na raiz do repositório
+DIRETORIO_PADRAO = Path(__file__).resolve().parents[2] / "benchmarks"
+
+ROUTERS = ["auth", "projetos", "postagens", "professores", "campus", "departamentos", "cursos", "admin"]
+
+SENHA = "benchmark123"
+EMAIL_ADMIN = "admin@benchmark.uneb.br"
+EMAIL_PROFESSOR = "professor@benchmark.uneb.br"
+# CPFs dos professores criados pelo benchmark (sequenciais a partir deste)
+PRIMEIRO_CPF = 70_000_000_000
+# Professores por requisição em POST /admin/cadastrar/lote
+LINHAS_POR_LOTE = 10
+
+
+class Cenario:
+    """Uma rota a medir. `montar(i)` devolve os argumentos da i-ésima requisição para o httpx."""
+
+    def __init__(self, router: str, metodo: str, rota: str, montar: Callable[[int], dict],
+                 esperado: int = 200, escrita: bool = False, variante: str = ""):
+        self.router = router
+        self.metodo = metodo
+        self.rota = rota
+        self.montar = montar
+        self.esperado = esperado
+        self.escrita = escrita
+        self.nome = f"{metodo} {rota}" + (f" ({variante})" if variante else "")
+        self._proxima = 0
+
+    def requisicao(self) -> dict:
+        i = self._proxima
+        self._proxima += 1
+        return {"method": self.metodo, **self.montar(i)}
+
+
+def _percentil(ordenadas: list[float], p: float) -> float:
+    """Percentil pelo método do posto mais próximo (nearest rank)."""
+    return ordenadas[max(0, math.ceil(p / 100 * len(ordenadas)) - 1)]
+
+
+def _imagem_png() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (30, 120, 200)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class Fixtures:
+    """Contas, tokens e linhas de apoio usados pelos cenários (criados uma vez por execução)."""
+
+    async def preparar(self, por_cenario: int, escrita: bool):
+        self.rodada = datetime.now().strftime("%Y%m%d%H%M%S")
+        self.imagem = _imagem_png()
+        # Imagem das linhas criadas direto no banco (salva como o upload salvaria)
+        self.path_imagem = f"{UPLOAD_DIR}/benchmark/{hashlib.sha256(self.imagem).hexdigest()}.png"
+        Path(self.path_imagem).parent.mkdir(parents=True, exist_ok=True)
+        Path(self.path_imagem).write_bytes(self.imagem)
+        senha_hasheada = security.hash_password(SENHA)
+
+        async with db.LocalAsyncSession() as session:
+            admin, _ = await Administrador.get_or_create(session, nome="Admin Benchmark", email=EMAIL_ADMIN, senha=senha_hasheada)
+            self.proximo_cpf = int(await session.scalar(
+                select(func.max(Professor.cpf)).where(Professor.cpf.like("7%"))
+            ) or PRIMEIRO_CPF - 1) + 1
+            professor = await session.scalar(select(Professor).where(Professor.email == EMAIL_PROFESSOR))
+            if professor is None:
+                professor, _ = await Professor.get_or_create(
+                    session, nome="Professor Benchmark", email=EMAIL_PROFESSOR, senha=senha_hasheada, cpf=self._cpf()
+                )
+
+            campus, _ = await Campus.get_or_create(session, nome="Campus Benchmark")
+            departamento, _ = await Departamento.get_or_create(session, nome="Departamento Benchmark", campus_id=campus.id)
+            curso, _ = await Curso.get_or_create(session, nome="Curso Benchmark", departamento_id=departamento.id)
+            projeto, _ = await Projeto.get_or_create(
+                session, titulo="Projeto Benchmark", path_imagem=self.path_imagem,
+                data_inicio=date(2024, 1, 1), status=ProjetoStatusEnum.ATIVO, publico="Comunidade", curso_id=curso.id,
+            )
+            await ProjetoProfessor.get_or_create(session, projeto_id=projeto.id, professor_id=professor.id)
+            publicacao, _ = await Publicacao.get_or_create(
+                session, titulo="Publicação Benchmark", conteudo="Conteúdo do benchmark.", tipo=PublicacaoTipoEnum.NOTICIA,
+                path_imagem=self.path_imagem, professor_id=professor.id, projeto_id=projeto.id,
+            )
+
+            # Amostra de ids para as rotas de detalhe (parte vem do cache, parte do banco)
+            rng = random.Random(42)
+            projeto_ids = list(await session.scalars(select(Projeto.id).order_by(Projeto.id).limit(5000)))
+            publicacao_ids = list(await session.scalars(select(Publicacao.id).order_by(Publicacao.id).limit(5000)))
+            self.projeto_ids = rng.sample(projeto_ids, min(1000, len(projeto_ids)))
+            self.publicacao_ids = rng.sample(publicacao_ids, min(1000, len(publicacao_ids)))
+            termo = await session.scalar(select(Projeto.titulo).order_by(Projeto.id.desc()).limit(1))
+
+        self.admin_id = admin.id
+        self.professor_id = professor.id
+        self.curso_id = curso.id
+        self.departamento_id = departamento.id
+        self.campus_id = campus.id
+        self.projeto_id = projeto.id
+        self.publicacao_id = publicacao.id
+        self.termo = termo.split()[-1]
+        self.token_admin = security.create_access_token(uid=admin.id, role="administrador", token_version=admin.token_version)
+        self.token_professor = security.create_access_token(uid=professor.id, role="professor", token_version=professor.token_version)
+
+        if escrita:
+            # Linhas descartáveis para as rotas que apagam ou revogam tokens: uma por requisição
+            self.projetos_descartaveis = await self._projetos(por_cenario)
+            self.publicacoes_descartaveis = await self._publicacoes(por_cenario)
+            self.professores_senha = await self._professores(por_cenario, senha_hasheada)
+            self.professores_edicao = await self._professores(por_cenario, senha_hasheada)
+            self.professores_reenvio = await self._professores(por_cenario, senha_hasheada)
+
+    def _cpf(self) -> str:
+        cpf = self.proximo_cpf
+        self.proximo_cpf += 1
+        return str(cpf)
+
+    async def _professores(self, total: int, senha_hasheada: str) -> list[int]:
+        # CPFs novos (acima do maior já usado) e e-mails derivados deles: nenhuma linha existe ainda
+        def gerar(primeiro: int, n: int) -> list[dict]:
+            linhas = []
+            for i in range(n):
+                cpf = self._cpf()
+                linhas.append({
+                    "id": primeiro + i, "nome": "Professor Descartável", "email": f"bench{cpf}@benchmark.uneb.br",
+                    "cpf": cpf, "senha": senha_hasheada,
+                })
+            return linhas
+        return list(await _inserir_em_lotes(Professor, total, 10_000, gerar))
+
+    async def _projetos(self, total: int) -> list[int]:
+        ids = await _inserir_em_lotes(Projeto, total, 10_000, lambda primeiro, n: [
+            {
+                "id": primeiro + i, "titulo": f"Projeto descartável {primeiro + i}", "path_imagem": self.path_imagem,
+                "data_inicio": date(2024, 1, 1), "status": ProjetoStatusEnum.ATIVO, "publico": "Comunidade", "curso_id": self.curso_id,
+            }
+            for i in range(n)
+        ])
+        async with db.get_async_engine().begin() as conn:
+            await conn.execute(insert(ProjetoProfessor.__table__), [
+                {"projeto_id": projeto_id, "professor_id": self.professor_id} for projeto_id in ids
+            ])
+        return list(ids)
+
+    async def _publicacoes(self, total: int) -> list[int]:
+        return list(await _inserir_em_lotes(Publicacao, total, 10_000, lambda primeiro, n: [
+            {
+                "id": primeiro + i, "titulo": f"Publicação descartável {primeiro + i}", "conteudo": "Conteúdo.",
+                "tipo": PublicacaoTipoEnum.NOTICIA, "data_publicacao": datetime.now(), "path_imagem": self.path_imagem,
+                "professor_id": self.professor_id, "projeto_id": self.projeto_id,
+            }
+            for i in range(n)
+        ]))
+
+    def headers(self, token: str) -> dict:
+        return {"Authorization": f"Bearer {token}"}
+
+    def token_descartavel(self, professor_id: int) -> str:
+        return security.create_access_token(uid=professor_id, role="professor", token_version=0)
+
+
+async def _primeiro_cursor(client: httpx.AsyncClient, rota: str) -> str | None:
+    resposta = await client.get(rota)
+    return resposta.json().get("next_cursor") if resposta.status_code == 200 else None
+
+
+async def _etag(client: httpx.AsyncClient, rota: str) -> str:
+    return (await client.get(rota)).headers.get("etag", "")
+
+
+async def montar_cenarios(client: httpx.AsyncClient, f: Fixtures) -> list[Cenario]:
+    prof = f.headers(f.token_professor)
+    admin = f.headers(f.token_admin)
+    imagem = ("imagem.png", f.imagem, "image/png")
+    cursor_projetos = await _primeiro_cursor(client, "/projetos/listar")
+    cursor_publicacoes = await _primeiro_cursor(client, "/postagens/listar")
+    etags = {rota: await _etag(client, rota) for rota in ("/campus/listar", "/departamentos/listar", "/cursos/listar")}
+
+    def projeto_form(i: int) -> dict:
+        return {
+            "titulo": f"Projeto benchmark {f.rodada}-{i}", "descricao": "Criado pelo benchmark.",
+            "data_inicio": "2024-01-01", "status": "ATIVO", "publico": "Comunidade",
+            "curso_id": f.curso_id, "professor_ids_responsaveis": [f.professor_id],
+        }
+
+    def publicacao_form(i: int) -> dict:
+        return {"titulo": f"Publicação benchmark {f.rodada}-{i}", "conteudo": "Criada pelo benchmark.", "tipo": "NOTICIA", "projeto_id": f.projeto_id}
+
+    def lote_csv(i: int) -> bytes:
+        linhas = ["nome,email,cpf,senha"]
+        for _ in range(LINHAS_POR_LOTE):
+            cpf = f._cpf()
+            linhas.append(f"Professor Lote,lote{cpf}@benchmark.uneb.br,{cpf},{SENHA}")
+        return "\n".join(linhas).encode()
+
+    def cadastro(i: int) -> dict:
+        cpf = f._cpf()
+        return {"nome": "Professor Cadastro", "email": f"cadastro{cpf}@benchmark.uneb.br", "cpf": cpf, "senha": SENHA}
+
+    # Segunda página pela paginação por chave (só quando a primeira não é a última)
+    pagina_projetos = [
+        Cenario("projetos", "GET", "/projetos/listar", lambda i: {"url": "/projetos/listar", "params": {"cursor": cursor_projetos}}, variante="página 2")
+    ] if cursor_projetos else []
+    pagina_publicacoes = [
+        Cenario("postagens", "GET", "/postagens/listar", lambda i: {"url": "/postagens/listar", "params": {"cursor": cursor_publicacoes}}, variante="página 2")
+    ] if cursor_publicacoes else []
+
+    cenarios = [
+        Cenario("auth", "POST", "/auth/login", lambda i: {"url": "/auth/login", "data": {"username": EMAIL_PROFESSOR, "password": SENHA}}),
+        Cenario("auth", "GET", "/auth/me", lambda i: {"url": "/auth/me", "headers": prof}),
+
+        Cenario("projetos", "GET", "/projetos/listar", lambda i: {"url": "/projetos/listar"}),
+        Cenario("projetos", "GET", "/projetos/listar", lambda i: {"url": "/projetos/listar", "params": {"search_query": f.termo}}, variante="busca"),
+        *pagina_projetos,
+        Cenario("projetos", "GET", "/projetos/exibir/{id}", lambda i: {"url": f"/projetos/exibir/{f.projeto_ids[i % len(f.projeto_ids)]}"}),
+        Cenario("projetos", "GET", "/projetos/me", lambda i: {"url": "/projetos/me", "headers": prof}),
+        Cenario("projetos", "POST", "/projetos/criar", lambda i: {
+                    "url": "/projetos/criar", "headers": prof, "data": projeto_form(i), "files": {"imagem_capa": imagem}},
+                esperado=201, escrita=True),
+        Cenario("projetos", "PUT", "/projetos/editar/{id}", lambda i: {"url": f"/projetos/editar/{f.projeto_id}", "headers": prof, "data": {
+                    **projeto_form(i), "titulo": "Projeto Benchmark"}}, escrita=True),
+        Cenario("projetos", "DELETE", "/projetos/deletar/{id}", lambda i: {"url": f"/projetos/deletar/{f.projetos_descartaveis[i]}", "headers": prof},
+                esperado=204, escrita=True),
+
+        Cenario("postagens", "GET", "/postagens/listar", lambda i: {"url": "/postagens/listar"}),
+        Cenario("postagens", "GET", "/postagens/listar", lambda i: {"url": "/postagens/listar", "params": {"search": f.termo}}, variante="busca"),
+        *pagina_publicacoes,
+        Cenario("postagens", "GET", "/postagens/exibir/{id}", lambda i: {"url": f"/postagens/exibir/{f.publicacao_ids[i % len(f.publicacao_ids)]}"}),
+        Cenario("postagens", "GET", "/postagens/me", lambda i: {"url": "/postagens/me", "headers": prof}),
+        Cenario("postagens", "POST", "/postagens/criar", lambda i: {
+                    "url": "/postagens/criar", "headers": prof, "data": publicacao_form(i), "files": {"imagem": imagem}},
+                esperado=201, escrita=True),
+        Cenario("postagens", "PUT", "/postagens/editar/{id}", lambda i: {"url": f"/postagens/editar/{f.publicacao_id}", "headers": prof, "data": {
+                    **publicacao_form(i), "titulo": "Publicação Benchmark"}}, escrita=True),
+        Cenario("postagens", "DELETE", "/postagens/deletar/{id}", lambda i: {"url": f"/postagens/deletar/{f.publicacoes_descartaveis[i]}", "headers": prof},
+                esperado=204, escrita=True),
+
+        Cenario("professores", "GET", "/professores/listar", lambda i: {"url": "/professores/listar"}),
+        Cenario("professores", "GET", "/professores/me", lambda i: {"url": "/professores/me", "headers": prof}),
+        Cenario("professores", "PUT", "/professores/me/mudar-senha", lambda i: {
+                    "url": "/professores/me/mudar-senha", "headers": f.headers(f.token_descartavel(f.professores_senha[i])),
+                    "json": {"senha_antiga": SENHA, "senha_nova": SENHA}}, escrita=True),
+        Cenario("professores", "PUT", "/professores/me/foto-perfil", lambda i: {
+                    "url": "/professores/me/foto-perfil", "headers": prof, "files": {"imagem": imagem}},
+                escrita=True),
+
+        Cenario("admin", "POST", "/admin/cadastrar", lambda i: {"url": "/admin/cadastrar", "headers": admin, "json": cadastro(i)},
+                esperado=201, escrita=True),
+        Cenario("admin", "POST", "/admin/cadastrar/lote", lambda i: {
+                    "url": "/admin/cadastrar/lote", "headers": {**admin, "Content-Type": "text/csv"}, "content": lote_csv(i)},
+                escrita=True, variante=f"{LINHAS_POR_LOTE} linhas"),
+        Cenario("admin", "PUT", "/admin/editar/{id}", lambda i: {
+                    "url": f"/admin/editar/{f.professores_edicao[i]}", "headers": admin, "json": {"nome": f"Professor Editado {i}"}},
+                escrita=True),
+        Cenario("admin", "POST", "/admin/{id}/reenviar-acesso", lambda i: {"url": f"/admin/{f.professores_reenvio[i]}/reenviar-acesso", "headers": admin},
+                escrita=True),
+        Cenario("admin", "GET", "/admin/cache/stats", lambda i: {"url": "/admin/cache/stats", "headers": admin}),
+    ]
+
+    # Taxonomia: listagem completa, revalidação com ETag (304) e criação
+    criar_taxonomia = {
+        "campus": lambda i: {"nome": f"Campus benchmark {f.rodada}-{i}"},
+        "departamentos": lambda i: {"nome": f"Departamento benchmark {f.rodada}-{i}", "campus_id": f.campus_id},
+        "cursos": lambda i: {"nome": f"Curso benchmark {f.rodada}-{i}", "departamento_id": f.departamento_id},
+    }
+    for router, dados in criar_taxonomia.items():
+        listar = f"/{router}/listar"
+        cenarios += [
+            Cenario(router, "GET", listar, lambda i, listar=listar: {"url": listar}),
+            Cenario(router, "GET", listar, lambda i, listar=listar: {"url": listar, "headers": {"If-None-Match": etags[listar]}},
+                    esperado=304, variante="If-None-Match"),
+            Cenario(router, "POST", f"/{router}/criar", lambda i, router=router, dados=dados: {
+                        "url": f"/{router}/criar", "headers": admin, "json": dados(i)},
+                    esperado=201, escrita=True),
+        ]
+    return cenarios
+
+
+async def medir(client: httpx.AsyncClient, cenario: Cenario, total: int, concorrencia: int) -> dict:
+    """Faz `total` requisições do cenário, no máximo `concorrencia` ao mesmo tempo."""
+    latencias: list[float] = []
+    codigos: Counter = Counter()
+    restantes = iter(range(total))  # Compartilhado: cada requisição é feita por um único cliente
+
+    async def cliente():
+        for _ in restantes:
+            argumentos = cenario.requisicao()
+            inicio = time.perf_counter()
+            resposta = await client.request(**argumentos)
+            latencias.append(time.perf_counter() - inicio)
+            codigos[resposta.status_code] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente() for _ in range(concorrencia)))
+    duracao = time.perf_counter() - inicio
+
+    ordenadas = sorted(latencia * 1000 for latencia in latencias)
+    return {
+        "router": cenario.router,
+        "cenario": cenario.nome,
+        "concorrencia": concorrencia,
+        "requisicoes": total,
+        "erros": total - codigos[cenario.esperado],
+        "status": {str(codigo): n for codigo, n in sorted(codigos.items())},
+        "duracao_s": round(duracao, 4),
+        "vazao_rps": round(total / duracao, 2),
+        "latencia_ms": {
+            "media": round(sum(ordenadas) / len(ordenadas), 3),
+            "p50": round(_percentil(ordenadas, 50), 3),
+            "p95": round(_percentil(ordenadas, 95), 3),
+            "p99": round(_percentil(ordenadas, 99), 3),
+            "max": round(ordenadas[-1], 3),
+        },
+    }
+
+
+def _commit() -> dict:
+    def git(*args) -> str:
+        return subprocess.run(["git", *args], capture_output=True, text=True).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "HEAD") or None, "alterado": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except OSError:
+        return {"commit": None, "alterado": None}
+
+
+async def _contagens() -> dict:
+    async with db.LocalAsyncSession() as session:
+        return {
+            modelo.__tablename__: await session.scalar(select(func.count()).select_from(modelo))
+            for modelo in (Professor, Projeto, Publicacao, Curso)
+        }
+
+
+def _imprimir(resultado: dict, anterior: dict | None):
+    latencia = resultado["latencia_ms"]
+    linha = (
+        f"{resultado['cenario']:<50} c={resultado['concorrencia']:<4} {resultado['vazao_rps']:>9.1f} req/s"
+        f"  p50 {latencia['p50']:>8.2f}  p95 {latencia['p95']:>8.2f}  p99 {latencia['p99']:>8.2f} ms"
+    )
+    if resultado["erros"]:
+        linha += f"  {resultado['erros']} erros {resultado['status']}"
+    if anterior:
+        vazao = resultado["vazao_rps"] / anterior["vazao_rps"] - 1
+        p95 = latencia["p95"] / anterior["latencia_ms"]["p95"] - 1
+        linha += f"  (vazão {vazao:+.0%}, p95 {p95:+.0%})"
+    print(linha)
+
+
+def _arquivos(diretorio: str) -> set[Path]:
+    raiz = Path(diretorio)
+    return {caminho for caminho in raiz.rglob("*") if caminho.is_file()} if raiz.exists() else set()
+
+
+def _remover_imagens_novas(existentes: set[Path]):
+    """Apaga as imagens de `UPLOAD_DIR` que não estavam em `existentes` (e as pastas que ficarem vazias)."""
+    novas = _arquivos(UPLOAD_DIR) - existentes
+    for caminho in novas:
+        caminho.unlink(missing_ok=True)
+    for pasta in {caminho.parent for caminho in novas}:
+        with contextlib.suppress(OSError):  # Só remove a pasta se ela ficou vazia
+            pasta.rmdir()
+    if novas:
+        print(f"{len(novas)} imagens do benchmark removidas de {UPLOAD_DIR}")
+
+
+async def executar(args) -> dict:
+    await upgrade()
+    if args.projetos or args.publicacoes:
+        await populate_volume(
+            projetos=args.projetos or 0,
+            publicacoes=args.publicacoes or 0,
+            professores=max(15, (args.projetos or 0) // 20),
+            cursos=50,
+            lote=10_000,
+            seed=args.seed,
+        )
+
+    routers = args.routers.split(",") if args.routers else ROUTERS
+    niveis = [int(nivel) for nivel in args.concorrencia.split(",")]
+    por_cenario = (args.requisicoes + args.aquecimento) * len(niveis)
+
+    anteriores = {}
+    if args.comparar:
+        for item in json.loads(Path(args.comparar).read_text())["resultados"]:
+            anteriores[(item["cenario"], item["concorrencia"])] = item
+
+    imagens_existentes = _arquivos(UPLOAD_DIR)
+    resultados = []
+    try:
+        fixtures = Fixtures()
+        await fixtures.preparar(por_cenario, escrita=not args.somente_leitura)
+
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as client:
+            cenarios = [
+                cenario for cenario in await montar_cenarios(client, fixtures)
+                if cenario.router in routers and not (args.somente_leitura and cenario.escrita)
+            ]
+            print(f"\n{len(cenarios)} cenários x {len(niveis)} níveis de concorrência, {args.requisicoes} requisições cada\n")
+            for cenario in cenarios:
+                for concorrencia in niveis:
+                    if args.aquecimento:
+                        await medir(client, cenario, args.aquecimento, concorrencia)
+                    resultado = await medir(client, cenario, args.requisicoes, concorrencia)
+                    _imprimir(resultado, anteriores.get((resultado["cenario"], concorrencia)))
+                    resultados.append(resultado)
+    finally:
+        shutdown_bcrypt_executor()
+        # As variantes dos uploads ainda podem estar sendo gravadas
+        await aguardar_variantes(settings.DESLIGAMENTO_TIMEOUT)
+        shutdown_image_executor()
+        _remover_imagens_novas(imagens_existentes)
+
+    return {
+        "meta": {
+            **_commit(),
+            "data": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "banco": db.get_async_engine().dialect.name,
+            "linhas": await _contagens(),
+            "requisicoes": args.requisicoes,
+            "aquecimento": args.aquecimento,
+            "concorrencia": niveis,
+            "seed": args.seed,
+        },
+        "resultados": resultados,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga dos endpoints da API (em processo).")
+    parser.add_argument("--concorrencia", default="1,10,50", help="Níveis de concorrência separados por vírgula")
+    parser.add_argument("--requisicoes", type=int, default=200, help="Requisições medidas por cenário e nível")
+    parser.add_argument("--aquecimento", type=int, default=20, help="Requisições descartadas antes de cada medição")
+    parser.add_argument("--routers", help=f"Routers a medir (padrão: todos): {','.join(ROUTERS)}")
+    parser.add_argument("--somente-leitura", action="store_true", help="Mede apenas as rotas que não gravam no banco")
+    parser.add_argument("--projetos", type=int, help="Povoa o banco antes (modo de alto volume do populate_db)")
+    parser.add_argument("--publicacoes", type=int, help="Povoa o banco antes (modo de alto volume do populate_db)")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do povoamento")
+    parser.add_argument("--diretorio", type=Path, default=DIRETORIO_PADRAO,
+                        help=f"Diretório dos relatórios (padrão: {DIRETORIO_PADRAO})")
+    parser.add_argument("--saida", help="Arquivo JSON de resultados (padrão: <diretorio>/<data>-<commit>.json)")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior: mostra a variação de vazão e p95")
+    args = parser.parse_args()
+
+    relatorio = asyncio.run(executar(args))
+
+    saida = Path(args.saida) if args.saida else args.diretorio / (
+        f"{datetime.now():%Y%m%d-%H%M%S}-{(relatorio['meta']['commit'] or 'sem-commit')[:8]}.json"
+    )
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    print(f"\nResultados gravados em {saida}")
+
+
+if __name__ == "__main__":
+    main()
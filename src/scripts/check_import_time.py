@@ -0,0 +1,110 @@
+"""
+Verifica o custo de importar a aplicação (o que cada worker do uvicorn paga ao subir).
+
+Importa `api.main` em processos novos e termina com código 1 se:
+
+- a mediana do tempo de import passar do orçamento (`--limite`, em ms);
+- o import tiver criado algum engine, carregado um driver de banco ou iniciado
+  threads/processos: conexões e trabalhos em segundo plano só começam no lifespan
+  da aplicação (`db.abrir_pools`, worker de e-mails).
+
+Com `--detalhar`, lista os módulos mais lentos (saída de `python -X importtime`).
+
+    python -m scripts.check_import_time
+    python -m scripts.check_import_time --limite 1500 --detalhar 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Drivers dos dialetos de `models.db.database_url`: carregados só ao criar um engine
+DRIVERS = ("aiosqlite", "sqlite3", "asyncmy", "MySQLdb")
+
+_MEDIR = f"""
+import json, sys, threading, time
+inicio = time.perf_counter()
+import api.main
+duracao = time.perf_counter() - inicio
+import multiprocessing
+import models.db as db
+print(json.dumps({{
+    "ms": duracao * 1000,
+    "engines": [nome for nome in ("_engine", "_async_engine") if getattr(db, nome) is not None],
+    "drivers": [nome for nome in {DRIVERS!r} if nome in sys.modules],
+    "threads": [t.name for t in threading.enumerate() if t is not threading.main_thread()],
+    "processos": len(multiprocessing.active_children()),
+}}))
+"""
+
+
+def _raiz() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _executar(*argumentos: str) -> subprocess.CompletedProcess:
+    ambiente = {**os.environ, "PYTHONPATH": _raiz()}
+    return subprocess.run(
+        [sys.executable, *argumentos], cwd=_raiz(), env=ambiente,
+        capture_output=True, text=True, check=True,
+    )
+
+
+def medir(repeticoes: int) -> list[dict]:
+    # A primeira execução compila os .pyc e aquece o cache de disco: não conta
+    _executar("-c", "import api.main")
+    return [json.loads(_executar("-c", _MEDIR).stdout.splitlines()[-1]) for _ in range(repeticoes)]
+
+
+def mais_lentos(quantidade: int) -> list[tuple[int, str]]:
+    """Módulos com maior tempo acumulado de import (µs), pela saída de -X importtime."""
+    modulos = []
+    for linha in _executar("-X", "importtime", "-c", "import api.main").stderr.splitlines():
+        partes = linha.split("|")
+        if len(partes) == 3 and partes[1].strip().isdigit():
+            modulos.append((int(partes[1]), partes[2].strip()))
+    return sorted(modulos, reverse=True)[:quantidade]
+
+
+def verificar(limite: float, repeticoes: int, detalhar: int) -> bool:
+    medicoes = medir(repeticoes)
+    mediana = statistics.median(m["ms"] for m in medicoes)
+    print(f"import api.main: mediana {mediana:.0f} ms em {repeticoes} execuções (limite {limite:.0f} ms)")
+
+    falhas = []
+    if mediana > limite:
+        falhas.append(f"import acima do orçamento: {mediana:.0f} ms > {limite:.0f} ms")
+    efeitos = medicoes[-1]
+    if efeitos["engines"]:
+        falhas.append(f"engines criados no import: {', '.join(efeitos['engines'])}")
+    if efeitos["drivers"]:
+        falhas.append(f"drivers de banco carregados no import: {', '.join(efeitos['drivers'])}")
+    if efeitos["threads"]:
+        falhas.append(f"threads iniciadas no import: {', '.join(efeitos['threads'])}")
+    if efeitos["processos"]:
+        falhas.append(f"processos iniciados no import: {efeitos['processos']}")
+
+    if detalhar:
+        print("\nMódulos mais lentos (acumulado):")
+        for microssegundos, modulo in mais_lentos(detalhar):
+            print(f"  {microssegundos / 1000:8.1f} ms  {modulo}")
+
+    for falha in falhas:
+        print(f"\nFALHA: {falha}")
+    return not falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--limite", type=float, default=2000, help="orçamento do import, em ms")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--detalhar", type=int, default=0, metavar="N",
+                        help="lista os N módulos mais lentos")
+    args = parser.parse_args()
+    sys.exit(0 if verificar(args.limite, args.repeticoes, args.detalhar) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Verifica as migrações sobre bancos SQLite temporários.
+
+1. Banco com o esquema original (anterior às migrações, sem índices) e um e-mail
+   de professor repetido: `python -m models.migrations` tem que parar na 0007, com
+   a lista de chaves repetidas, depois de aplicar as anteriores sem erro.
+2. O mesmo banco, sem a linha repetida: as migrações pendentes terminam e os
+   índices ficam iguais aos declarados nos modelos.
+3. Banco vazio: as migrações criam o esquema atual.
+
+Termina com código 1 se alguma etapa falhar.
+
+    python -m scripts.check_migrations
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from sqlalchemy import create_engine, inspect
+
+from models.db import BaseModel
+
+# Esquema do banco antes da migração 0001 (tabelas criadas pelo create_all original)
+ESQUEMA_ORIGINAL = """
+CREATE TABLE professor (
+    id INTEGER NOT NULL, nome VARCHAR(255) NOT NULL, email VARCHAR(255) NOT NULL,
+    senha VARCHAR(255) NOT NULL, path_imagem VARCHAR(255), cpf VARCHAR(11) NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE TABLE campus (id INTEGER NOT NULL, nome VARCHAR(255) NOT NULL, PRIMARY KEY (id));
+CREATE TABLE administrador (
+    id INTEGER NOT NULL, nome VARCHAR(255) NOT NULL, email VARCHAR(255) NOT NULL,
+    senha VARCHAR(255) NOT NULL, PRIMARY KEY (id)
+);
+CREATE TABLE departamento (
+    id INTEGER NOT NULL, nome VARCHAR(255) NOT NULL, campus_id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(campus_id) REFERENCES campus (id)
+);
+CREATE TABLE curso (
+    id INTEGER NOT NULL, nome VARCHAR(255) NOT NULL, departamento_id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(departamento_id) REFERENCES departamento (id)
+);
+CREATE TABLE projeto (
+    id INTEGER NOT NULL, titulo VARCHAR(255) NOT NULL, descricao TEXT,
+    path_imagem VARCHAR(255) NOT NULL, data_inicio DATE NOT NULL, data_fim DATE,
+    status VARCHAR(7) NOT NULL, publico VARCHAR(255) NOT NULL, curso_id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(curso_id) REFERENCES curso (id)
+);
+CREATE TABLE publicacao (
+    id INTEGER NOT NULL, titulo VARCHAR(255) NOT NULL, conteudo TEXT NOT NULL,
+    tipo VARCHAR(7) NOT NULL, data_publicacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+    path_imagem VARCHAR(255) NOT NULL, professor_id INTEGER NOT NULL, projeto_id INTEGER NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(professor_id) REFERENCES professor (id),
+    FOREIGN KEY(projeto_id) REFERENCES projeto (id)
+);
+CREATE TABLE projeto_professor (
+    id INTEGER NOT NULL, projeto_id INTEGER NOT NULL, professor_id INTEGER NOT NULL,
+    PRIMARY KEY (id), UNIQUE (projeto_id, professor_id),
+    FOREIGN KEY(projeto_id) REFERENCES projeto (id), FOREIGN KEY(professor_id) REFERENCES professor (id)
+);
+INSERT INTO campus (id, nome) VALUES (1, 'Campus I');
+INSERT INTO administrador (id, nome, email, senha) VALUES (1, 'Admin', 'admin@uneb.br', 'x');
+INSERT INTO professor (id, nome, email, senha, cpf) VALUES
+    (1, 'Ana', 'ana@uneb.br', 'x', '11111111111'),
+    (2, 'Bruno', 'bruno@uneb.br', 'x', '22222222222');
+"""
+
+# Professor com o e-mail de outro (o get_or_create antigo permitia)
+REPETIDO = "INSERT INTO professor (id, nome, email, senha, cpf) VALUES (3, 'Ana 2', 'ana@uneb.br', 'x', '33333333333')"
+
+
+def _raiz() -> str:
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _migrar(arquivo: str) -> subprocess.CompletedProcess:
+    ambiente = {**os.environ, "PYTHONPATH": _raiz(), "DYNACONF_DATABASE__URL": f"sqlite:///{arquivo}"}
+    return subprocess.run(
+        [sys.executable, "-m", "models.migrations"], cwd=_raiz(), env=ambiente,
+        capture_output=True, text=True,
+    )
+
+
+def _versoes(arquivo: str) -> list[int]:
+    with sqlite3.connect(arquivo) as conn:
+        return [v for (v,) in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+
+
+def _diferencas_de_indices(arquivo: str) -> list[str]:
+    """Índices dos modelos (para o SQLite) ausentes ou diferentes no banco."""
+    inspetor = inspect(create_engine(f"sqlite:///{arquivo}"))
+    diferencas = []
+    for tabela in BaseModel.metadata.sorted_tables:
+        no_banco = {ix["name"]: ix for ix in inspetor.get_indexes(tabela.name)}
+        for indice in tabela.indexes:
+            if indice._ddl_if is not None and indice._ddl_if.dialect not in (None, "sqlite"):
+                continue
+            existente = no_banco.get(indice.name)
+            colunas = [c.name for c in indice.columns]
+            if existente is None:
+                diferencas.append(f"{tabela.name}.{indice.name}: ausente")
+            elif existente["column_names"] != colunas or bool(existente["unique"]) != bool(indice.unique):
+                diferencas.append(
+                    f"{tabela.name}.{indice.name}: {existente['column_names']} unique={bool(existente['unique'])}"
+                    f" (esperado {colunas} unique={bool(indice.unique)})"
+                )
+    return diferencas
+
+
+def verificar() -> bool:
+    falhas = []
+    with tempfile.TemporaryDirectory() as pasta:
+        antigo = os.path.join(pasta, "original.db")
+        with sqlite3.connect(antigo) as conn:
+            conn.executescript(ESQUEMA_ORIGINAL)
+            conn.execute(REPETIDO)
+
+        print("1. Esquema original com e-mail repetido")
+        resultado = _migrar(antigo)
+        versoes = _versoes(antigo)
+        print(f"   código {resultado.returncode}, versões aplicadas {versoes}")
+        if resultado.returncode == 0:
+            falhas.append("as migrações aceitaram um e-mail de professor repetido")
+        elif "professor.ix_professor_email: email='ana@uneb.br' (2 linhas)" not in resultado.stderr:
+            falhas.append(f"a 0007 não listou o e-mail repetido:\n{resultado.stderr.strip()}")
+        if versoes != list(range(1, 7)):
+            falhas.append(f"esperadas as versões 1 a 6 aplicadas antes da 0007, obtidas {versoes}")
+
+        print("2. Mesmo banco, sem a linha repetida")
+        with sqlite3.connect(antigo) as conn:
+            conn.execute("DELETE FROM professor WHERE id = 3")
+        resultado = _migrar(antigo)
+        print(f"   código {resultado.returncode}, versões aplicadas {_versoes(antigo)}")
+        if resultado.returncode != 0:
+            falhas.append(f"migração do esquema original falhou:\n{resultado.stderr.strip()}")
+        falhas += [f"esquema original: {d}" for d in _diferencas_de_indices(antigo)]
+
+        print("3. Banco vazio")
+        novo = os.path.join(pasta, "novo.db")
+        resultado = _migrar(novo)
+        print(f"   código {resultado.returncode}, versões aplicadas {_versoes(novo)}")
+        if resultado.returncode != 0:
+            falhas.append(f"migração do banco vazio falhou:\n{resultado.stderr.strip()}")
+        falhas += [f"banco vazio: {d}" for d in _diferencas_de_indices(novo)]
+
+    for falha in falhas:
+        print(f"\nFALHA: {falha}")
+    return not falhas
+
+
+def main():
+    sys.exit(0 if verificar() else 1)
+
+
+if __name__ == "__main__":
+    main()
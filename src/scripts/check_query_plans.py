@@ -0,0 +1,166 @@
+"""
+Verifica o plano de execução (EXPLAIN) das consultas feitas pelos routers.
+
+O script sobe a aplicação em processo, chama as rotas de leitura contra o banco
+configurado em `settings.database`, captura cada SELECT emitido e roda EXPLAIN
+(MySQL) ou EXPLAIN QUERY PLAN (SQLite) sobre ele. Termina com código 1 se alguma
+consulta fizer leitura completa (full scan) de uma tabela que não esteja na lista
+de exceções da rota.
+
+Rode sobre um banco já migrado e povoado (o otimizador do MySQL prefere full scan
+em tabelas quase vazias):
+
+    python -m models.migrations
+    python -m scripts.populate_db
+    python -m scripts.check_query_plans
+"""
+import asyncio
+import re
+import sys
+
+import httpx
+from sqlalchemy import event, select
+
+import models.db as db
+from api import security
+from api.main import app
+from models.db import Administrador, Professor, Projeto, Publicacao
+
+# Rotas que listam uma tabela inteira por definição podem varrê-la por completo
+SCANS_PERMITIDOS = {
+    "/campus/listar": {"campus"},
+    "/departamentos/listar": {"departamento", "campus"},
+    "/cursos/listar": {"curso", "departamento", "campus"},
+    "/professores/listar": {"professor"},
+    # selectinload de Curso.departamento.campus (carregamento.CURSO) com vários ids: com
+    # poucas linhas (6 departamentos, 3 campus), após um ANALYZE o SQLite lê as tabelas inteiras
+    "/projetos/me": {"departamento", "campus"},
+}
+
+_ALIAS = re.compile(r"_\d+$")
+
+
+def _tabelas_varridas(dialeto: str, plano: list) -> set[str]:
+    """Extrai do resultado do EXPLAIN as tabelas lidas por completo."""
+    tabelas = set()
+    if dialeto == "mysql":
+        for linha in plano:
+            linha = linha._mapping
+            tabela = linha["table"] or ""
+            if linha["type"] == "ALL" and not tabela.startswith("<"):
+                tabelas.add(_ALIAS.sub("", tabela))
+    else:
+        for linha in plano:
+            detalhe = linha[-1]
+            encontrado = re.match(r"SCAN (\w+)", detalhe)
+            if not encontrado or " USING " in detalhe or "VIRTUAL TABLE" in detalhe:
+                continue
+            if encontrado.group(1) != "CONSTANT":
+                tabelas.add(_ALIAS.sub("", encontrado.group(1)))
+    return tabelas
+
+
+async def _token(modelo, role: str) -> str | None:
+    async with db.LocalAsyncSession() as session:
+        usuario = await session.scalar(select(modelo).limit(1))
+    if usuario is None:
+        return None
+    return security.create_access_token(uid=usuario.id, role=role, token_version=usuario.token_version)
+
+
+async def _rotas() -> list[tuple[str, str, dict, dict | None, str | None]]:
+    """Monta a lista de (método, rota, parâmetros, formulário, token) a verificar."""
+    async with db.LocalAsyncSession() as session:
+        projeto_id = await session.scalar(select(Projeto.id).limit(1)) or 1
+        publicacao_id = await session.scalar(select(Publicacao.id).limit(1)) or 1
+        termo = await session.scalar(select(Projeto.titulo).limit(1)) or "projeto"
+
+    termo = termo.split()[-1]
+    token_professor = await _token(Professor, "professor")
+    token_admin = await _token(Administrador, "administrador")
+
+    rotas = [
+        ("GET", "/projetos/listar", {}, None, None),
+        ("GET", "/projetos/listar", {"search_query": termo}, None, None),
+        ("GET", f"/projetos/exibir/{projeto_id}", {}, None, None),
+        ("GET", "/postagens/listar", {}, None, None),
+        ("GET", "/postagens/listar", {"search": termo}, None, None),
+        ("GET", f"/postagens/exibir/{publicacao_id}", {}, None, None),
+        ("GET", "/professores/listar", {}, None, None),
+        ("GET", "/campus/listar", {}, None, None),
+        ("GET", "/departamentos/listar", {}, None, None),
+        ("GET", "/cursos/listar", {}, None, None),
+        # E-mail inexistente: exercita as consultas do login sem depender das senhas do banco
+        ("POST", "/auth/login", {}, {"username": "check@query.plans", "password": "x"}, None),
+    ]
+    if token_professor:
+        rotas += [
+            ("GET", "/auth/me", {}, None, token_professor),
+            ("GET", "/projetos/me", {}, None, token_professor),
+            ("GET", "/projetos/me", {"search_query": termo}, None, token_professor),
+            ("GET", "/postagens/me", {}, None, token_professor),
+            ("GET", "/postagens/me", {"search_query": termo}, None, token_professor),
+        ]
+    if token_admin:
+        rotas.append(("GET", "/auth/me", {}, None, token_admin))
+    return rotas
+
+
+async def verificar() -> bool:
+    engine = db.get_async_engine().sync_engine
+    dialeto = engine.dialect.name
+    capturadas: list[tuple[str, object]] = []
+
+    def capturar(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            capturadas.append((statement, parameters))
+
+    consultas = []  # (rota, statement, parameters)
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as client:
+            for metodo, rota, params, form, token in await _rotas():
+                headers = {"Authorization": f"Bearer {token}"} if token else {}
+                capturadas.clear()
+                resposta = await client.request(metodo, rota, params=params, data=form, headers=headers)
+                print(f"{metodo} {rota} {params or ''} -> {resposta.status_code} ({len(capturadas)} consultas)")
+
+                chamadas = [(rota, s, p) for s, p in capturadas]
+                # Segue o cursor da primeira página para verificar também a paginação por chave
+                if metodo == "GET" and resposta.status_code == 200 and not params:
+                    cursor = resposta.json().get("next_cursor") if isinstance(resposta.json(), dict) else None
+                    if cursor:
+                        capturadas.clear()
+                        await client.get(rota, params={"cursor": cursor})
+                        chamadas += [(f"{rota}?cursor", s, p) for s, p in capturadas]
+                consultas += chamadas
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+    explain = "EXPLAIN" if dialeto == "mysql" else "EXPLAIN QUERY PLAN"
+    falhas = []
+    async with db.get_async_engine().connect() as conn:
+        for rota, statement, parameters in consultas:
+            plano = (await conn.exec_driver_sql(f"{explain} {statement}", parameters)).all()
+            varridas = _tabelas_varridas(dialeto, plano)
+            varridas -= SCANS_PERMITIDOS.get(rota.split("?")[0], set())
+            if varridas:
+                falhas.append((rota, statement, varridas, plano))
+
+    for rota, statement, varridas, plano in falhas:
+        print(f"\nFULL SCAN em {', '.join(sorted(varridas))} ({rota}):")
+        print(statement)
+        for linha in plano:
+            print("   ", tuple(linha))
+
+    print(f"\n{len(consultas)} consultas verificadas, {len(falhas)} com full scan.")
+    return not falhas
+
+
+def main():
+    sys.exit(0 if asyncio.run(verificar()) else 1)
+
+
+if __name__ == "__main__":
+    main()
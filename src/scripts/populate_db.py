@@ -1,13 +1,17 @@
+import argparse
 import asyncio
 import random
-from datetime import datetime, timedelta
+import time
+from datetime import date, datetime, timedelta
 from faker import Faker
+from sqlalchemy import func, insert, text
 from sqlalchemy.future import select
 
 # Importe seus modelos e a sessão do banco de dados
 # Certifique-se de que os caminhos de importação estão corretos
 from models.db import (
     LocalAsyncSession,
+    get_async_engine,
     Campus,
     Departamento,
     Curso,
@@ -16,10 +20,11 @@ from models.db import (
     Publicacao,
     Administrador,
     ProjetoProfessor,
-    create_all,
 )
+from models.migrations import upgrade
 from enums.status import ProjetoStatusEnum
 from enums.tipo import PublicacaoTipoEnum
+from api.security import hash_password
 
 # Inicializa o Faker para gerar dados fictícios
 fake = Faker('pt_BR')
@@ -29,8 +34,8 @@ async def populate_data():
     Popula todas as tabelas do banco de dados com dados fictícios,
     respeitando as dependências entre elas.
     """
-    # Garante que todas as tabelas foram criadas antes de popular
-    await create_all()
+    # Garante que o esquema está na versão mais recente antes de popular
+    await upgrade()
 
     async with LocalAsyncSession() as session:
         print("Iniciando o povoamento do banco de dados...")
@@ -142,10 +147,184 @@ async def populate_data():
         await session.commit()
         print("\n✅ Povoamento do banco de dados concluído com sucesso!")
 
+# --- Modo de alto volume (testes de carga) ---
+#
+# Em vez de get_or_create (um SELECT e um commit por linha), gera as linhas em lotes
+# a partir de conjuntos de textos do Faker pré-gerados e insere cada lote com um único
+# execute (executemany / INSERT de várias linhas). Os ids são atribuídos pelo script,
+# a partir do maior id existente, para ligar as chaves estrangeiras sem consultar o banco.
+# Com a mesma semente e o mesmo banco de partida, os dados gerados são idênticos.
+
+SENHA_VOLUME = "senha123"  # Senha de todos os professores gerados (para testar o login)
+# Datas geradas: até 10 anos antes desta (fixa, e não a de hoje, para que a mesma semente
+# gere os mesmos dados em qualquer dia e os EXPLAIN/benchmarks sejam comparáveis)
+DATA_REFERENCIA = date(2025, 1, 1)
+
+
+class GeradorVolume:
+    def __init__(self, seed: int, referencia: date = DATA_REFERENCIA):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        fake_seed = Faker('pt_BR')
+        fake_seed.seed_instance(seed)
+        self.nomes = [fake_seed.name() for _ in range(2000)]
+        self.frases = [fake_seed.catch_phrase() for _ in range(2000)]
+        self.sentencas = [fake_seed.sentence(nb_words=6) for _ in range(2000)]
+        self.paragrafos = [fake_seed.paragraph(nb_sentences=5) for _ in range(500)]
+        self.imagens = [fake_seed.image_url() for _ in range(50)]
+        self.publicos = ["Alunos de Graduação", "Comunidade Externa", "Pesquisadores"]
+        self.referencia = referencia
+
+    def professores_do_projeto(self, projeto_id: int, professor_ids: range) -> list[int]:
+        """Responsáveis (1 a 3) de um projeto; derivados só da semente e do id, sem guardar em memória."""
+        rng = random.Random(self.seed * 1_000_003 + projeto_id)
+        return rng.sample(professor_ids, k=min(len(professor_ids), rng.randint(1, 3)))
+
+    def data(self) -> date:
+        return self.referencia - timedelta(days=self.rng.randrange(3650))
+
+
+async def _proximo_id(conn, modelo) -> int:
+    return (await conn.scalar(select(func.max(modelo.id)))) or 0
+
+
+async def _inserir_em_lotes(modelo, total: int, lote: int, gerar_linhas):
+    """Insere `total` linhas de `modelo` com gerar_linhas(primeiro_id, quantidade), um commit por lote."""
+    if total <= 0:
+        return range(0)
+    async with get_async_engine().connect() as conn:
+        inicio = await _proximo_id(conn, modelo) + 1
+    ids = range(inicio, inicio + total)
+    print(f"Criando {total:,} linhas em {modelo.__tablename__}...")
+    t0 = time.perf_counter()
+    for primeiro in range(inicio, inicio + total, lote):
+        quantidade = min(lote, inicio + total - primeiro)
+        linhas = gerar_linhas(primeiro, quantidade)
+        async with get_async_engine().begin() as conn:
+            await conn.execute(insert(modelo.__table__), linhas)
+        feitas = primeiro + quantidade - inicio
+        print(f"  {feitas:,}/{total:,} ({feitas / (time.perf_counter() - t0):,.0f} linhas/s)", end="\r")
+    print()
+    return ids
+
+
+async def populate_volume(projetos: int, publicacoes: int, professores: int, cursos: int, lote: int, seed: int,
+                          referencia: date = DATA_REFERENCIA):
+    """Povoa o banco com muitas linhas, em lotes, para testes de carga dos routers."""
+    await upgrade()
+    g = GeradorVolume(seed, referencia)
+    senha_hasheada = hash_password(SENHA_VOLUME)
+
+    # Taxonomia: 3 campus, 2 departamentos por campus e os cursos distribuídos entre eles
+    campus_ids = await _inserir_em_lotes(Campus, 3, lote, lambda primeiro, n: [
+        {"id": primeiro + i, "nome": f"Campus {primeiro + i}"} for i in range(n)
+    ])
+    departamento_ids = await _inserir_em_lotes(Departamento, 6, lote, lambda primeiro, n: [
+        {"id": primeiro + i, "nome": f"Departamento {primeiro + i}", "campus_id": campus_ids[i % len(campus_ids)]}
+        for i in range(n)
+    ])
+    curso_ids = await _inserir_em_lotes(Curso, cursos, lote, lambda primeiro, n: [
+        {"id": primeiro + i, "nome": f"Curso {primeiro + i} de {g.rng.choice(g.frases)}", "departamento_id": g.rng.choice(departamento_ids)}
+        for i in range(n)
+    ])
+
+    professor_ids = await _inserir_em_lotes(Professor, professores, lote, lambda primeiro, n: [
+        {
+            "id": primeiro + i,
+            "nome": g.rng.choice(g.nomes),
+            "email": f"professor{primeiro + i}@volume.uneb.br",
+            "senha": senha_hasheada,
+            "cpf": f"{90_000_000_000 + primeiro + i}",
+        }
+        for i in range(n)
+    ])
+
+    def linhas_projeto(primeiro, n):
+        return [
+            {
+                "id": primeiro + i,
+                "titulo": f"Projeto {g.rng.choice(g.frases)}",
+                "descricao": g.rng.choice(g.paragrafos),
+                "path_imagem": g.rng.choice(g.imagens),
+                "data_inicio": g.data(),
+                "status": g.rng.choice(list(ProjetoStatusEnum)),
+                "publico": g.rng.choice(g.publicos),
+                "curso_id": g.rng.choice(curso_ids),
+            }
+            for i in range(n)
+        ]
+    projeto_ids = await _inserir_em_lotes(Projeto, projetos, lote, linhas_projeto)
+
+    if professor_ids and projeto_ids:
+        print("Vinculando professores a projetos...")
+        for primeiro in range(projeto_ids.start, projeto_ids.stop, lote):
+            linhas = [
+                {"projeto_id": projeto_id, "professor_id": professor_id}
+                for projeto_id in range(primeiro, min(primeiro + lote, projeto_ids.stop))
+                for professor_id in g.professores_do_projeto(projeto_id, professor_ids)
+            ]
+            async with get_async_engine().begin() as conn:
+                await conn.execute(insert(ProjetoProfessor.__table__), linhas)
+
+        def linhas_publicacao(primeiro, n):
+            linhas = []
+            for i in range(n):
+                projeto_id = g.rng.choice(projeto_ids)
+                linhas.append({
+                    "id": primeiro + i,
+                    "titulo": g.rng.choice(g.sentencas),
+                    "conteudo": "\n\n".join(g.rng.choices(g.paragrafos, k=g.rng.randint(1, 3))),
+                    "tipo": g.rng.choice(list(PublicacaoTipoEnum)),
+                    "data_publicacao": datetime.combine(g.data(), datetime.min.time()) + timedelta(seconds=g.rng.randrange(86400)),
+                    "path_imagem": g.rng.choice(g.imagens),
+                    "professor_id": g.rng.choice(g.professores_do_projeto(projeto_id, professor_ids)),
+                    "projeto_id": projeto_id,
+                })
+            return linhas
+        await _inserir_em_lotes(Publicacao, publicacoes, lote, linhas_publicacao)
+    elif publicacoes:
+        print("Publicações não criadas: é preciso gerar projetos e professores nesta mesma execução.")
+
+    # Atualiza as estatísticas usadas pelo otimizador para escolher os índices
+    async with get_async_engine().begin() as conn:
+        if conn.dialect.name == "mysql":
+            await conn.execute(text("ANALYZE TABLE professor, projeto, projeto_professor, publicacao"))
+        else:
+            await conn.execute(text("ANALYZE"))
+
+    print(f"\n✅ Povoamento em volume concluído (semente {seed}). Senha dos professores: {SENHA_VOLUME}")
+
 def main():
     """Função de entrada para o script."""
-    print("Iniciando o povoamento do banco de dados via Poetry script...")
-    asyncio.run(populate_data())
+    parser = argparse.ArgumentParser(
+        description="Povoa o banco com dados fictícios. Sem --projetos/--publicacoes, "
+                    "cria o conjunto pequeno de desenvolvimento."
+    )
+    parser.add_argument("--projetos", type=int, help="Modo de alto volume: número de projetos (ex.: 1_000_000)")
+    parser.add_argument("--publicacoes", type=int, help="Modo de alto volume: número de publicações (ex.: 5_000_000)")
+    parser.add_argument("--professores", type=int, help="Padrão: 1 para cada 20 projetos (mínimo 15)")
+    parser.add_argument("--cursos", type=int, default=50)
+    parser.add_argument("--lote", type=int, default=10_000, help="Linhas por INSERT/commit")
+    parser.add_argument("--seed", type=int, default=42, help="Semente (reprodutibilidade)")
+    parser.add_argument("--data-referencia", type=date.fromisoformat, default=DATA_REFERENCIA,
+                        help=f"Data mais recente gerada, AAAA-MM-DD (padrão: {DATA_REFERENCIA})")
+    args = parser.parse_args()
+
+    if args.projetos is None and args.publicacoes is None:
+        print("Iniciando o povoamento do banco de dados via Poetry script...")
+        asyncio.run(populate_data())
+        return
+
+    projetos = args.projetos or 0
+    asyncio.run(populate_volume(
+        projetos=projetos,
+        publicacoes=args.publicacoes or 0,
+        professores=args.professores or max(15, projetos // 20),
+        cursos=args.cursos,
+        lote=args.lote,
+        seed=args.seed,
+        referencia=args.data_referencia,
+    ))
 
 if __name__ == "__main__":
     main()